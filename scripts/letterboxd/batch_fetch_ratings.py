@@ -3,7 +3,7 @@ Batch fetch Letterboxd ratings for movies in the database
 """
 import sys
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -11,38 +11,114 @@ import scripts.letterboxd.compat
 
 from scripts.letterboxd.utils import get_supabase_client
 from scripts.letterboxd.fetch_movie_rating import get_letterboxd_rating
-import time
+from scripts.letterboxd.session import report_connection_stats
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.profiling import profiled
+from scripts.letterboxd.film_registry import (
+    FilmRegistry, set_film_registry, registry_records, is_fresh,
+    buffer_registry_writes, flush_registry_writes
+)
+from scripts.letterboxd.planner import plan_rating_fetch
+from scripts.letterboxd.deadlines import Deadline, deadline_scope, detached_scope, WRITE_TIMEOUT
 
-def batch_fetch_ratings(limit: int = 100, dry_run: bool = False):
+# Letterboxd requests go through the fetch layer, which paces them host-wide (rate_limit.py)
+install_fetch_layer()
+
+def batch_fetch_ratings(limit: int = 100, dry_run: bool = False, db_url: Optional[str] = None, batch_size: int = 500,
+                        claim: bool = False, worker_id: Optional[str] = None, claim_size: int = 25,
+                        lease_seconds: int = 600, time_budget: Optional[float] = None,
+                        request_deadline: Optional[float] = 60):
     """
     Fetch Letterboxd ratings for movies missing them in the database
     
     Args:
         limit: Maximum number of movies to process
-        dry_run: If True, only show what would be updated without making changes
+        dry_run: If True, make no changes; print the rows and an execution plan
+            (cache/registry hits, requests, DB writes, estimated wall time)
+        db_url: Optional direct Postgres URL; ratings are then written in bulk
+            (COPY + one UPDATE per batch) instead of one PostgREST call per row
+        batch_size: Ratings per bulk write when db_url is set
+        claim: If True, lease rows via claim_letterboxd_rating_work so several
+            workers can run at once without fetching the same rows
+        worker_id: Worker id recorded on claims (defaults to <hostname>-<pid>)
+        claim_size: Rows leased per claim round
+        lease_seconds: Lease length; unfinished rows become claimable again after it
+        time_budget: Seconds the whole run may take; once spent, no new film is
+            started, buffered writes are flushed and the leftover work is reported
+        request_deadline: Seconds one film's lookup (slug probe, search, write)
+            may take, capped by what is left of the time budget
     """
-    supabase = get_supabase_client()
-    if not supabase:
-        print("❌ Cannot connect to Supabase")
-        return
+    budget = Deadline(time_budget)
+    bulk = None
+    supabase = None
+    if db_url:
+        from scripts.letterboxd.pg_bulk import BulkWriter
+        bulk = BulkWriter(db_url)
+        set_film_registry(FilmRegistry(pg_conn=bulk.conn))
+    else:
+        supabase = get_supabase_client()
+        if not supabase:
+            print("❌ Cannot connect to Supabase")
+            return
     
-    try:
-        # Get movies that need Letterboxd ratings
-        print(f"📊 Fetching movies missing Letterboxd ratings (limit: {limit})...")
-        
+    claimer = None
+    if claim and not dry_run:
+        from scripts.letterboxd.work_claims import WorkClaimer
+        claimer = WorkClaimer(
+            worker_id=worker_id,
+            lease_seconds=lease_seconds,
+            supabase=supabase,
+            pg_conn=bulk.conn if bulk else None
+        )
+        print(f"🔒 Claiming work as {claimer.worker_id} ({claim_size} rows per lease, {lease_seconds}s lease)")
+    
+    pending: List[Tuple[str, float]] = []
+    
+    def flush() -> Tuple[int, int]:
+        """Write buffered ratings; returns (updated, failed)"""
+        if not pending:
+            return 0, 0
+        # Writes get their own deadline so a spent budget still drains the buffer
+        with detached_scope(WRITE_TIMEOUT):
+            written = bulk.update_letterboxd_ratings(pending)
+        print(f"💾 Bulk-wrote {written}/{len(pending)} ratings")
+        failed = len(pending) - written
+        pending.clear()
+        return written, failed
+    
+    def next_batch(processed: int) -> List[Dict[str, Any]]:
+        """Rows to work on next: a fresh lease in claim mode, otherwise everything up to limit once"""
+        remaining = limit - processed
+        if remaining <= 0:
+            return []
+        if claimer:
+            return claimer.claim(min(claim_size, remaining))
+        if processed > 0:
+            return []
+        if bulk:
+            return bulk.fetch_picks_missing_ratings(remaining)
         result = supabase.table('draft_picks')\
             .select('id, movie_id, movie_title, movie_year, letterboxd_rating')\
             .is_('letterboxd_rating', 'null')\
             .not_.is_('movie_title', 'null')\
-            .limit(limit)\
+            .limit(remaining)\
             .execute()
+        return result.data or []
+    
+    try:
+        # Get movies that need Letterboxd ratings
+        print(f"📊 Fetching movies missing Letterboxd ratings (limit: {limit})...")
         
-        if not result.data or len(result.data) == 0:
+        movies = next_batch(0)
+        
+        if not movies:
             print("✅ No movies need Letterboxd ratings")
             return
         
-        movies = result.data
-        print(f"📽️  Found {len(movies)} movies to process")
+        if claimer:
+            print(f"📽️  Claimed {len(movies)} movies to process")
+        else:
+            print(f"📽️  Found {len(movies)} movies to process")
         
         if dry_run:
             print("\n🔍 DRY RUN - Would fetch ratings for:")
@@ -50,56 +126,119 @@ def batch_fetch_ratings(limit: int = 100, dry_run: bool = False):
                 print(f"  - {movie['movie_title']} ({movie['movie_year']})")
             if len(movies) > 10:
                 print(f"  ... and {len(movies) - 10} more")
+            plan = plan_rating_fetch(movies, bulk=bool(bulk), batch_size=batch_size)
+            plan.report()
+            if time_budget and plan.estimate_seconds() > time_budget:
+                print(f"  ⚠️  Exceeds --time-budget {time_budget:g}s; the run would stop early and leave rows for the next one")
             return
         
         updated_count = 0
         error_count = 0
+        processed = 0
+        left_over = 0
+        total_label = '?' if claimer else str(len(movies))
         
-        for i, movie in enumerate(movies, 1):
-            try:
-                print(f"\n[{i}/{len(movies)}] Processing: {movie['movie_title']} ({movie['movie_year']})")
-                
-                rating = get_letterboxd_rating(
-                    movie['movie_title'],
-                    movie['movie_year'],
-                    movie['movie_id']
-                )
-                
-                if rating is not None:
-                    # Update database
-                    update_result = supabase.table('draft_picks')\
-                        .update({'letterboxd_rating': rating})\
-                        .eq('id', movie['id'])\
-                        .execute()
+        with buffer_registry_writes():
+            while movies:
+                rated_ids: List[str] = []
+                # Films another pick, run or machine already rated need no scrape;
+                # the rest keep their registry slug so the lookup can probe it directly
+                records = registry_records(m['movie_id'] for m in movies if m.get('movie_id'))
+                known = {tmdb_id: float(r['rating']) for tmdb_id, r in records.items() if is_fresh(r)}
+                if known:
+                    print(f"📚 {len(known)} films already rated in the film registry")
+            
+                for index, movie in enumerate(movies):
+                    if budget.expired():
+                        left_over = len(movies) - index
+                        break
+                    processed += 1
+                    try:
+                        print(f"\n[{processed}/{total_label}] Processing: {movie['movie_title']} ({movie['movie_year']})")
                     
-                    if update_result.data:
-                        print(f"✅ Updated: {rating}/5")
-                        updated_count += 1
-                    else:
-                        print(f"⚠️  Failed to update database")
-                        error_count += 1
-                else:
-                    print(f"⚠️  Rating not found")
-                    error_count += 1
-                
-                # Rate limiting - wait between requests
-                if i < len(movies):
-                    time.sleep(2)  # 2 second delay between requests
+                        if movie.get('movie_id') in known:
+                            rating = known[movie['movie_id']]
+                        else:
+                            with deadline_scope(budget.cap(request_deadline)):
+                                rating = get_letterboxd_rating(
+                                    movie['movie_title'],
+                                    movie['movie_year'],
+                                    movie['movie_id'],
+                                    slug=(records.get(movie.get('movie_id')) or {}).get('slug'),
+                                    use_registry=False
+                                )
                     
-            except Exception as e:
-                print(f"❌ Error processing {movie['movie_title']}: {e}")
-                error_count += 1
-                continue
+                        if rating is not None and bulk:
+                            pending.append((movie['id'], rating))
+                            rated_ids.append(movie['id'])
+                            print(f"✅ Queued: {rating}/5")
+                            if len(pending) >= batch_size:
+                                written, failed = flush()
+                                updated_count += written
+                                error_count += failed
+                        elif rating is not None:
+                            # Update database (capped by SUPABASE_CLIENT_TIMEOUT when set)
+                            update_result = supabase.table('draft_picks')\
+                                .update({'letterboxd_rating': rating})\
+                                .eq('id', movie['id'])\
+                                .execute()
+                        
+                            if update_result.data:
+                                print(f"✅ Updated: {rating}/5")
+                                updated_count += 1
+                                rated_ids.append(movie['id'])
+                            else:
+                                print(f"⚠️  Failed to update database")
+                                error_count += 1
+                        else:
+                            print(f"⚠️  Rating not found")
+                            error_count += 1
+                        
+                    except Exception as e:
+                        print(f"❌ Error processing {movie['movie_title']}: {e}")
+                        error_count += 1
+                        continue
+            
+                # New ratings reach the registry in one upsert per batch
+                with detached_scope(WRITE_TIMEOUT):
+                    flush_registry_writes()
+            
+                if claimer:
+                    # Ratings must be written before their claims are dropped
+                    if bulk:
+                        written, failed = flush()
+                        updated_count += written
+                        error_count += failed
+                    claimer.complete(rated_ids)
+            
+                if left_over or budget.expired():
+                    break
+                movies = next_batch(processed)
+        
+        if bulk:
+            written, failed = flush()
+            updated_count += written
+            error_count += failed
         
         print(f"\n📊 Summary:")
         print(f"  ✅ Updated: {updated_count}")
         print(f"  ❌ Errors: {error_count}")
-        print(f"  📝 Total processed: {len(movies)}")
+        print(f"  📝 Total processed: {processed}")
+        if left_over:
+            print(f"  ⏱️  Time budget spent: {left_over} fetched rows left for the next run")
+            if claimer:
+                print(f"     (their leases expire after {lease_seconds}s)")
+        elif budget.expired() and processed < limit:
+            print(f"  ⏱️  Time budget spent before reaching --limit")
+        report_connection_stats()
         
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if bulk:
+            bulk.close()
 
 if __name__ == "__main__":
     import argparse
@@ -107,7 +246,28 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Batch fetch Letterboxd ratings')
     parser.add_argument('--limit', type=int, default=100, help='Maximum number of movies to process')
     parser.add_argument('--dry-run', action='store_true', help='Preview what would be updated')
+    parser.add_argument('--db-url', help='Direct Postgres URL; write ratings in bulk via COPY instead of PostgREST')
+    parser.add_argument('--batch-size', type=int, default=500, help='Ratings per bulk write in --db-url mode')
+    parser.add_argument('--claim', action='store_true', help='Lease work so several workers can run in parallel')
+    parser.add_argument('--worker-id', help='Worker id for claims (default: <hostname>-<pid>)')
+    parser.add_argument('--claim-size', type=int, default=25, help='Rows leased per claim round')
+    parser.add_argument('--lease-seconds', type=int, default=600, help='Seconds before an unfinished lease can be reclaimed')
+    parser.add_argument('--time-budget', type=float, help='Seconds the whole run may take; then stop, flush writes and report what is left')
+    parser.add_argument('--request-deadline', type=float, default=60, help='Seconds one film lookup may take (default: 60)')
+    parser.add_argument('--profile', action='store_true', help='Write cProfile, collapsed-stack and peak-memory output for this run')
     
     args = parser.parse_args()
     
-    batch_fetch_ratings(limit=args.limit, dry_run=args.dry_run)
+    with profiled('batch_fetch_ratings', args.profile):
+        batch_fetch_ratings(
+            limit=args.limit,
+            dry_run=args.dry_run,
+            db_url=args.db_url,
+            batch_size=args.batch_size,
+            claim=args.claim,
+            worker_id=args.worker_id,
+            claim_size=args.claim_size,
+            lease_seconds=args.lease_seconds,
+            time_budget=args.time_budget,
+            request_deadline=args.request_deadline
+        )
@@ -0,0 +1,89 @@
+"""
+NDJSON stdin/stdout batch mode shared by the fetch scripts
+
+One JSON request per input line, one JSON result per output line. Requests run
+concurrently in a single warm process and results are written as they finish,
+each carrying the request's "id" (or its 1-based line number when it has none).
+Progress output from the fetch functions goes to stderr so stdout stays NDJSON.
+"""
+import os
+import sys
+import json
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, IO, Tuple
+
+from scripts.letterboxd.film_record import json_default
+
+# Requests in flight at once; each worker shares the keep-alive session
+BATCH_WORKERS = int(os.getenv('LETTERBOXD_BATCH_WORKERS', '4'))
+
+
+def run_batch(handler: Callable[[Dict[str, Any]], Dict[str, Any]], workers: int = BATCH_WORKERS,
+              stdin: IO[str] = None, stdout: IO[str] = None) -> Tuple[int, int]:
+    """
+    Answer NDJSON requests from stdin on stdout
+
+    Args:
+        handler: Turns one request dict into a result dict; exceptions become
+            {"id": ..., "error": "..."} lines
+        workers: Requests processed concurrently
+        stdin: Request stream (defaults to sys.stdin)
+        stdout: Result stream (defaults to sys.stdout)
+
+    Returns:
+        Tuple of (requests answered, requests that failed or were invalid)
+    """
+    stdin = stdin or sys.stdin
+    out = stdout or sys.stdout
+    workers = max(1, workers)
+    write_lock = threading.Lock()
+    # Bounds how far reading runs ahead of processing, so huge inputs stream
+    slots = threading.BoundedSemaphore(workers * 4)
+    counts = {'answered': 0, 'failed': 0}
+
+    def emit(result: Dict[str, Any], failed: bool) -> None:
+        line = json.dumps(result, default=json_default)
+        with write_lock:
+            out.write(line + '\n')
+            out.flush()
+            counts['answered'] += 1
+            if failed:
+                counts['failed'] += 1
+
+    def work(request_id: Any, request: Dict[str, Any]) -> None:
+        try:
+            result = handler(request)
+            emit({'id': request_id, **result}, 'error' in result)
+        except Exception as e:
+            emit({'id': request_id, 'error': str(e)}, True)
+        finally:
+            slots.release()
+
+    # Library progress messages would corrupt the NDJSON stream
+    with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=workers) as pool:
+        for line_number, line in enumerate(stdin, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                emit({'id': line_number, 'error': f"invalid request: {e}"}, True)
+                continue
+            slots.acquire()
+            pool.submit(work, request.get('id', line_number), request)
+
+    print(f"📦 Batch done: {counts['answered']} answered, {counts['failed']} failed", file=sys.stderr)
+    return counts['answered'], counts['failed']
+
+
+def parse_int(value: Any):
+    """A request field (year, tmdb_id) as int, or None"""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
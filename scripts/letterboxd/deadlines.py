@@ -0,0 +1,110 @@
+"""
+Run-level time budgets and per-request deadlines
+
+A deadline scope sets the time by which the enclosed work must finish. Nested
+scopes never extend an outer one, so a per-film deadline inside a run budget
+expires at whichever comes first. The HTTP session, Postgres bulk writes and
+edge-function calls read the current deadline to cap their own timeouts.
+"""
+import os
+import time
+import contextvars
+import contextlib
+from typing import Optional
+
+# Time allowed for flushing buffered writes, even after the run budget is spent
+WRITE_TIMEOUT = float(os.getenv('LETTERBOXD_WRITE_TIMEOUT', '60'))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is started after its deadline has passed"""
+
+
+class Deadline:
+    """An absolute point on the monotonic clock (None = no limit)"""
+
+    def __init__(self, seconds: Optional[float] = None, expires_at: Optional[float] = None):
+        if expires_at is None and seconds is not None:
+            expires_at = time.monotonic() + seconds
+        self.expires_at = expires_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if unlimited"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, seconds: Optional[float]) -> Optional[float]:
+        """The smaller of seconds and the time remaining (None = unlimited)"""
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        return remaining if seconds is None else min(seconds, remaining)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('letterboxd_deadline', default=Deadline())
+
+
+def current_deadline() -> Deadline:
+    """The innermost active deadline (unlimited outside any scope)"""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Run a block under a deadline of `seconds` from now, capped by any outer deadline
+
+    Args:
+        seconds: Time allowed for the block; None inherits the outer deadline
+
+    Yields:
+        The effective Deadline
+    """
+    outer = _current.get()
+    deadline = Deadline(seconds)
+    if outer.expires_at is not None and (deadline.expires_at is None or outer.expires_at < deadline.expires_at):
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def detached_scope(seconds: Optional[float]):
+    """
+    Run a block under its own deadline, ignoring outer ones
+
+    Used to drain pending writes after the run budget is spent.
+    """
+    token = _current.set(Deadline(seconds))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(default: float) -> float:
+    """
+    Timeout to use for one request under the current deadline
+
+    Args:
+        default: The request's normal timeout in seconds
+
+    Returns:
+        min(default, time remaining)
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    remaining = _current.get().remaining()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded("deadline passed before the request started")
+    return min(default, remaining)
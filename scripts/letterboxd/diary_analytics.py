@@ -0,0 +1,422 @@
+"""
+Per-player taste profiles from Letterboxd diaries (vectorized, incrementally aggregated)
+"""
+import sys
+import os
+import json
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.fetcher import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')
+# 2: genres loaded from film pages, undated entries left out of every run
+PROFILE_VERSION = 2
+# Film pages loaded concurrently for genres
+GENRE_WORKERS = int(os.getenv('LETTERBOXD_POOL_WORKERS', '4'))
+
+# Half-star buckets: index 0 = 0.5 stars ... index 9 = 5 stars
+RATING_BUCKETS = 10
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def _parse_watched_date(value: Any) -> Optional[datetime.date]:
+    """Normalize the shapes letterboxdpy uses for diary dates"""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, dict):
+        try:
+            return datetime.date(int(value['year']), int(value['month']), int(value['day']))
+        except (KeyError, TypeError, ValueError):
+            return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _normalize_rating(value: Any) -> float:
+    """Return stars on a 0.5-5 scale, or NaN if unrated"""
+    if value is None:
+        return np.nan
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    if rating > 5:
+        # Some letterboxdpy versions report half-stars as 1-10
+        rating = rating / 2
+    if rating <= 0:
+        return np.nan
+    return rating
+
+
+def _entry_key(entry: Dict[str, Any]) -> str:
+    return str(entry.get('slug') or entry.get('title'))
+
+
+def _genre_names(genres: Any) -> List[str]:
+    """Genre names from letterboxdpy's genre dicts, leaving out themes and other types"""
+    names = []
+    for genre in genres or []:
+        if isinstance(genre, dict):
+            if genre.get('type', 'genre') != 'genre':
+                continue
+            genre = genre.get('name')
+        if genre and genre not in names:
+            names.append(str(genre))
+    return names
+
+
+def _load_film_genres(slug: str) -> Optional[List[str]]:
+    from letterboxdpy.movie import Movie
+
+    try:
+        return _genre_names(getattr(Movie(slug), 'genres', None))
+    except Exception as e:
+        print(f"⚠️  Could not fetch film page for {slug}: {e}")
+        return None
+
+
+def load_entry_genres(entries: List[Dict[str, Any]], max_workers: int = GENRE_WORKERS) -> List[Optional[List[str]]]:
+    """
+    Genre names for each diary entry
+
+    Diary pages don't list genres, so each distinct film's page is loaded once
+    (through the page cache, so a rerun revalidates instead of refetching).
+    Entries that already carry genres are used as they are.
+
+    Args:
+        entries: Diary entries
+        max_workers: Film pages loaded concurrently
+
+    Returns:
+        Genre names per entry, in order (None where the film page couldn't be loaded)
+    """
+    import scripts.letterboxd.compat
+    from scripts.letterboxd.fetcher import install_fetch_layer
+
+    slugs = sorted({str(e.get('slug')) for e in entries if e.get('slug') and not e.get('genres')})
+    by_slug: Dict[str, Optional[List[str]]] = {}
+    if slugs:
+        install_fetch_layer()
+        print(f"📥 Loading {len(slugs)} film pages for genres ({max_workers} at a time)...")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            by_slug = dict(zip(slugs, pool.map(_load_film_genres, slugs)))
+    return [
+        _genre_names(e.get('genres')) if e.get('genres') else by_slug.get(str(e.get('slug')))
+        for e in entries
+    ]
+
+
+def load_diary_columns(entries: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Load diary entries into columnar arrays
+
+    Args:
+        entries: Diary entries as produced by fetch_user_data.fetch_user_diary
+
+    Returns:
+        Dict of equal-length arrays: watched (datetime64[D], NaT if unknown),
+        rating (float32 stars, NaN if unrated) and year (int32, 0 if unknown)
+    """
+    n = len(entries)
+    watched = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+    rating = np.empty(n, dtype=np.float32)
+    year = np.zeros(n, dtype=np.int32)
+
+    for i, entry in enumerate(entries):
+        watched_date = _parse_watched_date(entry.get('watched_date'))
+        if watched_date is not None:
+            watched[i] = np.datetime64(watched_date, 'D')
+        rating[i] = _normalize_rating(entry.get('rating'))
+        try:
+            year[i] = int(entry.get('year') or 0)
+        except (TypeError, ValueError):
+            year[i] = 0
+
+    return {'watched': watched, 'rating': rating, 'year': year}
+
+
+def _counts(keys: np.ndarray) -> Dict[str, int]:
+    values, counts = np.unique(keys, return_counts=True)
+    return {str(v): int(c) for v, c in zip(values, counts)}
+
+
+def aggregate_columns(columns: Dict[str, np.ndarray], genres: Optional[List[List[str]]] = None) -> Dict[str, Any]:
+    """
+    Compute additive aggregates for a batch of diary entries
+
+    Every field is a count or sum, so aggregates from separate batches can be
+    merged with merge_aggregates.
+
+    Args:
+        columns: Output of load_diary_columns
+        genres: Optional per-entry genre name lists (same order as the columns)
+
+    Returns:
+        Aggregate dict
+    """
+    rating = columns['rating']
+    year = columns['year']
+    watched = columns['watched']
+
+    rated = ~np.isnan(rating)
+    buckets = np.clip(np.rint(rating[rated] * 2).astype(np.int64) - 1, 0, RATING_BUCKETS - 1)
+    histogram = np.bincount(buckets, minlength=RATING_BUCKETS)
+
+    known_year = year > 0
+    decades = (year[known_year] // 10) * 10
+
+    dated = watched[~np.isnat(watched)]
+    months = dated.astype('datetime64[M]').astype(str)
+    # 1970-01-01 was a Thursday; shift so Monday = 0
+    weekdays = (dated.astype(np.int64) + 3) % 7
+    weekday_counts = np.bincount(weekdays, minlength=7)
+
+    sorted_days = np.sort(dated.astype(np.int64))
+    gaps = np.diff(sorted_days)
+
+    genre_counts: Dict[str, int] = {}
+    if genres:
+        flat = [g for entry_genres in genres if entry_genres for g in entry_genres]
+        if flat:
+            genre_counts = _counts(np.array(flat, dtype=object).astype(str))
+
+    return {
+        'entry_count': int(len(rating)),
+        'rated_count': int(rated.sum()),
+        'rating_sum': float(rating[rated].sum(dtype=np.float64)),
+        'rating_histogram': histogram.astype(int).tolist(),
+        'decade_counts': _counts(decades) if len(decades) else {},
+        'genre_counts': genre_counts,
+        'monthly_counts': _counts(months) if len(months) else {},
+        'weekday_counts': weekday_counts.astype(int).tolist(),
+        'gap_days_sum': int(gaps.sum()) if len(gaps) else 0,
+        'gap_count': int(len(gaps)),
+        'first_watched': str(np.datetime64(int(sorted_days[0]), 'D')) if len(sorted_days) else None,
+        'last_watched': str(np.datetime64(int(sorted_days[-1]), 'D')) if len(sorted_days) else None,
+    }
+
+
+def _merge_counts(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(a)
+    for key, value in b.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def merge_aggregates(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold a newer batch of aggregates into an existing profile
+
+    Args:
+        base: Aggregates covering entries up to the watermark
+        delta: Aggregates for entries after the watermark
+
+    Returns:
+        Combined aggregates
+    """
+    if not base.get('entry_count'):
+        return dict(delta)
+    if not delta.get('entry_count'):
+        return dict(base)
+
+    gap_days_sum = base['gap_days_sum'] + delta['gap_days_sum']
+    gap_count = base['gap_count'] + delta['gap_count']
+    # The gap that bridges the two batches
+    if base.get('last_watched') and delta.get('first_watched'):
+        bridge = (datetime.date.fromisoformat(delta['first_watched'])
+                  - datetime.date.fromisoformat(base['last_watched'])).days
+        if bridge >= 0:
+            gap_days_sum += bridge
+            gap_count += 1
+
+    return {
+        'entry_count': base['entry_count'] + delta['entry_count'],
+        'rated_count': base['rated_count'] + delta['rated_count'],
+        'rating_sum': base['rating_sum'] + delta['rating_sum'],
+        'rating_histogram': [x + y for x, y in zip(base['rating_histogram'], delta['rating_histogram'])],
+        'decade_counts': _merge_counts(base['decade_counts'], delta['decade_counts']),
+        'genre_counts': _merge_counts(base['genre_counts'], delta['genre_counts']),
+        'monthly_counts': _merge_counts(base['monthly_counts'], delta['monthly_counts']),
+        'weekday_counts': [x + y for x, y in zip(base['weekday_counts'], delta['weekday_counts'])],
+        'gap_days_sum': gap_days_sum,
+        'gap_count': gap_count,
+        'first_watched': min(filter(None, [base.get('first_watched'), delta.get('first_watched')]), default=None),
+        'last_watched': max(filter(None, [base.get('last_watched'), delta.get('last_watched')]), default=None),
+    }
+
+
+def summarize(aggregates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive the human-facing taste profile from aggregates
+
+    Returns:
+        Dict with average rating, rating histogram keyed by stars, decade/genre
+        counts, weekday split and watch cadence
+    """
+    rated = aggregates.get('rated_count', 0)
+    gap_count = aggregates.get('gap_count', 0)
+    months = aggregates.get('monthly_counts', {})
+    return {
+        'entries': aggregates.get('entry_count', 0),
+        'average_rating': round(aggregates['rating_sum'] / rated, 2) if rated else None,
+        'rating_histogram': {
+            f"{(i + 1) / 2:.1f}": count for i, count in enumerate(aggregates.get('rating_histogram', []))
+        },
+        'decades': dict(sorted(aggregates.get('decade_counts', {}).items())),
+        'genres': dict(sorted(aggregates.get('genre_counts', {}).items(), key=lambda kv: -kv[1])),
+        'weekdays': dict(zip(WEEKDAYS, aggregates.get('weekday_counts', []))),
+        'cadence': {
+            'mean_days_between_watches': round(aggregates['gap_days_sum'] / gap_count, 2) if gap_count else None,
+            'watches_per_active_month': round(sum(months.values()) / len(months), 2) if months else None,
+            'first_watched': aggregates.get('first_watched'),
+            'last_watched': aggregates.get('last_watched'),
+        },
+    }
+
+
+def _profile_path(username: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{username.lower()}.json")
+
+
+def load_profile(username: str) -> Optional[Dict[str, Any]]:
+    """Load a stored profile, or None if missing or from an older format"""
+    path = _profile_path(username)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        profile = json.load(f)
+    if profile.get('version') != PROFILE_VERSION:
+        return None
+    return profile
+
+
+def save_profile(username: str, profile: Dict[str, Any]) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = _profile_path(username)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, path)
+
+
+def _split_new_entries(entries: List[Dict[str, Any]], watermark: Optional[str],
+                       watermark_keys: List[str]) -> List[Dict[str, Any]]:
+    """
+    Keep entries after the watermark, plus unseen entries on the watermark day itself
+
+    Entries without a watched date can't be placed against the watermark, so
+    they are left out on full rebuilds too; otherwise a rebuilt profile would
+    count them and an incrementally updated one wouldn't.
+    """
+    seen_on_watermark = set(watermark_keys)
+    new_entries = []
+    for entry in entries:
+        watched_date = _parse_watched_date(entry.get('watched_date'))
+        if watched_date is None:
+            continue
+        day = watched_date.isoformat()
+        if not watermark or day > watermark or (day == watermark and _entry_key(entry) not in seen_on_watermark):
+            new_entries.append(entry)
+    return new_entries
+
+
+def _next_watermark(entries: List[Dict[str, Any]], watermark: Optional[str],
+                    watermark_keys: List[str]) -> Tuple[Optional[str], List[str]]:
+    days = [
+        (d.isoformat(), _entry_key(e))
+        for e in entries
+        for d in [_parse_watched_date(e.get('watched_date'))]
+        if d is not None
+    ]
+    if not days:
+        return watermark, watermark_keys
+    latest = max(day for day, _ in days)
+    if watermark and watermark > latest:
+        return watermark, watermark_keys
+    keys = [key for day, key in days if day == latest]
+    if watermark == latest:
+        keys = sorted(set(watermark_keys) | set(keys))
+    return latest, keys
+
+
+def update_player_profile(username: str, entries: Optional[List[Dict[str, Any]]] = None,
+                          rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Fold new diary entries into a player's stored taste profile
+
+    Only entries watched after the stored watched_date watermark are aggregated;
+    everything older is already in the stored counts. Entries without a
+    watched date are never counted. Genres come from the new entries' film pages.
+
+    Args:
+        username: Letterboxd username
+        entries: Diary entries (fetched with fetch_user_diary if omitted)
+        rebuild: If True, ignore the stored profile and aggregate everything
+
+    Returns:
+        The updated profile (aggregates, summary and watermark)
+    """
+    if entries is None:
+        from scripts.letterboxd.fetch_user_data import fetch_user_diary
+        entries = fetch_user_diary(username)['diary']
+
+    profile = None if rebuild else load_profile(username)
+    if profile is None:
+        profile = {
+            'version': PROFILE_VERSION,
+            'username': username,
+            'watermark': None,
+            'watermark_keys': [],
+            'aggregates': {},
+        }
+
+    if not profile['watermark']:
+        # Nothing to anchor an incremental update on; aggregate from scratch
+        profile['aggregates'] = {}
+
+    new_entries = _split_new_entries(entries, profile['watermark'], profile['watermark_keys'])
+    if new_entries:
+        columns = load_diary_columns(new_entries)
+        genres = load_entry_genres(new_entries)
+        delta = aggregate_columns(columns, genres)
+        profile['aggregates'] = merge_aggregates(profile['aggregates'], delta)
+        profile['watermark'], profile['watermark_keys'] = _next_watermark(
+            new_entries, profile['watermark'], profile['watermark_keys']
+        )
+
+    profile['summary'] = summarize(profile['aggregates']) if profile['aggregates'] else {}
+    profile['updated_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    save_profile(username, profile)
+
+    undated = sum(1 for e in entries if _parse_watched_date(e.get('watched_date')) is None)
+    print(f"✅ Profile for {username}: {len(new_entries)} new entries folded in (watermark: {profile['watermark']})")
+    if undated:
+        print(f"⚠️  {undated} diary entries have no watched date and aren't counted")
+    return profile
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python diary_analytics.py <username> [--rebuild]")
+        sys.exit(1)
+
+    username = sys.argv[1]
+    rebuild = '--rebuild' in sys.argv
+
+    try:
+        profile = update_player_profile(username, rebuild=rebuild)
+        print(json.dumps(profile['summary'], indent=2, default=str))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
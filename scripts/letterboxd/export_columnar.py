@@ -0,0 +1,215 @@
+"""
+Export list / watchlist / diary data as typed columnar files (Parquet or Arrow IPC)
+"""
+import sys
+import os
+import datetime
+from typing import List, Dict, Any, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.utils import extract_tmdb_id_from_url
+
+FORMATS = ('parquet', 'arrow')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("pyarrow is required for columnar export (pip install pyarrow)")
+
+
+def film_schema():
+    """Shared schema for every exported dataset"""
+    pa = _require_pyarrow()
+    return pa.schema([
+        ('source', pa.dictionary(pa.int8(), pa.string())),
+        ('owner', pa.dictionary(pa.int32(), pa.string())),
+        ('position', pa.int32()),
+        ('slug', pa.string()),
+        ('title', pa.string()),
+        ('tmdb_id', pa.int32()),
+        ('year', pa.int16()),
+        ('rating', pa.float32()),
+        ('watched_date', pa.date32()),
+        ('director', pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_date(value: Any) -> Optional[datetime.date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, dict):
+        try:
+            return datetime.date(int(value['year']), int(value['month']), int(value['day']))
+        except (KeyError, TypeError, ValueError):
+            return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _director(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(str(v) for v in value)
+    return str(value)
+
+
+def films_to_table(films: List[Dict[str, Any]], source: str, owner: str):
+    """
+    Build an Arrow table from the film dicts fetch_list / fetch_user_watchlist / fetch_user_diary return
+
+    Args:
+        films: Film dicts
+        source: Dataset name ("list", "watchlist" or "diary")
+        owner: Username or username/list_slug the films came from
+
+    Returns:
+        pyarrow.Table with film_schema()
+    """
+    pa = _require_pyarrow()
+    n = len(films)
+    columns = {
+        'source': [source] * n,
+        'owner': [owner] * n,
+        'position': list(range(1, n + 1)),
+        'slug': [f.get('slug') for f in films],
+        'title': [None if f.get('title') is None else str(f.get('title')) for f in films],
+        'tmdb_id': [
+            _to_int(f.get('tmdb_id')) if f.get('tmdb_id') is not None
+            else extract_tmdb_id_from_url(f.get('tmdb_link'))
+            for f in films
+        ],
+        'year': [_to_int(f.get('year')) for f in films],
+        'rating': [_to_float(f.get('rating')) for f in films],
+        'watched_date': [_to_date(f.get('watched_date')) for f in films],
+        'director': [_director(f.get('director')) for f in films],
+    }
+    schema = film_schema()
+    arrays = [pa.array(columns[field.name], type=field.type) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_table(table, path: str, fmt: Optional[str] = None) -> str:
+    """
+    Write a table as Parquet (zstd) or Arrow IPC (uncompressed, so readers can memory-map it)
+
+    Args:
+        table: pyarrow.Table
+        path: Output path
+        fmt: "parquet" or "arrow"; inferred from the extension if omitted
+
+    Returns:
+        The path written
+    """
+    _require_pyarrow()
+    fmt = fmt or ('arrow' if path.endswith(('.arrow', '.feather', '.ipc')) else 'parquet')
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; use one of {FORMATS}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression='zstd')
+    else:
+        import pyarrow as pa
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    print(f"✅ Wrote {table.num_rows} rows to {path} ({fmt})")
+    return path
+
+
+def read_table(path: str):
+    """
+    Read an exported file; Arrow IPC files are memory-mapped (zero-copy)
+
+    Args:
+        path: File written by write_table
+
+    Returns:
+        pyarrow.Table
+    """
+    pa = _require_pyarrow()
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def export_dataset(kind: str, username: str, output: str, list_slug: Optional[str] = None,
+                   max_count: Optional[int] = None, fmt: Optional[str] = None) -> str:
+    """
+    Fetch a list, watchlist or diary and write it as a columnar file
+
+    Args:
+        kind: "list", "watchlist" or "diary"
+        username: Letterboxd username
+        output: Output path (.parquet or .arrow)
+        list_slug: List slug (list only)
+        max_count: Optional cap for watchlist/diary
+        fmt: Optional explicit format
+
+    Returns:
+        The path written
+    """
+    if kind == 'list':
+        from scripts.letterboxd.fetch_list_data import fetch_list
+        data = fetch_list(username, list_slug)
+        films, owner = data['films'], f"{username}/{list_slug}"
+    elif kind == 'watchlist':
+        from scripts.letterboxd.fetch_user_data import fetch_user_watchlist
+        films, owner = fetch_user_watchlist(username, max_count)['watchlist'], username
+    elif kind == 'diary':
+        from scripts.letterboxd.fetch_user_data import fetch_user_diary
+        films, owner = fetch_user_diary(username, max_count)['diary'], username
+    else:
+        raise ValueError(f"Unknown dataset {kind!r}; use list, watchlist or diary")
+
+    return write_table(films_to_table(films, kind, owner), output, fmt)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python export_columnar.py list <username> <list_slug> <output.parquet|output.arrow>")
+        print("       python export_columnar.py <watchlist|diary> <username> <output.parquet|output.arrow> [max_count]")
+        sys.exit(1)
+
+    kind = sys.argv[1]
+    username = sys.argv[2]
+
+    try:
+        if kind == 'list':
+            if len(sys.argv) < 5:
+                print("❌ Error: List export requires list_slug and output path")
+                sys.exit(1)
+            export_dataset(kind, username, sys.argv[4], list_slug=sys.argv[3])
+        else:
+            max_count = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            export_dataset(kind, username, sys.argv[3], max_count=max_count)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
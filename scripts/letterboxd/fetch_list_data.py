@@ -15,7 +15,38 @@ from typing import Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from scripts.letterboxd.utils import extract_tmdb_id_from_url
+from scripts.letterboxd.film_record import FilmRecord, json_default, LIST_KEYS
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.utils import pop_flag, pop_option
+from scripts.letterboxd.profiling import profiled
+
+# Share one keep-alive session and revalidate list pages instead of re-downloading
+install_fetch_layer()
+
+def list_record(list_instance, username: str, list_slug: str) -> Dict[str, Any]:
+    """Plain dict of a letterboxdpy List and its films"""
+    list_data = {
+        'username': username,
+        'list_slug': list_slug,
+        'title': str(list_instance),
+        'description': getattr(list_instance, 'description', None),
+        'films': []
+    }
+    
+    # Get films from list
+    if hasattr(list_instance, 'films'):
+        films = list_instance.films
+        
+        if isinstance(films, list):
+            films_list = films
+        elif hasattr(films, '__iter__'):
+            films_list = list(films)
+        else:
+            films_list = []
+        
+        list_data['films'] = [FilmRecord.from_letterboxd(film, LIST_KEYS) for film in films_list]
+    
+    return list_data
 
 def fetch_list(username: str, list_slug: str) -> Dict[str, Any]:
     """
@@ -29,44 +60,7 @@ def fetch_list(username: str, list_slug: str) -> Dict[str, Any]:
         Dictionary containing list data
     """
     try:
-        list_instance = List(username, list_slug)
-        
-        list_data = {
-            'username': username,
-            'list_slug': list_slug,
-            'title': str(list_instance),
-            'description': getattr(list_instance, 'description', None),
-            'films': []
-        }
-        
-        # Get films from list
-        if hasattr(list_instance, 'films'):
-            films = list_instance.films
-            
-            if isinstance(films, list):
-                films_list = films
-            elif hasattr(films, '__iter__'):
-                films_list = list(films)
-            else:
-                films_list = []
-            
-            for film in films_list:
-                film_data = {
-                    'title': str(film) if hasattr(film, '__str__') else film,
-                    'slug': getattr(film, 'slug', None),
-                    'tmdb_link': getattr(film, 'tmdb_link', None),
-                    'tmdb_id': None,
-                    'year': getattr(film, 'year', None),
-                    'director': getattr(film, 'director', None),
-                    'rating': getattr(film, 'rating', None)
-                }
-                
-                # Extract TMDB ID from link
-                if film_data['tmdb_link']:
-                    film_data['tmdb_id'] = extract_tmdb_id_from_url(film_data['tmdb_link'])
-                
-                list_data['films'].append(film_data)
-        
+        list_data = list_record(List(username, list_slug), username, list_slug)
         print(f"✅ Fetched list: {list_data['title']} ({len(list_data['films'])} films)")
         return list_data
         
@@ -75,17 +69,33 @@ def fetch_list(username: str, list_slug: str) -> Dict[str, Any]:
         raise
 
 if __name__ == "__main__":
+    profile = pop_flag(sys.argv, '--profile')
+    export_path = pop_option(sys.argv, '--export')
+    processes = pop_option(sys.argv, '--processes')
+    
     if len(sys.argv) < 3:
-        print("Usage: python fetch_list_data.py <username> <list_slug>")
+        print("Usage: python fetch_list_data.py <username> <list_slug> [--export out.parquet|out.arrow] [--profile]")
+        print("       python fetch_list_data.py <username> <list_slug> [<username> <list_slug> ...] --processes N")
         sys.exit(1)
     
     username = sys.argv[1]
     list_slug = sys.argv[2]
     
     try:
-        data = fetch_list(username, list_slug)
-        print(json.dumps(data, indent=2, default=str))
+        with profiled('fetch_list_data', profile):
+            if processes:
+                # Pages download on threads; each list parses in its own process
+                from scripts.letterboxd.parse_pool import parse_lists
+                pairs = list(zip(sys.argv[1::2], sys.argv[2::2]))
+                results = parse_lists(pairs, parse_workers=int(processes))
+                data = results[0] if len(results) == 1 else results
+            else:
+                data = fetch_list(username, list_slug)
+        if export_path and isinstance(data, dict) and 'films' in data:
+            from scripts.letterboxd.export_columnar import films_to_table, write_table
+            write_table(films_to_table(data['films'], 'list', f"{username}/{list_slug}"), export_path)
+        else:
+            print(json.dumps(data, indent=2, default=json_default))
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
-
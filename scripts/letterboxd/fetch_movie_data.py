@@ -16,9 +16,22 @@ from typing import Optional, List, Dict, Any
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from scripts.letterboxd.utils import extract_tmdb_id_from_url
+from scripts.letterboxd.film_record import FilmRecord, json_default, MOVIE_KEYS, SEARCH_KEYS
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.utils import pop_flag, pop_option
+from scripts.letterboxd.batch_pipe import run_batch, parse_int, BATCH_WORKERS
+from scripts.letterboxd.profiling import profiled
 
-def fetch_movie_by_slug(slug: str) -> Dict[str, Any]:
+# Share one keep-alive session and revalidate film pages instead of re-downloading
+install_fetch_layer()
+
+def movie_record(movie, slug: str) -> FilmRecord:
+    """FilmRecord of the fields we use from a letterboxdpy Movie"""
+    record = FilmRecord.from_letterboxd(movie, MOVIE_KEYS)
+    record.slug = slug
+    return record
+
+def fetch_movie_by_slug(slug: str) -> FilmRecord:
     """
     Fetch movie data by Letterboxd slug
     
@@ -26,29 +39,10 @@ def fetch_movie_by_slug(slug: str) -> Dict[str, Any]:
         slug: Letterboxd movie slug (e.g., "v-for-vendetta")
     
     Returns:
-        Dictionary containing movie data
+        FilmRecord of the movie data
     """
     try:
-        movie = Movie(slug)
-        
-        movie_data = {
-            'slug': slug,
-            'title': str(movie),
-            'tmdb_link': getattr(movie, 'tmdb_link', None),
-            'tmdb_id': None,
-            'year': getattr(movie, 'year', None),
-            'director': getattr(movie, 'director', None),
-            'runtime': getattr(movie, 'runtime', None),
-            'rating': getattr(movie, 'rating', None),
-            'description': getattr(movie, 'description', None),
-            'genres': getattr(movie, 'genres', None),
-            'poster': getattr(movie, 'poster', None)
-        }
-        
-        # Extract TMDB ID from link
-        if movie_data['tmdb_link']:
-            movie_data['tmdb_id'] = extract_tmdb_id_from_url(movie_data['tmdb_link'])
-        
+        movie_data = movie_record(Movie(slug), slug)
         print(f"✅ Fetched movie: {movie_data['title']} (TMDB ID: {movie_data['tmdb_id']})")
         return movie_data
         
@@ -56,7 +50,7 @@ def fetch_movie_by_slug(slug: str) -> Dict[str, Any]:
         print(f"❌ Error fetching movie: {e}")
         raise
 
-def search_movies(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+def search_movies(query: str, max_results: int = 5) -> List[FilmRecord]:
     """
     Search for movies on Letterboxd
     
@@ -71,21 +65,7 @@ def search_movies(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         search = Search(query, 'films')
         results = search.get_results(max=max_results)
         
-        formatted_results = []
-        for result in results:
-            result_data = {
-                'title': str(result) if hasattr(result, '__str__') else result,
-                'slug': getattr(result, 'slug', None),
-                'tmdb_link': getattr(result, 'tmdb_link', None),
-                'tmdb_id': None,
-                'year': getattr(result, 'year', None)
-            }
-            
-            # Extract TMDB ID from link
-            if result_data['tmdb_link']:
-                result_data['tmdb_id'] = extract_tmdb_id_from_url(result_data['tmdb_link'])
-            
-            formatted_results.append(result_data)
+        formatted_results = [FilmRecord.from_letterboxd(result, SEARCH_KEYS) for result in results]
         
         print(f"✅ Found {len(formatted_results)} results for: {query}")
         return formatted_results
@@ -94,23 +74,63 @@ def search_movies(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         print(f"❌ Error searching movies: {e}")
         raise
 
+def data_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer one --batch request: {"id", "slug"} for a film page, or
+    {"id", "title", "year", "max_results"} for a search (filtered to the year when given)
+    """
+    if request.get('slug'):
+        return {'movie': fetch_movie_by_slug(request['slug'])}
+    if not request.get('title'):
+        return {'error': 'slug or title required'}
+    results = search_movies(request['title'], parse_int(request.get('max_results')) or 5)
+    year = parse_int(request.get('year'))
+    if year:
+        results = [r for r in results if parse_int(r.get('year')) == year] or results
+    return {'results': results}
+
 if __name__ == "__main__":
+    profile = pop_flag(sys.argv, '--profile')
+    batch = pop_flag(sys.argv, '--batch')
+    workers = pop_option(sys.argv, '--workers')
+    processes = pop_option(sys.argv, '--processes')
+    
+    if batch:
+        # NDJSON requests on stdin, NDJSON results on stdout in completion order
+        with profiled('fetch_movie_data', profile):
+            run_batch(data_request, workers=int(workers) if workers else BATCH_WORKERS)
+        sys.exit(0)
+    
     if len(sys.argv) < 2:
-        print("Usage: python fetch_movie_data.py <slug|search> <query> [max_results]")
+        print("Usage: python fetch_movie_data.py <slug|search> <query> [max_results] [--profile]")
+        print("       python fetch_movie_data.py slugs <slug> [slug ...] [--processes N] [--workers N]")
+        print("       python fetch_movie_data.py --batch [--workers N] < requests.ndjson")
         sys.exit(1)
     
     mode = sys.argv[1]
     
     if mode == "slug":
         slug = sys.argv[2] if len(sys.argv) > 2 else "v-for-vendetta"
-        data = fetch_movie_by_slug(slug)
-        print(json.dumps(data, indent=2, default=str))
+        with profiled('fetch_movie_data', profile):
+            data = fetch_movie_by_slug(slug)
+        print(json.dumps(data, indent=2, default=json_default))
+    elif mode == "slugs":
+        # Download on threads, parse on every core
+        from scripts.letterboxd.parse_pool import parse_films, PARSE_WORKERS, IO_WORKERS
+        with profiled('fetch_movie_data', profile):
+            results = parse_films(
+                sys.argv[2:],
+                io_workers=int(workers) if workers else IO_WORKERS,
+                parse_workers=int(processes) if processes else PARSE_WORKERS
+            )
+        print(json.dumps(results, indent=2, default=json_default))
     elif mode == "search":
         query = sys.argv[2] if len(sys.argv) > 2 else "V for Vendetta"
         max_results = int(sys.argv[3]) if len(sys.argv) > 3 else 5
-        results = search_movies(query, max_results)
-        print(json.dumps(results, indent=2, default=str))
+        with profiled('fetch_movie_data', profile):
+            results = search_movies(query, max_results)
+        print(json.dumps(results, indent=2, default=json_default))
     else:
-        print("Invalid mode. Use 'slug' or 'search'")
+        print("Invalid mode. Use 'slug', 'slugs' or 'search'")
         sys.exit(1)
 
@@ -4,6 +4,9 @@ Fetch Letterboxd average rating for a movie
 import sys
 import os
 import json
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Optional, Dict, Any
 
 # Add parent directory to path for imports
@@ -12,82 +15,274 @@ import scripts.letterboxd.compat
 
 from letterboxdpy.movie import Movie
 from letterboxdpy.search import Search
-from utils import extract_tmdb_id_from_url
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.film_cache import get_film_cache
+from scripts.letterboxd.title_index import local_tmdb_id
+from scripts.letterboxd.film_registry import lookup_film, is_fresh, record_film, rating_count_of
+from scripts.letterboxd.deadlines import DeadlineExceeded
+from scripts.letterboxd.rate_limit import request_lane, INTERACTIVE
+from scripts.letterboxd.utils import pop_flag, pop_option, extract_tmdb_id_from_url
+from scripts.letterboxd.batch_pipe import run_batch, parse_int, BATCH_WORKERS
+from scripts.letterboxd.profiling import profiled
 
-def get_letterboxd_rating(movie_title: str, movie_year: Optional[int] = None, tmdb_id: Optional[int] = None) -> Optional[float]:
+# Share one keep-alive session and revalidate film pages instead of re-downloading
+install_fetch_layer()
+
+HEDGE_ENABLED = os.getenv('LETTERBOXD_HEDGE', '0') == '1'
+HEDGE_DELAY = float(os.getenv('LETTERBOXD_HEDGE_DELAY_MS', '400')) / 1000
+
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='letterboxd-hedge')
+_hedge_stats = {
+    'lookups': 0,
+    'hedges_fired': 0,
+    'probe_won': 0,
+    'search_won': 0,
+}
+_hedge_lock = threading.Lock()
+
+
+def _bump_hedge(key: str) -> None:
+    with _hedge_lock:
+        _hedge_stats[key] += 1
+
+
+def get_hedge_stats() -> Dict[str, int]:
+    """Return how often hedged lookups fired the search and which path won"""
+    with _hedge_lock:
+        return dict(_hedge_stats)
+
+
+def guess_slug(movie_title: str) -> str:
+    """Letterboxd slugs are typically: title-lowercase-with-hyphens"""
+    return movie_title.lower().replace(' ', '-').replace("'", '').replace(':', '').replace('.', '').replace(',', '')
+
+
+def _search_movie(movie_title: str, movie_year: Optional[int] = None):
+    """
+    Find a film through Letterboxd search and fetch it
+    
+    Returns:
+        (Movie, slug) or (None, None) if nothing suitable was found
+    """
+    search_query = movie_title
+    if movie_year:
+        search_query += f" {movie_year}"
+    
+    search = Search(search_query, 'films')
+    results = search.get_results(max=5)
+    
+    if not results or len(results) == 0:
+        print(f"⚠️  No Letterboxd results found for: {movie_title}")
+        return None, None
+    
+    # Try to find the best match
+    best_match = None
+    for result in results:
+        result_title = str(result) if hasattr(result, '__str__') else str(result)
+        result_year = getattr(result, 'year', None)
+        
+        # Check if title matches (case-insensitive)
+        if result_title.lower() == movie_title.lower():
+            # If year matches or no year specified, this is likely the right one
+            if not movie_year or result_year == movie_year:
+                best_match = result
+                break
+    
+    # If no exact match, use first result
+    if not best_match:
+        best_match = results[0]
+        print(f"⚠️  Using first search result for: {movie_title} (may not be exact match)")
+    
+    # Get the movie slug
+    movie_slug = getattr(best_match, 'slug', None)
+    if not movie_slug:
+        print(f"⚠️  No slug found for: {movie_title}")
+        return None, None
+    
+    # Fetch the full movie data
+    return Movie(movie_slug), movie_slug
+
+
+def _find_movie_sequential(movie_title: str, movie_year: Optional[int]):
+    """Slug probe first; search only after the probe fails"""
+    potential_slug = guess_slug(movie_title)
+    try:
+        movie = Movie(potential_slug)
+        print(f"✅ Found movie by slug: {potential_slug}")
+        return movie, potential_slug
+    except DeadlineExceeded:
+        raise
+    except:
+        # Slug didn't work, try search
+        try:
+            return _search_movie(movie_title, movie_year)
+        except DeadlineExceeded:
+            raise
+        except Exception as search_error:
+            print(f"⚠️  Search failed: {search_error}")
+            return None, None
+
+
+def _find_movie_hedged(movie_title: str, movie_year: Optional[int], hedge_delay: float):
+    """
+    Slug probe, plus a search started if the probe hasn't answered within hedge_delay
+    
+    Whichever path produces a film first wins. A started request can't be
+    interrupted, so the losing future is cancelled if still queued and
+    otherwise left to finish with its result discarded.
+    """
+    _bump_hedge('lookups')
+    potential_slug = guess_slug(movie_title)
+    
+    def probe():
+        return Movie(potential_slug), potential_slug
+    
+    def search():
+        return _search_movie(movie_title, movie_year)
+    
+    # Pool threads don't inherit context; copy it so the caller's deadline applies
+    probe_future = _hedge_pool.submit(contextvars.copy_context().run, probe)
+    done, _ = wait([probe_future], timeout=hedge_delay)
+    
+    if probe_future in done and probe_future.exception() is None:
+        _bump_hedge('probe_won')
+        print(f"✅ Found movie by slug: {potential_slug}")
+        return probe_future.result()
+    
+    if probe_future not in done:
+        _bump_hedge('hedges_fired')
+    search_future = _hedge_pool.submit(contextvars.copy_context().run, search)
+    pending = {probe_future, search_future} - set(done)
+    
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                if future is search_future:
+                    print(f"⚠️  Search failed: {future.exception()}")
+                continue
+            movie, slug = future.result()
+            if movie is None:
+                continue
+            for other in pending:
+                other.cancel()
+            if future is probe_future:
+                _bump_hedge('probe_won')
+                print(f"✅ Found movie by slug: {slug}")
+            else:
+                _bump_hedge('search_won')
+            return movie, slug
+    
+    return None, None
+
+
+def _search_for_tmdb_id(movie_title: str, movie_year: Optional[int], tmdb_id: int, rejected_slug: Optional[str]):
+    """
+    Search for a film whose page turned out to be a different TMDB film
+
+    Guessed slugs ignore the year and known slugs can go stale, so a remake or
+    an older film with the same title lands on the wrong page; the search
+    (which includes the year) is the fallback.
+
+    Returns:
+        (Movie, slug) only if the result's page links to tmdb_id, else (None, None)
+    """
+    try:
+        movie, movie_slug = _search_movie(movie_title, movie_year)
+    except DeadlineExceeded:
+        raise
+    except Exception as search_error:
+        print(f"⚠️  Search failed: {search_error}")
+        return None, None
+    if not movie or movie_slug == rejected_slug:
+        return None, None
+    page_tmdb_id = extract_tmdb_id_from_url(getattr(movie, 'tmdb_link', None))
+    if page_tmdb_id != tmdb_id:
+        print(f"⚠️  Search result {movie_slug} is TMDB ID {page_tmdb_id}, not {tmdb_id}")
+        return None, None
+    return movie, movie_slug
+
+
+def get_letterboxd_rating(movie_title: str, movie_year: Optional[int] = None, tmdb_id: Optional[int] = None,
+                          hedge: Optional[bool] = None, hedge_delay: Optional[float] = None,
+                          use_cache: bool = True, slug: Optional[str] = None,
+                          use_registry: bool = True) -> Optional[float]:
     """
     Get Letterboxd average rating for a movie
     
     Args:
         movie_title: Movie title
         movie_year: Optional release year
-        tmdb_id: Optional TMDB ID (can be used to find Letterboxd slug)
+        tmdb_id: Optional TMDB ID (can be used to find Letterboxd slug); when
+            omitted, an exact title/year match from the offline title index is used
+        hedge: Race the slug probe against a delayed search instead of running
+            them in sequence (defaults to LETTERBOXD_HEDGE=1)
+        hedge_delay: Seconds to wait on the probe before starting the search
+            (defaults to LETTERBOXD_HEDGE_DELAY_MS / 1000)
+        use_cache: Answer from the local film cache or the platform film
+            registry when their rating is fresh, and probe a known slug before
+            guessing or searching; new ratings are written back to both
+        slug: Known Letterboxd slug, probed before any cached slug, guess or search
+        use_registry: Look the film up in the platform registry; callers that
+            already did (batch_fetch_ratings.py) pass False and its slug as slug
     
     Returns:
         Letterboxd average rating (0-5 scale) or None if not found
     """
     try:
-        # Try to construct a slug from the title first (common pattern)
-        # Letterboxd slugs are typically: title-lowercase-with-hyphens
-        potential_slug = movie_title.lower().replace(' ', '-').replace("'", '').replace(':', '').replace('.', '').replace(',', '')
+        if use_cache and not tmdb_id:
+            # An exact offline title/year match lets the TMDB-keyed caches answer
+            tmdb_id = local_tmdb_id(movie_title, movie_year)
+        cache = get_film_cache() if use_cache else None
+        cached = cache.get(tmdb_id, movie_title, movie_year) if cache else None
+        if cached and cached['fresh']:
+            print(f"✅ Cached Letterboxd rating for {movie_title}: {cached['rating']}/5")
+            return cached['rating']
         
-        # Try direct slug access first
-        movie = None
-        movie_slug = None
+        known_slug = slug or (cached['slug'] if cached else None)
+        if use_cache and use_registry and tmdb_id:
+            # Another run (or another machine) may already have fetched this film
+            registered = lookup_film(tmdb_id)
+            if is_fresh(registered):
+                rating_float = float(registered['rating'])
+                cache.put(tmdb_id, movie_title, movie_year, registered.get('slug'), rating_float)
+                print(f"✅ Registry Letterboxd rating for {movie_title}: {rating_float}/5")
+                return rating_float
+            if registered and registered.get('slug'):
+                known_slug = known_slug or registered['slug']
         
-        try:
-            movie = Movie(potential_slug)
-            # If this works, we found it
-            movie_slug = potential_slug
-            print(f"✅ Found movie by slug: {potential_slug}")
-        except:
-            # Slug didn't work, try search
+        movie, movie_slug = None, None
+        if known_slug:
+            # A known slug skips both the guess and the search
             try:
-                search_query = movie_title
-                if movie_year:
-                    search_query += f" {movie_year}"
-                
-                search = Search(search_query, 'films')
-                results = search.get_results(max=5)
-                
-                if not results or len(results) == 0:
-                    print(f"⚠️  No Letterboxd results found for: {movie_title}")
-                    return None
-                
-                # Try to find the best match
-                best_match = None
-                for result in results:
-                    result_title = str(result) if hasattr(result, '__str__') else str(result)
-                    result_year = getattr(result, 'year', None)
-                    
-                    # Check if title matches (case-insensitive)
-                    if result_title.lower() == movie_title.lower():
-                        # If year matches or no year specified, this is likely the right one
-                        if not movie_year or result_year == movie_year:
-                            best_match = result
-                            break
-                
-                # If no exact match, use first result
-                if not best_match:
-                    best_match = results[0]
-                    print(f"⚠️  Using first search result for: {movie_title} (may not be exact match)")
-                
-                # Get the movie slug
-                movie_slug = getattr(best_match, 'slug', None)
-                if not movie_slug:
-                    print(f"⚠️  No slug found for: {movie_title}")
-                    return None
-                
-                # Fetch the full movie data
-                movie = Movie(movie_slug)
-            except Exception as search_error:
-                print(f"⚠️  Search failed: {search_error}")
-                return None
+                movie, movie_slug = Movie(known_slug), known_slug
+            except Exception:
+                movie, movie_slug = None, None
+
+        if not movie:
+            use_hedge = HEDGE_ENABLED if hedge is None else hedge
+            if use_hedge:
+                movie, movie_slug = _find_movie_hedged(
+                    movie_title, movie_year, HEDGE_DELAY if hedge_delay is None else hedge_delay
+                )
+            else:
+                movie, movie_slug = _find_movie_sequential(movie_title, movie_year)
         
         if not movie:
             print(f"⚠️  Could not fetch movie data for: {movie_title}")
             return None
         
+        # The film page's own TMDB link decides which film this is; a known or
+        # guessed slug may point at a remake or an older film with the same title
+        page_tmdb_id = extract_tmdb_id_from_url(getattr(movie, 'tmdb_link', None))
+        if tmdb_id and page_tmdb_id and page_tmdb_id != tmdb_id:
+            print(f"⚠️  {movie_slug} is TMDB ID {page_tmdb_id}, not {tmdb_id}; searching for {movie_title} instead")
+            movie, movie_slug = _search_for_tmdb_id(movie_title, movie_year, tmdb_id, movie_slug)
+            if not movie:
+                print(f"⚠️  No Letterboxd page found for TMDB ID {tmdb_id} ({movie_title})")
+                return None
+            page_tmdb_id = tmdb_id
+        
         # Get the rating
         # Letterboxd ratings are typically in the rating attribute
         rating = getattr(movie, 'rating', None)
@@ -105,6 +300,12 @@ def get_letterboxd_rating(movie_title: str, movie_year: Optional[int] = None, tm
                 # Letterboxd uses 0-5 scale
                 if 0 <= rating_float <= 5:
                     print(f"✅ Found Letterboxd rating for {movie_title}: {rating_float}/5")
+                    if cache:
+                        # Without a TMDB link on the page, only the title/year cache key is written
+                        record_film(
+                            page_tmdb_id, movie_title, movie_year,
+                            movie_slug, rating_float, rating_count_of(movie)
+                        )
                     return rating_float
                 else:
                     print(f"⚠️  Invalid rating value for {movie_title}: {rating_float}")
@@ -114,22 +315,62 @@ def get_letterboxd_rating(movie_title: str, movie_year: Optional[int] = None, tm
         print(f"⚠️  No rating found for: {movie_title}")
         return None
         
+    except DeadlineExceeded:
+        print(f"⏱️  Deadline reached while fetching Letterboxd rating for {movie_title}")
+        return None
     except Exception as e:
         print(f"❌ Error fetching Letterboxd rating for {movie_title}: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+def rate_request(request: Dict[str, Any], hedge: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Answer one --batch request: {"id", "title", "year", "tmdb_id"} or {"id", "slug"}
+    
+    Requests are live lookups, so they go through the interactive lane.
+    """
+    title, slug = request.get('title'), request.get('slug')
+    if not title and not slug:
+        return {'rating': None, 'error': 'title or slug required'}
+    with request_lane(INTERACTIVE):
+        rating = get_letterboxd_rating(
+            title or slug, parse_int(request.get('year')), parse_int(request.get('tmdb_id')),
+            hedge=hedge, slug=slug
+        )
+    if rating is None:
+        return {'rating': None, 'error': 'Rating not found'}
+    return {'rating': rating, 'scale': '0-5'}
+
 if __name__ == "__main__":
+    profile = pop_flag(sys.argv, '--profile')
+    hedge = pop_flag(sys.argv, '--hedge') or None
+    batch = pop_flag(sys.argv, '--batch')
+    workers = pop_option(sys.argv, '--workers')
+    
+    if batch:
+        # NDJSON requests on stdin, NDJSON results on stdout in completion order
+        with profiled('fetch_movie_rating', profile):
+            run_batch(
+                lambda request: rate_request(request, hedge),
+                workers=int(workers) if workers else BATCH_WORKERS
+            )
+        sys.exit(0)
+    
     if len(sys.argv) < 2:
-        print("Usage: python fetch_movie_rating.py <movie_title> [year] [tmdb_id]")
+        print("Usage: python fetch_movie_rating.py <movie_title> [year] [tmdb_id] [--hedge] [--profile]")
+        print("       python fetch_movie_rating.py --batch [--workers N] < requests.ndjson")
         sys.exit(1)
     
     movie_title = sys.argv[1]
     movie_year = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None
     tmdb_id = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else None
     
-    rating = get_letterboxd_rating(movie_title, movie_year, tmdb_id)
+    with profiled('fetch_movie_rating', profile), request_lane(INTERACTIVE):
+        rating = get_letterboxd_rating(movie_title, movie_year, tmdb_id, hedge=hedge)
+    
+    if hedge:
+        print(f"🏁 Hedge stats: {get_hedge_stats()}", file=sys.stderr)
     
     if rating is not None:
         print(json.dumps({"rating": rating, "scale": "0-5"}))
@@ -10,7 +10,59 @@ import scripts.letterboxd.compat
 from letterboxdpy.user import User
 import json
 import sys
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.utils import pop_flag, pop_option
+from scripts.letterboxd.film_record import FilmRecord, json_default, WATCHLIST_KEYS, DIARY_KEYS
+from scripts.letterboxd.session import report_connection_stats
+from scripts.letterboxd.profiling import profiled
+
+# Share one keep-alive session across every profile/watchlist/diary page load
+install_fetch_layer()
+
+# Players fetched at once in bulk mode; every worker shares the session above
+IMPORT_WORKERS = int(os.getenv('LETTERBOXD_IMPORT_WORKERS', '4'))
+
+def _profile_from_user(user, username: str) -> Dict[str, Any]:
+    """Profile fields of an already-loaded User"""
+    user_data = {
+        'username': username,
+        'display_name': str(user),
+        'profile': {}
+    }
+    
+    # Try to get additional user attributes
+    if hasattr(user, 'watched_count'):
+        user_data['watched_count'] = user.watched_count
+    if hasattr(user, 'watchlist_count'):
+        user_data['watchlist_count'] = user.watchlist_count
+    if hasattr(user, 'likes_count'):
+        user_data['likes_count'] = user.likes_count
+    if hasattr(user, 'lists_count'):
+        user_data['lists_count'] = user.lists_count
+    
+    # Get user profile data
+    if hasattr(user, 'profile'):
+        user_data['profile'] = user.profile
+    
+    return user_data
+
+def _watchlist_from_user(user, max_films: Optional[int] = None) -> list:
+    """Watchlist films of an already-loaded User"""
+    if not hasattr(user, 'watchlist'):
+        return []
+    
+    watchlist = user.watchlist
+    if isinstance(watchlist, list):
+        films = watchlist[:max_films] if max_films else watchlist
+    elif hasattr(watchlist, '__iter__'):
+        films = list(watchlist)[:max_films] if max_films else list(watchlist)
+    else:
+        films = []
+    
+    return [FilmRecord.from_letterboxd(film, WATCHLIST_KEYS) for film in films]
 
 def fetch_user_data(username: str) -> Dict[str, Any]:
     """
@@ -24,26 +76,7 @@ def fetch_user_data(username: str) -> Dict[str, Any]:
     """
     try:
         user = User(username)
-        
-        user_data = {
-            'username': username,
-            'display_name': str(user),
-            'profile': {}
-        }
-        
-        # Try to get additional user attributes
-        if hasattr(user, 'watched_count'):
-            user_data['watched_count'] = user.watched_count
-        if hasattr(user, 'watchlist_count'):
-            user_data['watchlist_count'] = user.watchlist_count
-        if hasattr(user, 'likes_count'):
-            user_data['likes_count'] = user.likes_count
-        if hasattr(user, 'lists_count'):
-            user_data['lists_count'] = user.lists_count
-        
-        # Get user profile data
-        if hasattr(user, 'profile'):
-            user_data['profile'] = user.profile
+        user_data = _profile_from_user(user, username)
         
         print(f"✅ Fetched data for user: {username}")
         return user_data
@@ -68,29 +101,9 @@ def fetch_user_watchlist(username: str, max_films: Optional[int] = None) -> Dict
         
         watchlist_data = {
             'username': username,
-            'watchlist': []
+            'watchlist': _watchlist_from_user(user, max_films)
         }
         
-        # Get watchlist
-        if hasattr(user, 'watchlist'):
-            watchlist = user.watchlist
-            
-            if isinstance(watchlist, list):
-                films = watchlist[:max_films] if max_films else watchlist
-            elif hasattr(watchlist, '__iter__'):
-                films = list(watchlist)[:max_films] if max_films else list(watchlist)
-            else:
-                films = []
-            
-            for film in films:
-                film_data = {
-                    'title': str(film) if hasattr(film, '__str__') else film,
-                    'slug': getattr(film, 'slug', None),
-                    'tmdb_link': getattr(film, 'tmdb_link', None),
-                    'year': getattr(film, 'year', None)
-                }
-                watchlist_data['watchlist'].append(film_data)
-        
         print(f"✅ Fetched watchlist for user: {username} ({len(watchlist_data['watchlist'])} films)")
         return watchlist_data
         
@@ -128,16 +141,7 @@ def fetch_user_diary(username: str, max_entries: Optional[int] = None) -> Dict[s
             else:
                 entries = []
             
-            for entry in entries:
-                entry_data = {
-                    'title': str(entry) if hasattr(entry, '__str__') else entry,
-                    'slug': getattr(entry, 'slug', None),
-                    'tmdb_link': getattr(entry, 'tmdb_link', None),
-                    'year': getattr(entry, 'year', None),
-                    'watched_date': getattr(entry, 'watched_date', None),
-                    'rating': getattr(entry, 'rating', None)
-                }
-                diary_data['diary'].append(entry_data)
+            diary_data['diary'] = [FilmRecord.from_letterboxd(entry, DIARY_KEYS) for entry in entries]
         
         print(f"✅ Fetched diary for user: {username} ({len(diary_data['diary'])} entries)")
         return diary_data
@@ -146,9 +150,114 @@ def fetch_user_diary(username: str, max_entries: Optional[int] = None) -> Dict[s
         print(f"❌ Error fetching diary: {e}")
         raise
 
+def fetch_players(usernames: List[str], max_films: Optional[int] = None,
+                  max_workers: int = IMPORT_WORKERS, resolve: bool = True) -> Dict[str, Any]:
+    """
+    Fetch profiles and watchlists for a whole league at once
+    
+    Each player's User is built once and used for both profile and watchlist.
+    Players are fetched concurrently (at most max_workers at a time) over the
+    shared session. Films are merged across players by slug, so a film on ten
+    watchlists is resolved to a TMDB id once.
+    
+    Args:
+        usernames: Letterboxd usernames (duplicates and case variants are merged)
+        max_films: Maximum watchlist films per player (None for all)
+        max_workers: Players fetched concurrently
+        resolve: Look up TMDB ids for films whose Letterboxd entry has no TMDB link
+    
+    Returns:
+        Dictionary with players (profile plus watchlist slugs), films (each with
+        the players whose watchlist it is on) and errors by username
+    """
+    unique: List[str] = []
+    for username in usernames:
+        if username and username.lower() not in {u.lower() for u in unique}:
+            unique.append(username)
+    
+    def load(username: str) -> Dict[str, Any]:
+        user = User(username)
+        player = _profile_from_user(user, username)
+        player['watchlist'] = _watchlist_from_user(user, max_films)
+        return player
+    
+    players: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    print(f"📥 Importing {len(unique)} players ({max_workers} at a time)...")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {username: pool.submit(load, username) for username in unique}
+        for username, future in futures.items():
+            try:
+                players.append(future.result())
+                print(f"✅ {username}: {len(players[-1]['watchlist'])} watchlist films")
+            except Exception as e:
+                print(f"❌ {username}: {e}")
+                errors[username] = str(e)
+    
+    films: Dict[str, Dict[str, Any]] = {}
+    for player in players:
+        slugs = []
+        for film in player.pop('watchlist'):
+            key = film.get('slug') or f"{film.get('title')}|{film.get('year')}"
+            slugs.append(key)
+            merged = films.setdefault(key, {
+                'slug': film.get('slug'),
+                'title': film.get('title'),
+                'year': film.get('year'),
+                'tmdb_id': film.tmdb_id,
+                'players': [],
+            })
+            merged['players'].append(player['username'])
+        player['watchlist'] = slugs
+    
+    unresolved = [f for f in films.values() if f['tmdb_id'] is None and f['title']]
+    if resolve and unresolved:
+        from scripts.letterboxd.tmdb_resolver import resolve_tmdb_ids
+        resolved = resolve_tmdb_ids((str(f['title']), f['year']) for f in unresolved)
+        for film in unresolved:
+            film['tmdb_id'] = resolved.get((str(film['title']), film['year']))
+    
+    shared = sum(1 for f in films.values() if len(f['players']) > 1)
+    print(f"✅ Imported {len(players)}/{len(unique)} players: {len(films)} distinct films ({shared} on several watchlists)")
+    return {
+        'players': players,
+        'films': list(films.values()),
+        'errors': errors
+    }
+
 if __name__ == "__main__":
+    profile = pop_flag(sys.argv, '--profile')
+    export_path = pop_option(sys.argv, '--export')
+    bulk = pop_flag(sys.argv, '--bulk')
+    
+    if bulk:
+        output_path = pop_option(sys.argv, '--output')
+        max_films = pop_option(sys.argv, '--max-films')
+        workers = pop_option(sys.argv, '--workers')
+        no_resolve = pop_flag(sys.argv, '--no-resolve')
+        usernames = [u for arg in sys.argv[1:] for u in arg.split(',') if u]
+        if not usernames:
+            print("Usage: python fetch_user_data.py --bulk <username> [username ...] [--max-films N] [--workers N] [--no-resolve] [--output league.json] [--profile]")
+            sys.exit(1)
+        with profiled('fetch_user_data', profile):
+            data = fetch_players(
+                usernames,
+                max_films=int(max_films) if max_films else None,
+                max_workers=int(workers) if workers else IMPORT_WORKERS,
+                resolve=not no_resolve
+            )
+        report_connection_stats()
+        if output_path:
+            with open(output_path, 'w') as f:
+                json.dump(data, f, indent=2, default=json_default)
+            print(f"💾 Wrote {output_path}")
+        else:
+            print(json.dumps(data, indent=2, default=json_default))
+        sys.exit(1 if data['errors'] and not data['players'] else 0)
+    
     if len(sys.argv) < 2:
-        print("Usage: python fetch_user_data.py <username> [watchlist|diary|profile] [max_count]")
+        print("Usage: python fetch_user_data.py <username> [watchlist|diary|profile] [max_count] [--export out.parquet|out.arrow] [--profile]")
+        print("       python fetch_user_data.py --bulk <username> [username ...] [--output league.json]")
         sys.exit(1)
     
     username = sys.argv[1]
@@ -156,14 +265,19 @@ if __name__ == "__main__":
     max_count = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     try:
-        if mode == "watchlist":
-            data = fetch_user_watchlist(username, max_count)
-        elif mode == "diary":
-            data = fetch_user_diary(username, max_count)
-        else:
-            data = fetch_user_data(username)
+        with profiled('fetch_user_data', profile):
+            if mode == "watchlist":
+                data = fetch_user_watchlist(username, max_count)
+            elif mode == "diary":
+                data = fetch_user_diary(username, max_count)
+            else:
+                data = fetch_user_data(username)
         
-        print(json.dumps(data, indent=2, default=str))
+        if export_path and mode in ("watchlist", "diary"):
+            from scripts.letterboxd.export_columnar import films_to_table, write_table
+            write_table(films_to_table(data[mode], mode, username), export_path)
+        else:
+            print(json.dumps(data, indent=2, default=json_default))
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
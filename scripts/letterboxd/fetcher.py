@@ -0,0 +1,301 @@
+"""
+HTTP fetch layer for Letterboxd pages (shared session + conditional requests)
+"""
+import os
+import atexit
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any
+
+import requests
+
+from scripts.letterboxd.session import http_get
+
+CACHE_DIR = os.getenv('LETTERBOXD_CACHE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache'
+)
+
+DEFAULT_HEADERS = {
+    'referer': 'https://letterboxd.com',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+}
+
+_stats = {
+    'requests': 0,
+    'not_modified': 0,
+    'full': 0,
+    'bytes_downloaded': 0,
+    'throttled': 0,
+}
+_stats_lock = threading.Lock()
+_installed = False
+
+CONDITIONAL_FETCH = os.getenv('LETTERBOXD_CONDITIONAL_FETCH', '1') != '0'
+# Weight of a new sample in the recorded latency mean once 1/samples drops below it
+LATENCY_WEIGHT = 0.05
+# Request times summed in memory before they are written to the latency table
+LATENCY_FLUSH_EVERY = int(os.getenv('LETTERBOXD_LATENCY_FLUSH_EVERY', '50'))
+
+
+class PageFetchError(Exception):
+    """Raised when Letterboxd returns something other than 200/304"""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.url = url
+        self.status_code = status_code
+
+
+class PageCache:
+    """
+    SQLite store of page bodies and their HTTP validators (ETag / Last-Modified)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.path.join(CACHE_DIR, 'pages.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' body BLOB NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        # Running mean request time per page kind, read by the --dry-run planner
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS latency ('
+            ' kind TEXT PRIMARY KEY,'
+            ' samples INTEGER NOT NULL,'
+            ' mean_seconds REAL NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        # kind → [samples, total seconds] not yet written
+        self._pending_latency: Dict[str, list] = {}
+        atexit.register(self.flush_latency)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored page
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Dict with etag, last_modified, body and fetched_at, or None if not stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, body, fetched_at FROM pages WHERE url = ?',
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'body': zlib.decompress(row[2]).decode('utf-8'),
+            'fetched_at': row[3],
+        }
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a page body together with its validators"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (url, etag, last_modified, zlib.compress(body.encode('utf-8')), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark a stored page as revalidated now"""
+        with self._lock:
+            self._conn.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+
+    def record_latency(self, kind: str, seconds: float) -> None:
+        """
+        Add one request time to the in-memory totals for its kind
+
+        Totals are written every LATENCY_FLUSH_EVERY samples and at exit, so a
+        fetch doesn't cost a SQLite write.
+        """
+        with self._lock:
+            pending = self._pending_latency.setdefault(kind, [0, 0.0])
+            pending[0] += 1
+            pending[1] += seconds
+            if sum(count for count, _ in self._pending_latency.values()) >= LATENCY_FLUSH_EVERY:
+                self._write_latency()
+
+    def flush_latency(self) -> None:
+        """Write the pending request times to the latency table"""
+        with self._lock:
+            self._write_latency()
+
+    def _write_latency(self) -> None:
+        """
+        Fold pending totals into each kind's mean (exponentially weighted once
+        warmed up); each pending sample counts as its batch's mean. Caller holds _lock.
+        """
+        if not self._pending_latency:
+            return
+        now = time.time()
+        for kind, (count, total) in self._pending_latency.items():
+            row = self._conn.execute(
+                'SELECT samples, mean_seconds FROM latency WHERE kind = ?', (kind,)
+            ).fetchone()
+            samples, mean = row if row else (0, 0.0)
+            batch_mean = total / count
+            for _ in range(count):
+                samples += 1
+                mean += (batch_mean - mean) * max(1.0 / samples, LATENCY_WEIGHT)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO latency (kind, samples, mean_seconds, updated_at) VALUES (?, ?, ?, ?)',
+                (kind, samples, mean, now)
+            )
+        self._conn.commit()
+        self._pending_latency.clear()
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Recorded request times: kind → {samples, mean_seconds}"""
+        with self._lock:
+            self._write_latency()
+            rows = self._conn.execute('SELECT kind, samples, mean_seconds FROM latency').fetchall()
+        return {kind: {'samples': samples, 'mean_seconds': mean} for kind, samples, mean in rows}
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    """Return the process-wide page cache, creating it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+        return _cache
+
+
+def _bump(key: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def get_fetch_stats() -> Dict[str, int]:
+    """Return a snapshot of fetch counters for this process"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def page_kind(url: str) -> str:
+    """Latency bucket for a Letterboxd URL: search, list, film or other"""
+    if '/search/' in url:
+        return 'search'
+    if '/list/' in url or '/watchlist/' in url:
+        return 'list'
+    if '/film/' in url:
+        return 'film'
+    return 'other'
+
+
+def fetch_html(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+    """
+    Fetch a page, revalidating any stored copy with a conditional request
+
+    Each request first waits for a token from the host-wide budget (rate_limit.py).
+
+    Args:
+        url: Page URL
+        headers: Optional request headers (defaults to a browser-like set)
+
+    Returns:
+        Page HTML, served from the stored copy when the server answers 304
+    """
+    cache = get_page_cache() if CONDITIONAL_FETCH else None
+    cached = cache.get(url) if cache else None
+
+    request_headers = dict(headers or DEFAULT_HEADERS)
+    if cached:
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            request_headers['If-Modified-Since'] = cached['last_modified']
+
+    # Imported here: rate_limit keeps its bucket file in CACHE_DIR
+    from scripts.letterboxd.rate_limit import acquire_request_token
+    if acquire_request_token():
+        _bump('throttled')
+
+    started = time.monotonic()
+    response = http_get(url, headers=request_headers)
+    _bump('requests')
+    if cache:
+        cache.record_latency(page_kind(url), time.monotonic() - started)
+
+    if response.status_code == 304 and cached:
+        _bump('not_modified')
+        cache.touch(url)
+        return cached['body']
+
+    if response.status_code != 200:
+        raise PageFetchError(url, response.status_code)
+
+    body = response.text
+    _bump('full')
+    _bump('bytes_downloaded', len(response.content))
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if cache and (etag or last_modified):
+        cache.put(url, body, etag, last_modified)
+
+    return body
+
+
+def install_fetch_layer() -> bool:
+    """
+    Route letterboxdpy page loads through fetch_html
+
+    letterboxdpy fetches every page via Scraper.get_page, so patching that one
+    classmethod covers Movie, Search, List and User: they all share one
+    keep-alive session and revalidate stored pages. Set
+    LETTERBOXD_CONDITIONAL_FETCH=0 to skip the page cache.
+
+    Returns:
+        True if the hook is active
+    """
+    global _installed
+    if _installed:
+        return True
+
+    try:
+        from bs4 import BeautifulSoup
+        from letterboxdpy.core.scraper import Scraper
+    except ImportError:
+        return False
+
+    try:
+        from letterboxdpy.core.exceptions import PageLoadError
+    except ImportError:
+        PageLoadError = None
+
+    def get_page(cls, url: str):
+        try:
+            html = fetch_html(url, headers=getattr(cls, 'headers', None))
+        except (PageFetchError, requests.RequestException) as e:
+            if PageLoadError is not None:
+                raise PageLoadError(url, str(e))
+            raise
+        return BeautifulSoup(html, getattr(cls, 'builder', 'lxml'))
+
+    Scraper.get_page = classmethod(get_page)
+    _installed = True
+    return True
@@ -0,0 +1,110 @@
+"""
+Local film cache: Letterboxd slug and rating per film, keyed by TMDB id and by title/year
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from scripts.letterboxd.fetcher import CACHE_DIR
+from scripts.letterboxd.utils import normalize_title
+
+# How long a cached rating counts as fresh (hours); 0 disables rating hits
+RATING_TTL_SECONDS = float(os.getenv('LETTERBOXD_RATING_CACHE_TTL_HOURS', '24')) * 3600
+
+
+def _keys(tmdb_id: Optional[int], title: Optional[str], year: Optional[int]) -> List[str]:
+    keys = []
+    if tmdb_id:
+        keys.append(f"tmdb:{int(tmdb_id)}")
+    if title:
+        keys.append(f"title:{normalize_title(title)}|{year or ''}")
+    return keys
+
+
+class FilmCache:
+    """
+    SQLite cache of (slug, rating, fetched_at) per film
+
+    Each film is stored under a TMDB key and a normalized title/year key, so
+    lookups hit whether or not the caller knows the TMDB id.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.path.join(CACHE_DIR, 'films.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS films ('
+            ' key TEXT PRIMARY KEY,'
+            ' tmdb_id INTEGER,'
+            ' slug TEXT,'
+            ' rating REAL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, tmdb_id: Optional[int] = None, title: Optional[str] = None,
+            year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a film by TMDB id first, then by title/year
+
+        Returns:
+            Dict with tmdb_id, slug, rating, fetched_at and fresh, or None
+        """
+        with self._lock:
+            for key in _keys(tmdb_id, title, year):
+                row = self._conn.execute(
+                    'SELECT tmdb_id, slug, rating, fetched_at FROM films WHERE key = ?', (key,)
+                ).fetchone()
+                if row:
+                    return {
+                        'tmdb_id': row[0],
+                        'slug': row[1],
+                        'rating': row[2],
+                        'fetched_at': row[3],
+                        'fresh': row[2] is not None and time.time() - row[3] < RATING_TTL_SECONDS,
+                    }
+        return None
+
+    def put(self, tmdb_id: Optional[int], title: Optional[str], year: Optional[int],
+            slug: Optional[str], rating: Optional[float]) -> None:
+        """Store a film under every key it can be looked up by"""
+        now = time.time()
+        rows = [(key, tmdb_id, slug, rating, now) for key in _keys(tmdb_id, title, year)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO films (key, tmdb_id, slug, rating, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+
+    def known_titles(self) -> List[Tuple[str, Optional[int], int]]:
+        """(normalized title, year, tmdb_id) for every cached film with both"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, tmdb_id FROM films WHERE key LIKE 'title:%' AND tmdb_id IS NOT NULL"
+            ).fetchall()
+        titles = []
+        for key, tmdb_id in rows:
+            title, _, year = key[len('title:'):].rpartition('|')
+            titles.append((title, int(year) if year.isdigit() else None, tmdb_id))
+        return titles
+
+
+_cache: Optional[FilmCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_film_cache() -> FilmCache:
+    """Return the process-wide film cache, creating it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FilmCache()
+        return _cache
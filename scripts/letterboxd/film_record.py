@@ -0,0 +1,262 @@
+"""
+Compact film record shared by the list, watchlist, diary, search and film fetchers
+"""
+import sys
+import os
+import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.utils import extract_tmdb_id_from_url
+
+_UNSET = object()
+# Links of this exact shape are stored as just the TMDB id and rebuilt on read
+TMDB_MOVIE_PREFIX = 'https://www.themoviedb.org/movie/'
+
+# Genre dicts repeat across thousands of films; every film shares one object per genre
+_shared_genres: Dict[Tuple, Any] = {}
+
+# Keys, in order, that each fetcher emitted as a dict before FilmRecord; a
+# record reads and serializes as exactly its fetcher's keys, None values included
+LIST_KEYS = ('title', 'slug', 'tmdb_link', 'tmdb_id', 'year', 'director', 'rating')
+WATCHLIST_KEYS = ('title', 'slug', 'tmdb_link', 'year')
+DIARY_KEYS = ('title', 'slug', 'tmdb_link', 'year', 'watched_date', 'rating')
+SEARCH_KEYS = ('title', 'slug', 'tmdb_link', 'tmdb_id', 'year')
+MOVIE_KEYS = ('slug', 'title', 'tmdb_link', 'tmdb_id', 'year', 'director', 'runtime', 'rating',
+              'description', 'genres', 'poster')
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _shared_genre(genre: Any) -> Any:
+    if isinstance(genre, str):
+        return sys.intern(genre)
+    if isinstance(genre, dict) and all(isinstance(v, str) for v in genre.values()):
+        key = tuple(sorted(genre.items()))
+        shared = _shared_genres.get(key)
+        if shared is None:
+            shared = _shared_genres[key] = {k: sys.intern(v) for k, v in genre.items()}
+        return shared
+    return genre
+
+
+def _compact_director(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return tuple(_intern(v) for v in value)
+    return _intern(value)
+
+
+def _compact_date(value: Any) -> Any:
+    # Diary dates arrive as {'year', 'month', 'day'} dicts of ints; a date is a fraction
+    # of the size and _date_dict rebuilds the same dict. Any other shape is kept as is.
+    if isinstance(value, dict) and set(value) == {'year', 'month', 'day'} \
+            and all(type(v) is int for v in value.values()):
+        try:
+            return datetime.date(value['year'], value['month'], value['day'])
+        except ValueError:
+            return value
+    return value
+
+
+def _date_dict(value: Any) -> Any:
+    if type(value) is datetime.date:
+        return {'year': value.year, 'month': value.month, 'day': value.day}
+    return value
+
+
+class FilmRecord:
+    """
+    One film as the fetch scripts return it
+
+    Reads like the dicts they used to build (record['slug'], record.get('rating'),
+    'tmdb_id' in record) but stores fields in slots. Repeated values (directors,
+    genres) are interned or shared. A canonical TMDB link is kept only as its id
+    and rebuilt when read; any other link is kept as is and its tmdb_id is
+    derived on first read. Diary dates are stored as datetime.date.
+
+    The mapping interface and to_dict() follow the record's keys (one of the
+    *_KEYS tuples above), so each fetcher emits the same keys, None values and
+    formats as its old dict: diary dates come back as {year, month, day} and
+    year is left as letterboxdpy gave it. Attributes (record.tmdb_id,
+    record.release_year) are available whatever the keys.
+    """
+
+    __slots__ = (
+        'slug', 'title', 'year', '_tmdb_link', '_tmdb_id', 'director', 'rating',
+        'watched_date', 'runtime', 'description', 'genres', 'poster', '_keys',
+    )
+
+    CORE_FIELDS = ('title', 'slug', 'tmdb_link', 'tmdb_id', 'year')
+    OPTIONAL_FIELDS = ('director', 'rating', 'watched_date', 'runtime', 'description', 'genres', 'poster')
+    ALL_KEYS = CORE_FIELDS + OPTIONAL_FIELDS
+
+    def __init__(self, slug: Optional[str] = None, title: Any = None, year: Any = None,
+                 tmdb_link: Optional[str] = None, tmdb_id: Any = _UNSET, director: Any = None,
+                 rating: Any = None, watched_date: Any = None, runtime: Any = None,
+                 description: Optional[str] = None, genres: Any = None, poster: Optional[str] = None,
+                 keys: Tuple[str, ...] = ALL_KEYS):
+        self.slug = slug
+        self.title = title
+        self.year = _intern(year)
+        self._tmdb_link = tmdb_link
+        self._tmdb_id = tmdb_id
+        if tmdb_link and tmdb_id is _UNSET and tmdb_link.startswith(TMDB_MOVIE_PREFIX) and tmdb_link.endswith('/'):
+            number = tmdb_link[len(TMDB_MOVIE_PREFIX):-1]
+            if number.isdigit():
+                self._tmdb_link, self._tmdb_id = None, int(number)
+        self.director = _compact_director(director)
+        self.rating = rating
+        self.watched_date = _compact_date(watched_date)
+        self.runtime = runtime
+        self.description = description
+        self.genres = tuple(_shared_genre(g) for g in genres) if isinstance(genres, (list, tuple)) else genres
+        self.poster = poster
+        self._keys = keys
+
+    @classmethod
+    def from_letterboxd(cls, obj: Any, keys: Tuple[str, ...] = ALL_KEYS) -> 'FilmRecord':
+        """
+        Build a record from any letterboxdpy film-like object
+
+        Args:
+            obj: Movie, list/watchlist film, diary entry or search result
+            keys: The fetcher's keys (e.g. LIST_KEYS); the optional fields among them are read too
+        """
+        extras = {name: getattr(obj, name, None) for name in keys if name in cls.OPTIONAL_FIELDS}
+        return cls(
+            slug=getattr(obj, 'slug', None),
+            title=str(obj) if hasattr(obj, '__str__') else obj,
+            year=getattr(obj, 'year', None),
+            tmdb_link=getattr(obj, 'tmdb_link', None),
+            keys=keys,
+            **extras
+        )
+
+    @property
+    def tmdb_link(self) -> Optional[str]:
+        if self._tmdb_link is None and isinstance(self._tmdb_id, int):
+            return f"{TMDB_MOVIE_PREFIX}{self._tmdb_id}/"
+        return self._tmdb_link
+
+    @property
+    def tmdb_id(self) -> Optional[int]:
+        if self._tmdb_id is _UNSET:
+            self._tmdb_id = extract_tmdb_id_from_url(self._tmdb_link) if self._tmdb_link else None
+        return self._tmdb_id
+
+    @tmdb_id.setter
+    def tmdb_id(self, value: Optional[int]) -> None:
+        self._tmdb_id = value
+
+    @property
+    def release_year(self) -> Optional[int]:
+        """year as an int (letterboxdpy may give a string), or None"""
+        if isinstance(self.year, int):
+            return self.year
+        if isinstance(self.year, str) and self.year.isdigit():
+            return int(self.year)
+        return None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Resolve the lazy id first: the _UNSET sentinel wouldn't survive pickling
+        self.tmdb_id
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    # Read-only mapping interface so existing dict consumers keep working
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def _value(self, key: str) -> Any:
+        """A field in the form the fetcher's dict held it"""
+        value = getattr(self, key)
+        if key == 'watched_date':
+            return _date_dict(value)
+        if type(value) is tuple and key in ('genres', 'director'):
+            return list(value)
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._value(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._value(key) if key in self._keys else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self._value(name) for name in self._keys}
+
+    def __repr__(self) -> str:
+        return f"FilmRecord({self.slug!r}, {self.title!r}, {self.year!r})"
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default that writes FilmRecords as dicts (and everything else as str)"""
+    if isinstance(value, FilmRecord):
+        return value.to_dict()
+    return str(value)
+
+
+if __name__ == "__main__":
+    import gc
+    import time
+    import tracemalloc
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 50000
+    directors = [f"Director {i}" for i in range(2000)]
+
+    def diary_entry(i: int) -> Dict[str, Any]:
+        # Same shapes letterboxdpy hands us, built fresh per entry as a real fetch would
+        slug = f"film-{i}"
+        return {
+            'title': f"Film Number {i}",
+            'slug': slug,
+            'tmdb_link': f"https://www.themoviedb.org/movie/{100000 + i}/",
+            'year': str(1950 + i % 75),
+            'watched_date': {'year': 2020 + i % 5, 'month': 1 + i % 12, 'day': 1 + i % 28},
+            'rating': (i % 10 + 1) / 2,
+            'director': ''.join(directors[i % len(directors)]),
+        }
+
+    def measure(build) -> Tuple[int, float, Any]:
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = build()
+        elapsed = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size, elapsed, rows
+
+    def as_dicts():
+        rows = []
+        for i in range(count):
+            entry = diary_entry(i)
+            entry['tmdb_id'] = extract_tmdb_id_from_url(entry['tmdb_link'])
+            rows.append(entry)
+        return rows
+
+    def as_records():
+        return [FilmRecord(**diary_entry(i)) for i in range(count)]
+
+    dict_bytes, dict_seconds, dicts = measure(as_dicts)
+    del dicts
+    record_bytes, record_seconds, records = measure(as_records)
+
+    print(f"📏 {count} diary entries")
+    print(f"  dicts:        {dict_bytes / 1e6:8.1f} MB  ({dict_bytes / count:6.0f} B/film, built in {dict_seconds:.2f}s)")
+    print(f"  FilmRecords:  {record_bytes / 1e6:8.1f} MB  ({record_bytes / count:6.0f} B/film, built in {record_seconds:.2f}s)")
+    print(f"  ratio:        {record_bytes / dict_bytes:.0%} of the dict footprint")
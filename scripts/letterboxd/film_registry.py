@@ -0,0 +1,293 @@
+"""
+Platform-wide Letterboxd film registry (public.letterboxd_films, keyed by TMDB id)
+"""
+import os
+import datetime
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional
+
+from scripts.letterboxd.film_cache import get_film_cache
+from scripts.letterboxd.rating_history import record_rating
+
+REGISTRY_ENABLED = os.getenv('LETTERBOXD_REGISTRY', '1') != '0'
+# Registry ratings older than this are refetched from Letterboxd
+REGISTRY_TTL_DAYS = float(os.getenv('LETTERBOXD_REGISTRY_TTL_DAYS', '30'))
+REGISTRY_COLUMNS = 'tmdb_id, slug, rating, rating_count, fetched_at'
+# Buffered registry writes are flushed once this many films are waiting
+REGISTRY_WRITE_BATCH = int(os.getenv('LETTERBOXD_REGISTRY_WRITE_BATCH', '200'))
+
+
+def _parse_time(value: Any) -> Optional[datetime.datetime]:
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def is_fresh(record: Optional[Dict[str, Any]]) -> bool:
+    """Whether a registry record has a rating fetched within REGISTRY_TTL_DAYS"""
+    if not record or record.get('rating') is None:
+        return False
+    fetched_at = _parse_time(record.get('fetched_at'))
+    if fetched_at is None:
+        return False
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=datetime.timezone.utc)
+    age = datetime.datetime.now(datetime.timezone.utc) - fetched_at
+    return age < datetime.timedelta(days=REGISTRY_TTL_DAYS)
+
+
+def rating_count_of(movie) -> Optional[int]:
+    """Number of Letterboxd ratings from a letterboxdpy Movie's JSON-LD, if present"""
+    try:
+        script = movie.pages.profile.script or {}
+        count = script.get('aggregateRating', {}).get('ratingCount')
+        return int(count) if count is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class FilmRegistry:
+    """
+    Reads and writes public.letterboxd_films
+
+    Goes through PostgREST by default, or straight to Postgres when a psycopg2
+    connection is given (the --db-url mode).
+    """
+
+    def __init__(self, supabase=None, pg_conn=None):
+        if supabase is None and pg_conn is None:
+            raise ValueError("FilmRegistry needs a Supabase client or a Postgres connection")
+        self.supabase = supabase
+        self.pg_conn = pg_conn
+
+    def get_many(self, tmdb_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up films by TMDB id
+
+        Args:
+            tmdb_ids: TMDB ids (duplicates and None are ignored)
+
+        Returns:
+            Dict of tmdb_id → record (tmdb_id, slug, rating, rating_count, fetched_at)
+        """
+        ids = sorted({int(i) for i in tmdb_ids if i})
+        if not ids:
+            return {}
+
+        if self.pg_conn is not None:
+            with self.pg_conn, self.pg_conn.cursor() as cur:
+                cur.execute(
+                    f'SELECT {REGISTRY_COLUMNS} FROM public.letterboxd_films WHERE tmdb_id = ANY(%s)',
+                    (ids,)
+                )
+                return {
+                    r[0]: {'tmdb_id': r[0], 'slug': r[1], 'rating': None if r[2] is None else float(r[2]),
+                           'rating_count': r[3], 'fetched_at': r[4]}
+                    for r in cur.fetchall()
+                }
+
+        found: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(ids), 200):
+            result = self.supabase.table('letterboxd_films')\
+                .select(REGISTRY_COLUMNS)\
+                .in_('tmdb_id', ids[start:start + 200])\
+                .execute()
+            for row in result.data or []:
+                found[row['tmdb_id']] = row
+        return found
+
+    def get(self, tmdb_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([tmdb_id]).get(int(tmdb_id))
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert films; a missing slug or rating count keeps the stored one
+
+        Args:
+            records: Dicts with tmdb_id, slug, rating and optionally rating_count
+
+        Returns:
+            Number of films written
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows = [
+            {
+                'tmdb_id': int(r['tmdb_id']),
+                'slug': r.get('slug'),
+                'rating': r.get('rating'),
+                'rating_count': r.get('rating_count'),
+                'fetched_at': now,
+            }
+            for r in records if r.get('tmdb_id')
+        ]
+        if not rows:
+            return 0
+
+        if self.pg_conn is not None:
+            with self.pg_conn, self.pg_conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO public.letterboxd_films (tmdb_id, slug, rating, rating_count, fetched_at)
+                    VALUES (%(tmdb_id)s, %(slug)s, %(rating)s, %(rating_count)s, %(fetched_at)s)
+                    ON CONFLICT (tmdb_id) DO UPDATE
+                      SET slug = COALESCE(EXCLUDED.slug, letterboxd_films.slug),
+                          rating = COALESCE(EXCLUDED.rating, letterboxd_films.rating),
+                          rating_count = COALESCE(EXCLUDED.rating_count, letterboxd_films.rating_count),
+                          fetched_at = EXCLUDED.fetched_at
+                    """,
+                    rows
+                )
+            return len(rows)
+
+        # PostgREST upserts replace whole rows, so carry stored values forward by hand
+        stored = self.get_many(r['tmdb_id'] for r in rows)
+        for row in rows:
+            previous = stored.get(row['tmdb_id']) or {}
+            for key in ('slug', 'rating', 'rating_count'):
+                if row[key] is None:
+                    row[key] = previous.get(key)
+        self.supabase.table('letterboxd_films').upsert(rows, on_conflict='tmdb_id').execute()
+        return len(rows)
+
+
+_registry: Optional[FilmRegistry] = None
+_registry_resolved = False
+_registry_lock = threading.Lock()
+
+
+def set_film_registry(registry: Optional[FilmRegistry]) -> None:
+    """Use a specific registry for this process (e.g. one on a --db-url connection)"""
+    global _registry, _registry_resolved
+    with _registry_lock:
+        _registry = registry if REGISTRY_ENABLED else None
+        _registry_resolved = True
+
+
+def get_film_registry() -> Optional[FilmRegistry]:
+    """
+    Return the process-wide registry
+
+    Returns:
+        A FilmRegistry on the default Supabase client, or None when the registry
+        is disabled (LETTERBOXD_REGISTRY=0) or no credentials are configured
+    """
+    global _registry, _registry_resolved
+    with _registry_lock:
+        if not _registry_resolved:
+            _registry_resolved = True
+            if REGISTRY_ENABLED:
+                from scripts.letterboxd.utils import get_supabase_client
+                supabase = get_supabase_client()
+                _registry = FilmRegistry(supabase=supabase) if supabase else None
+        return _registry
+
+
+def lookup_film(tmdb_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Registry record for a film, or None if unknown or the registry is unavailable"""
+    registry = get_film_registry() if tmdb_id else None
+    if not registry:
+        return None
+    try:
+        return registry.get(tmdb_id)
+    except Exception as e:
+        print(f"⚠️  Letterboxd film registry lookup failed: {e}")
+        return None
+
+
+def registry_records(tmdb_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Registry records for many films at once (empty if the registry is unavailable)"""
+    registry = get_film_registry()
+    if not registry:
+        return {}
+    try:
+        return registry.get_many(tmdb_ids)
+    except Exception as e:
+        print(f"⚠️  Letterboxd film registry lookup failed: {e}")
+        return {}
+
+
+def fresh_ratings(tmdb_ids: Iterable[int]) -> Dict[int, float]:
+    """Fresh registry ratings for many films at once (empty if the registry is unavailable)"""
+    return {tmdb_id: float(r['rating']) for tmdb_id, r in registry_records(tmdb_ids).items() if is_fresh(r)}
+
+
+_write_buffer: Optional[List[Dict[str, Any]]] = None
+_write_lock = threading.Lock()
+
+
+def _write_records(records: List[Dict[str, Any]]) -> int:
+    registry = get_film_registry()
+    if not registry or not records:
+        return 0
+    try:
+        return registry.put_many(records)
+    except Exception as e:
+        print(f"⚠️  Letterboxd film registry write failed: {e}")
+        return 0
+
+
+def flush_registry_writes() -> int:
+    """
+    Write buffered registry records in one upsert
+
+    Returns:
+        Number of films written (0 when nothing is buffered or the write failed)
+    """
+    with _write_lock:
+        if not _write_buffer:
+            return 0
+        # One upsert may not touch a film twice, so the latest record per film wins
+        records = list({r['tmdb_id']: r for r in _write_buffer}.values())
+        _write_buffer.clear()
+    return _write_records(records)
+
+
+@contextmanager
+def buffer_registry_writes():
+    """
+    Buffer record_film's registry writes until flush_registry_writes() or the end of the block
+
+    Batch jobs use this so a batch of fetched films costs one registry lookup
+    and one upsert instead of both per film.
+    """
+    global _write_buffer
+    with _write_lock:
+        outer = _write_buffer is not None
+        if not outer:
+            _write_buffer = []
+    try:
+        yield
+    finally:
+        if not outer:
+            flush_registry_writes()
+            with _write_lock:
+                _write_buffer = None
+
+
+def record_film(tmdb_id: Optional[int], title: Optional[str], year: Optional[int], slug: Optional[str],
+                rating: Optional[float], rating_count: Optional[int] = None) -> None:
+    """
+    Remember a fetched film in the local film cache, its rating history and the platform registry
+
+    Inside buffer_registry_writes() the registry write waits for the next flush.
+    Registry failures are reported but never fail the caller.
+    """
+    get_film_cache().put(tmdb_id, title, year, slug, rating)
+    record_rating(tmdb_id, rating)
+    if not tmdb_id or not get_film_registry():
+        return
+    record = {'tmdb_id': tmdb_id, 'slug': slug, 'rating': rating, 'rating_count': rating_count}
+    with _write_lock:
+        if _write_buffer is not None:
+            _write_buffer.append(record)
+            full = len(_write_buffer) >= REGISTRY_WRITE_BATCH
+        else:
+            full = None
+    if full is None:
+        _write_records([record])
+    elif full:
+        flush_registry_writes()
@@ -0,0 +1,351 @@
+"""
+Set expressions over Letterboxd lists and watchlists, merged by TMDB id
+
+An expression combines sources with the Python set operators and parentheses,
+with Python's precedence ("-" before "&" before "|"):
+
+    hepburnluv/classic-movies-for-beginners | watchlist:alice
+    (user1/new-years-eve | user2/nye-movies) & watchlist:bob - user3/seen-it
+
+A source is "username/list-slug" or "watchlist:username" ("username/watchlist"
+works too). Operators must be separated by spaces, since slugs contain "-".
+
+Every source is fetched once, every distinct film is resolved to a TMDB id once
+(its list entry's TMDB link, then the offline title index, then its film page),
+and each source becomes a stream sorted by TMDB id. The expression is evaluated
+as a merge of those streams, and filters (year range, Oscar status) are applied
+to the merged result.
+"""
+import sys
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.film_record import FilmRecord
+from scripts.letterboxd.title_index import ACADEMY_AWARDS_PATH, local_tmdb_id
+
+# Sources fetched and film pages loaded concurrently
+POOL_WORKERS = int(os.getenv('LETTERBOXD_POOL_WORKERS', '4'))
+
+OSCAR_STATUSES = ('winner', 'nominee', 'any', 'none')
+
+_TOKEN_RE = re.compile(r'\(|\)|[^\s()]+')
+# Python's set-operator precedence, loosest first
+_PRECEDENCE = {'|': 1, '&': 2, '-': 3}
+
+
+class Source(NamedTuple):
+    kind: str                  # 'list' or 'watchlist'
+    username: str
+    slug: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.username}/{self.slug}" if self.kind == 'list' else f"watchlist:{self.username}"
+
+
+# A parsed expression: a Source, or (operator, left, right)
+Node = Union[Source, Tuple[str, Any, Any]]
+# Stream items: (merge key, film). Resolved films key as (0, tmdb_id); films
+# without a TMDB id key as (1, slug) so they still dedupe but never match a resolved film
+Item = Tuple[Tuple[int, Any], FilmRecord]
+
+
+class ExpressionError(ValueError):
+    """Raised for an expression that doesn't parse"""
+
+
+def parse_source(token: str) -> Source:
+    if token.startswith('watchlist:'):
+        username = token[len('watchlist:'):]
+        if username:
+            return Source('watchlist', username)
+    elif token.count('/') == 1:
+        username, slug = token.split('/')
+        if username and slug:
+            return Source('watchlist', username) if slug == 'watchlist' else Source('list', username, slug)
+    raise ExpressionError(f"Not a list or watchlist: {token!r} (use username/list-slug or watchlist:username)")
+
+
+def parse_expression(text: str) -> Node:
+    """
+    Parse a list expression into a tree of Sources and (operator, left, right)
+
+    Raises:
+        ExpressionError: If the expression is malformed
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    position = 0
+
+    def operand() -> Node:
+        nonlocal position
+        if position >= len(tokens):
+            raise ExpressionError("Expression ends where a list was expected")
+        token = tokens[position]
+        position += 1
+        if token == '(':
+            node = binary(1)
+            if position >= len(tokens) or tokens[position] != ')':
+                raise ExpressionError("Missing closing parenthesis")
+            position += 1
+            return node
+        if token in _PRECEDENCE or token == ')':
+            raise ExpressionError(f"Unexpected {token!r}")
+        return parse_source(token)
+
+    def binary(min_precedence: int) -> Node:
+        nonlocal position
+        left = operand()
+        while position < len(tokens) and _PRECEDENCE.get(tokens[position], 0) >= min_precedence:
+            operator = tokens[position]
+            position += 1
+            left = (operator, left, binary(_PRECEDENCE[operator] + 1))
+        return left
+
+    node = binary(1)
+    if position != len(tokens):
+        raise ExpressionError(f"Unexpected {tokens[position]!r}")
+    return node
+
+
+def sources_of(node: Node) -> List[Source]:
+    """Distinct sources in an expression, in order of appearance"""
+    if isinstance(node, Source):
+        return [node]
+    found = []
+    for source in sources_of(node[1]) + sources_of(node[2]):
+        if source not in found:
+            found.append(source)
+    return found
+
+
+def load_source(source: Source) -> List[FilmRecord]:
+    """Films of one list or watchlist"""
+    if source.kind == 'watchlist':
+        from letterboxdpy.user import User
+        from scripts.letterboxd.fetch_user_data import _watchlist_from_user
+        return _watchlist_from_user(User(source.username))
+    from letterboxdpy.list import List as LetterboxdList
+    from scripts.letterboxd.fetch_list_data import list_record
+    return list_record(LetterboxdList(source.username, source.slug), source.username, source.slug)['films']
+
+
+def _film_key(film: FilmRecord) -> str:
+    return film.slug or f"{film.title}|{film.year}"
+
+
+def resolve_films(films: Iterable[FilmRecord], fetch_details: Optional[Callable[[str], Dict[str, Any]]] = None,
+                  max_workers: int = POOL_WORKERS) -> Tuple[Dict[str, Dict[str, Any]], set]:
+    """
+    Give every distinct film a TMDB id, in place
+
+    Films are deduplicated by slug first, so a film on five sources is resolved
+    (and its page fetched) once. Records for the same slug share the result.
+    An id from the offline title index is a match on title and year only, so
+    those slugs are returned too; check them against the film page before
+    writing anything keyed by the id.
+
+    Args:
+        films: Film records from every source
+        fetch_details: Loads a film page by slug (a dict with tmdb_id, genres,
+            rating); None resolves offline only
+        max_workers: Film pages loaded concurrently
+
+    Returns:
+        Film page details by slug, for films whose page was loaded, and the
+        slugs whose TMDB id came from the title index
+    """
+    by_key: Dict[str, List[FilmRecord]] = {}
+    for film in films:
+        by_key.setdefault(_film_key(film), []).append(film)
+
+    unresolved = []
+    index_matched = set()
+    for key, records in by_key.items():
+        tmdb_id = next((r.tmdb_id for r in records if r.tmdb_id), None)
+        if not tmdb_id:
+            tmdb_id = local_tmdb_id(str(records[0].title), records[0].release_year)
+            if tmdb_id and records[0].slug:
+                index_matched.add(records[0].slug)
+        if tmdb_id:
+            for record in records:
+                record.tmdb_id = tmdb_id
+        elif fetch_details and records[0].slug:
+            unresolved.append(key)
+
+    details: Dict[str, Dict[str, Any]] = {}
+    if unresolved:
+        print(f"🔎 Loading {len(unresolved)} film pages for TMDB ids...")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            loaded = pool.map(lambda key: fetch_details(by_key[key][0].slug), unresolved)
+            for key, film_details in zip(unresolved, loaded):
+                details[by_key[key][0].slug] = film_details
+                for record in by_key[key]:
+                    record.tmdb_id = film_details.get('tmdb_id')
+    return details, index_matched
+
+
+def stream(films: Iterable[FilmRecord]) -> List[Item]:
+    """One source as a stream sorted by merge key, each film once"""
+    items: Dict[Tuple[int, Any], FilmRecord] = {}
+    for film in films:
+        key = (0, film.tmdb_id) if film.tmdb_id else (1, _film_key(film))
+        items.setdefault(key, film)
+    return sorted(items.items(), key=lambda item: item[0])
+
+
+def _merge(operator: str, left: Iterator[Item], right: Iterator[Item]) -> Iterator[Item]:
+    """Union, intersection or difference of two sorted streams in one pass"""
+    a = next(left, None)
+    b = next(right, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            if operator in '|-':
+                yield a
+            a = next(left, None)
+        elif a is None or b[0] < a[0]:
+            if operator == '|':
+                yield b
+            b = next(right, None)
+        else:
+            # The same film on both sides: the left-hand entry wins
+            if operator in '|&':
+                yield a
+            a = next(left, None)
+            b = next(right, None)
+
+
+def evaluate(node: Node, streams: Dict[Source, List[Item]]) -> Iterator[Item]:
+    """Merge the sources' sorted streams as the expression says"""
+    if isinstance(node, Source):
+        return iter(streams[node])
+    operator, left, right = node
+    return _merge(operator, evaluate(left, streams), evaluate(right, streams))
+
+
+def parse_years(text: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    "1990-1999", "1990-", "-1979" or "1985" as an inclusive (first, last) year range
+    """
+    if not text:
+        return None
+    match = re.fullmatch(r'\s*(\d{4})?\s*(-)?\s*(\d{4})?\s*', text)
+    if not match or not (match.group(1) or match.group(3)):
+        raise ExpressionError(f"Not a year range: {text!r} (e.g. 1990-1999, 1990-, -1979)")
+    first = int(match.group(1)) if match.group(1) else None
+    last = int(match.group(3)) if match.group(3) else (first if not match.group(2) else None)
+    return first, last
+
+
+def academy_award_status(path: str = ACADEMY_AWARDS_PATH) -> Dict[int, str]:
+    """'winner' or 'nominee' by TMDB id from data/academy-awards.json"""
+    try:
+        with open(path, 'r') as f:
+            movies = json.load(f).get('movies', [])
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not read {path}: {e}")
+        return {}
+    return {m['tmdb_id']: m.get('status') for m in movies if m.get('tmdb_id')}
+
+
+def film_filter(years: Optional[Tuple[Optional[int], Optional[int]]] = None,
+                oscar: Optional[str] = None) -> Callable[[FilmRecord], bool]:
+    """
+    Predicate for the merged pool
+
+    Args:
+        years: Inclusive (first, last) range; films without a year are dropped
+        oscar: 'winner', 'nominee' (nominated, didn't win), 'any' (either) or
+            'none' (never nominated); films without a TMDB id only pass 'none'
+    """
+    if oscar and oscar not in OSCAR_STATUSES:
+        raise ExpressionError(f"--oscar must be one of {', '.join(OSCAR_STATUSES)}")
+    statuses = academy_award_status() if oscar else {}
+
+    def keep(film: FilmRecord) -> bool:
+        if years:
+            year = film.release_year
+            if year is None or (years[0] and year < years[0]) or (years[1] and year > years[1]):
+                return False
+        if oscar:
+            status = statuses.get(film.tmdb_id)
+            if oscar == 'any':
+                return status is not None
+            if oscar == 'none':
+                return status is None
+            return status == oscar
+        return True
+
+    return keep
+
+
+def build_pool(expression: str, years: Optional[str] = None, oscar: Optional[str] = None,
+               fetch_details: Optional[Callable[[str], Dict[str, Any]]] = None,
+               max_workers: int = POOL_WORKERS) -> Dict[str, Any]:
+    """
+    Evaluate a list expression into one deduplicated film pool
+
+    Args:
+        expression: Set expression over lists and watchlists (see module docstring)
+        years: Year range filter (e.g. "1990-1999")
+        oscar: Oscar status filter (winner, nominee, any, none)
+        fetch_details: Film page loader for films no offline source resolves;
+            None leaves them unresolved (dry runs)
+        max_workers: Sources and film pages loaded concurrently
+
+    Returns:
+        Dict with films (FilmRecords in TMDB id order, unresolved films last),
+        details (film page data by slug, for pages already loaded), index_matched
+        (slugs whose TMDB id came from the title index, not yet checked against
+        their page), sources (film count per source) and unresolved (films in
+        the pool without a TMDB id)
+
+    Raises:
+        ExpressionError: If the expression or a filter is malformed
+    """
+    node = parse_expression(expression)
+    keep = film_filter(parse_years(years), oscar)
+    sources = sources_of(node)
+
+    print(f"📥 Fetching {len(sources)} sources ({max_workers} at a time)...")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        films_by_source = dict(zip(sources, pool.map(load_source, sources)))
+    for source, films in films_by_source.items():
+        print(f"✅ {source}: {len(films)} films")
+
+    details, index_matched = resolve_films(
+        (film for films in films_by_source.values() for film in films), fetch_details, max_workers
+    )
+    streams = {source: stream(films) for source, films in films_by_source.items()}
+    films = [film for _, film in evaluate(node, streams) if keep(film)]
+    return {
+        'films': films,
+        'details': details,
+        'index_matched': index_matched,
+        'sources': {str(source): len(source_films) for source, source_films in films_by_source.items()},
+        'unresolved': sum(1 for film in films if not film.tmdb_id),
+    }
+
+
+if __name__ == "__main__":
+    from scripts.letterboxd.fetcher import install_fetch_layer
+    from scripts.letterboxd.utils import pop_option
+    from scripts.letterboxd.film_record import json_default
+
+    years_arg = pop_option(sys.argv, '--years')
+    oscar_arg = pop_option(sys.argv, '--oscar')
+    if len(sys.argv) < 2:
+        print('Usage: python list_algebra.py "<expression>" [--years 1990-1999] [--oscar winner|nominee|any|none]')
+        print('Example: python list_algebra.py "(user1/nye-movies | user2/new-years-eve) - watchlist:alice"')
+        sys.exit(1)
+
+    install_fetch_layer()
+    try:
+        result = build_pool(sys.argv[1], years_arg, oscar_arg)
+    except ExpressionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(json.dumps(result['films'], indent=2, default=json_default))
+    print(f"📊 {len(result['films'])} films in pool ({result['unresolved']} without a TMDB id link)")
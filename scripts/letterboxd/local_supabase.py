@@ -0,0 +1,561 @@
+"""
+Local PostgREST / Edge Functions stand-in for load-testing the sync and backfill paths
+
+Serves the subset of /rest/v1 and /functions/v1 these scripts call, backed by
+SQLite, with configurable latency and error injection. Point the scripts at it
+with SUPABASE_URL=http://127.0.0.1:<port> and SUPABASE_SERVICE_ROLE_KEY=LOCAL_KEY.
+"""
+import sys
+import os
+import json
+import time
+import uuid
+import random
+import sqlite3
+import threading
+import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# supabase-py only accepts keys shaped like a JWT
+LOCAL_KEY = 'local.supabase.stand-in'
+
+# Column types drive SQLite storage and JSON output (arrays as JSON text, bools as 0/1)
+SCHEMA: Dict[str, Dict[str, str]] = {
+    'draft_picks': {
+        'id': 'uuid', 'draft_id': 'uuid', 'player_id': 'uuid', 'player_name': 'text',
+        'movie_id': 'int', 'movie_title': 'text', 'movie_year': 'int', 'movie_genre': 'text',
+        'category': 'text', 'pick_order': 'int', 'poster_path': 'text',
+        'letterboxd_rating': 'real', 'calculated_score': 'real', 'movie_budget': 'int',
+        'movie_revenue': 'int', 'rt_critics_score': 'int', 'metacritic_score': 'int',
+        'imdb_rating': 'real', 'oscar_status': 'text', 'created_at': 'timestamptz',
+    },
+    'spec_draft_movies': {
+        'id': 'uuid', 'spec_draft_id': 'uuid', 'movie_tmdb_id': 'int', 'movie_title': 'text',
+        'movie_year': 'int', 'movie_poster_path': 'text', 'movie_genres': 'int[]',
+        'oscar_status': 'text', 'is_sequel': 'bool', 'created_at': 'timestamptz',
+    },
+    'league_drafts': {
+        'id': 'uuid', 'league_id': 'uuid', 'draft_id': 'uuid', 'draft_type': 'text',
+        'theme': 'text', 'scheduled_at': 'timestamptz', 'created_at': 'timestamptz',
+    },
+    'letterboxd_rating_claims': {
+        'draft_pick_id': 'uuid', 'worker_id': 'text', 'leased_until': 'timestamptz',
+        'attempts': 'int', 'claimed_at': 'timestamptz',
+    },
+    'letterboxd_films': {
+        'tmdb_id': 'int', 'slug': 'text', 'rating': 'real', 'rating_count': 'int',
+        'fetched_at': 'timestamptz', 'created_at': 'timestamptz', 'updated_at': 'timestamptz',
+    },
+}
+PRIMARY_KEYS = {'letterboxd_rating_claims': 'draft_pick_id', 'letterboxd_films': 'tmdb_id'}
+UNIQUE_KEYS = {'spec_draft_movies': ('spec_draft_id', 'movie_tmdb_id')}
+SQL_TYPES = {'int': 'INTEGER', 'real': 'REAL', 'bool': 'INTEGER'}
+
+
+class StandInError(Exception):
+    """A PostgREST-style error response"""
+
+    def __init__(self, status: int, message: str, code: str = 'PGRST000'):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _ident(name: str) -> str:
+    return f'"{name}"'
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class LocalStore:
+    """SQLite tables mirroring the public.* columns the scripts touch"""
+
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        for table, columns in SCHEMA.items():
+            pk = PRIMARY_KEYS.get(table, 'id')
+            defs = [
+                f'"{name}" {SQL_TYPES.get(kind, "TEXT")}' + (' PRIMARY KEY' if name == pk else '')
+                for name, kind in columns.items()
+            ]
+            if table in UNIQUE_KEYS:
+                defs.append(f'UNIQUE ({", ".join(UNIQUE_KEYS[table])})')
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({", ".join(defs)})')
+        self.conn.commit()
+
+    # -- value conversion -------------------------------------------------
+
+    @staticmethod
+    def _to_db(kind: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if kind == 'int[]':
+            return json.dumps(value)
+        if kind == 'bool':
+            return 1 if value in (True, 'true', 't', 1) else 0
+        return value
+
+    @staticmethod
+    def _from_db(kind: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if kind == 'int[]':
+            return json.loads(value)
+        if kind == 'bool':
+            return bool(value)
+        return value
+
+    @staticmethod
+    def _filter_value(kind: str, raw: str) -> Any:
+        if kind == 'bool':
+            return 1 if raw == 'true' else 0
+        return raw
+
+    def _columns(self, table: str) -> Dict[str, str]:
+        if table not in SCHEMA:
+            raise StandInError(404, f'relation "public.{table}" does not exist', '42P01')
+        return SCHEMA[table]
+
+    def _row_dict(self, table: str, names: List[str], row: Tuple) -> Dict[str, Any]:
+        columns = SCHEMA[table]
+        return {name: self._from_db(columns[name], value) for name, value in zip(names, row)}
+
+    # -- PostgREST query string -------------------------------------------
+
+    def _where(self, table: str, params: List[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+        columns = self._columns(table)
+        clauses, args = [], []
+        for column, expr in params:
+            if column in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+                continue
+            if column not in columns:
+                raise StandInError(400, f'column {table}.{column} does not exist', '42703')
+            negate = expr.startswith('not.')
+            if negate:
+                expr = expr[4:]
+            op, _, raw = expr.partition('.')
+            kind = columns[column]
+            if op == 'is':
+                clause = f'"{column}" IS ' + {'null': 'NULL', 'true': '1', 'false': '0'}[raw]
+            elif op == 'in':
+                values = [v.strip('"') for v in raw.strip('()').split(',') if v]
+                clause = f'"{column}" IN ({",".join("?" * len(values))})'
+                args.extend(self._filter_value(kind, v) for v in values)
+            elif op in ('eq', 'neq', 'gt', 'gte', 'lt', 'lte'):
+                sql_op = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}[op]
+                clause = f'"{column}" {sql_op} ?'
+                args.append(self._filter_value(kind, raw))
+            else:
+                raise StandInError(400, f'operator {op!r} is not supported by the local stand-in')
+            clauses.append(f'NOT ({clause})' if negate else clause)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def _select_list(self, table: str, params: Dict[str, str]) -> List[str]:
+        columns = self._columns(table)
+        raw = ''.join(params.get('select', '*').split())
+        if raw in ('*', ''):
+            return list(columns)
+        names = [name for name in raw.split(',') if name]
+        for name in names:
+            if name not in columns:
+                raise StandInError(400, f'column {table}.{name} does not exist', '42703')
+        return names
+
+    def select(self, table: str, params: List[Tuple[str, str]],
+               range_header: Optional[str] = None) -> List[Dict[str, Any]]:
+        named = dict(params)
+        names = self._select_list(table, named)
+        where, args = self._where(table, params)
+        sql = f'SELECT {", ".join(_ident(n) for n in names)} FROM {table}{where}'
+
+        if 'order' in named:
+            terms = []
+            for term in named['order'].split(','):
+                parts = term.split('.')
+                direction = 'DESC' if 'desc' in parts[1:] else 'ASC'
+                terms.append(f'"{parts[0]}" {direction}')
+            sql += ' ORDER BY ' + ', '.join(terms)
+
+        limit = named.get('limit')
+        offset = named.get('offset')
+        if range_header and '-' in range_header:
+            start, end = range_header.split('-', 1)
+            offset, limit = start, str(int(end) - int(start) + 1)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+            if offset is not None:
+                sql += ' OFFSET ?'
+                args.append(int(offset))
+
+        with self._lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [self._row_dict(table, names, row) for row in rows]
+
+    def insert(self, table: str, rows: List[Dict[str, Any]], upsert: bool = False,
+               ignore_duplicates: bool = False, on_conflict: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        """
+        Insert rows the way PostgREST does
+
+        With upsert (Prefer: resolution=merge-duplicates) a conflicting row is
+        updated in place with the supplied columns only, like ON CONFLICT DO
+        UPDATE: its id, created_at and any column missing from the payload are
+        kept. ignore_duplicates skips conflicting rows. The conflict target is
+        on_conflict, else the primary key.
+        """
+        columns = self._columns(table)
+        pk = PRIMARY_KEYS.get(table, 'id')
+        target = tuple(on_conflict or (pk,))
+        unknown = set(target) - set(columns)
+        if unknown:
+            raise StandInError(400, f'column {table}.{sorted(unknown)[0]} does not exist', 'PGRST204')
+        inserted = []
+        with self._lock:
+            for row in rows:
+                supplied = [n for n in row if n not in target]
+                row = dict(row)
+                if columns.get(pk) == 'uuid':
+                    row.setdefault(pk, str(uuid.uuid4()))
+                if 'created_at' in columns:
+                    row.setdefault('created_at', _now())
+                unknown = set(row) - set(columns)
+                if unknown:
+                    raise StandInError(400, f'column {table}.{sorted(unknown)[0]} does not exist', 'PGRST204')
+                names = list(row)
+                conflict = ''
+                if upsert:
+                    # Re-assigning a target column keeps the row when nothing else was supplied
+                    assignments = [f'{_ident(n)} = excluded.{_ident(n)}' for n in supplied or target[:1]]
+                    conflict = f' ON CONFLICT ({", ".join(_ident(n) for n in target)}) DO UPDATE SET {", ".join(assignments)}'
+                elif ignore_duplicates:
+                    conflict = f' ON CONFLICT ({", ".join(_ident(n) for n in target)}) DO NOTHING'
+                try:
+                    stored = self.conn.execute(
+                        f'INSERT INTO {table} ({", ".join(_ident(n) for n in names)}) '
+                        f'VALUES ({",".join("?" * len(names))}){conflict} '
+                        f'RETURNING {", ".join(_ident(n) for n in columns)}',
+                        [self._to_db(columns[n], row[n]) for n in names]
+                    ).fetchall()
+                except sqlite3.IntegrityError as e:
+                    self.conn.rollback()
+                    raise StandInError(409, f'duplicate key value violates unique constraint: {e}', '23505')
+                except sqlite3.OperationalError as e:
+                    self.conn.rollback()
+                    raise StandInError(400, f'there is no unique or exclusion constraint matching the ON CONFLICT specification: {e}', '42P10')
+                inserted.extend(self._row_dict(table, list(columns), r) for r in stored)
+            self.conn.commit()
+        return inserted
+
+    def update(self, table: str, params: List[Tuple[str, str]], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = self._columns(table)
+        where, args = self._where(table, params)
+        names = list(values)
+        for name in names:
+            if name not in columns:
+                raise StandInError(400, f'column {table}.{name} does not exist', 'PGRST204')
+        pk = PRIMARY_KEYS.get(table, 'id')
+        with self._lock:
+            ids = [r[0] for r in self.conn.execute(f'SELECT "{pk}" FROM {table}{where}', args)]
+            if ids and names:
+                self.conn.execute(
+                    f'UPDATE {table} SET {", ".join(_ident(n) + " = ?" for n in names)}{where}',
+                    [self._to_db(columns[n], values[n]) for n in names] + args
+                )
+            self.conn.commit()
+            all_names = list(columns)
+            rows = [
+                self.conn.execute(
+                    f'SELECT {", ".join(_ident(n) for n in all_names)} FROM {table} WHERE "{pk}" = ?',
+                    (i,)
+                ).fetchone()
+                for i in ids
+            ]
+        return [self._row_dict(table, all_names, row) for row in rows if row]
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        rows = self.select(table, [p for p in params if p[0] != 'select'])
+        where, args = self._where(table, params)
+        with self._lock:
+            self.conn.execute(f'DELETE FROM {table}{where}', args)
+            self.conn.commit()
+        return rows
+
+    # -- RPCs -------------------------------------------------------------
+
+    def claim_letterboxd_rating_work(self, p_worker_id: str, p_limit: int = 25,
+                                     p_lease_seconds: int = 600) -> List[Dict[str, Any]]:
+        """Same contract as the SQL function: each pending pick goes to one live lease"""
+        now = _now()
+        until = (datetime.datetime.now(datetime.timezone.utc)
+                 + datetime.timedelta(seconds=p_lease_seconds)).isoformat()
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT dp.id, dp.movie_id, dp.movie_title, dp.movie_year
+                FROM draft_picks dp
+                LEFT JOIN letterboxd_rating_claims c ON c.draft_pick_id = dp.id
+                WHERE dp.letterboxd_rating IS NULL
+                  AND dp.movie_title IS NOT NULL
+                  AND (c.draft_pick_id IS NULL OR c.leased_until < ?)
+                ORDER BY dp.created_at
+                LIMIT ?
+                """,
+                (now, p_limit)
+            ).fetchall()
+            self.conn.executemany(
+                """
+                INSERT INTO letterboxd_rating_claims (draft_pick_id, worker_id, leased_until, attempts, claimed_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (draft_pick_id) DO UPDATE
+                  SET worker_id = excluded.worker_id,
+                      leased_until = excluded.leased_until,
+                      attempts = attempts + 1,
+                      claimed_at = excluded.claimed_at
+                """,
+                [(r[0], p_worker_id, until, now) for r in rows]
+            )
+            self.conn.commit()
+        return [{'id': r[0], 'movie_id': r[1], 'movie_title': r[2], 'movie_year': r[3]} for r in rows]
+
+    def complete_letterboxd_rating_claims(self, p_worker_id: str, p_draft_pick_ids: List[str]) -> int:
+        if not p_draft_pick_ids:
+            return 0
+        with self._lock:
+            cur = self.conn.execute(
+                f'DELETE FROM letterboxd_rating_claims WHERE worker_id = ? '
+                f'AND draft_pick_id IN ({",".join("?" * len(p_draft_pick_ids))})',
+                [p_worker_id] + list(p_draft_pick_ids)
+            )
+            self.conn.commit()
+            return cur.rowcount
+
+    # -- seeding ----------------------------------------------------------
+
+    def seed_draft_picks(self, count: int, rated_share: float = 0.0) -> None:
+        """Insert synthetic picks; rated_share of them already have a Letterboxd rating"""
+        rng = random.Random(count)
+        columns = SCHEMA['draft_picks']
+        base = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        rows = []
+        for i in range(count):
+            rows.append((
+                str(uuid.uuid4()), 100000 + i, f'Load Test Film {i}', rng.randint(1950, 2025),
+                round(rng.uniform(0.5, 5.0), 2) if rng.random() < rated_share else None,
+                (base + datetime.timedelta(seconds=i)).isoformat(),
+            ))
+        with self._lock:
+            self.conn.executemany(
+                'INSERT INTO draft_picks (id, movie_id, movie_title, movie_year, letterboxd_rating, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.conn.commit()
+        print(f"🌱 Seeded {count} draft_picks ({len(columns)} columns, {rated_share:.0%} pre-rated)")
+
+
+class FaultInjector:
+    """Latency and error injection for every request"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 function_latency_ms: Optional[float] = None, seed: Optional[int] = None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.function_latency = None if function_latency_ms is None else function_latency_ms / 1000
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'injected_errors': 0}
+
+    def apply(self, is_function: bool) -> bool:
+        """Sleep the configured latency; returns True if this request should fail"""
+        with self._lock:
+            self.stats['requests'] += 1
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.stats['injected_errors'] += 1
+        base = self.function_latency if is_function and self.function_latency is not None else self.latency
+        delay = max(0.0, base + jitter)
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+def _fake_tmdb_id(title: str) -> int:
+    """Stable pseudo TMDB id for a title"""
+    return 1 + (uuid.uuid5(uuid.NAMESPACE_URL, title.lower()).int % 999999)
+
+
+def make_handler(store: LocalStore, faults: FaultInjector):
+    """Build a request handler class bound to a store and fault injector"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, payload: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+            body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> Any:
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return None
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+
+        def _dispatch(self, method: str) -> None:
+            url = urlsplit(self.path)
+            parts = [p for p in url.path.split('/') if p]
+            params = parse_qsl(url.query, keep_blank_values=True)
+            is_function = parts[:2] == ['functions', 'v1']
+
+            try:
+                body = self._body() if method in ('POST', 'PATCH') else None
+                if faults.apply(is_function):
+                    raise StandInError(503, 'injected failure', 'PGRST503')
+
+                if is_function and len(parts) == 3 and method == 'POST':
+                    return self._send(200, self._function(parts[2], body or {}))
+                if parts[:2] != ['rest', 'v1'] or len(parts) < 3:
+                    raise StandInError(404, f'no route for {url.path}')
+                if parts[2] == 'rpc' and len(parts) == 4 and method == 'POST':
+                    return self._send(200, self._rpc(parts[3], body or {}))
+
+                table = parts[2]
+                prefer = self.headers.get('Prefer', '')
+                wants_rows = 'return=representation' in prefer
+                if method == 'GET':
+                    rows = store.select(table, params, self.headers.get('Range'))
+                    return self._send(200, rows, {'Content-Range': f'0-{max(len(rows) - 1, 0)}/*'})
+                if method == 'POST':
+                    rows = store.insert(
+                        table, body if isinstance(body, list) else [body],
+                        upsert='resolution=merge-duplicates' in prefer,
+                        ignore_duplicates='resolution=ignore-duplicates' in prefer,
+                        on_conflict=tuple(c.strip() for c in dict(params).get('on_conflict', '').split(',') if c.strip())
+                    )
+                    return self._send(201, rows if wants_rows else None)
+                if method == 'PATCH':
+                    rows = store.update(table, params, body or {})
+                    return self._send(200 if wants_rows else 204, rows if wants_rows else None)
+                if method == 'DELETE':
+                    rows = store.delete(table, params)
+                    return self._send(200 if wants_rows else 204, rows if wants_rows else None)
+                raise StandInError(405, f'{method} is not supported')
+            except StandInError as e:
+                self._send(e.status, {'code': e.code, 'message': str(e), 'details': None, 'hint': None})
+            except (ValueError, KeyError, TypeError, sqlite3.Error) as e:
+                self._send(400, {'code': 'PGRST100', 'message': str(e), 'details': None, 'hint': None})
+
+        def _rpc(self, name: str, args: Dict[str, Any]) -> Any:
+            if name == 'claim_letterboxd_rating_work':
+                return store.claim_letterboxd_rating_work(**args)
+            if name == 'complete_letterboxd_rating_claims':
+                return store.complete_letterboxd_rating_claims(**args)
+            raise StandInError(404, f'function public.{name} does not exist', 'PGRST202')
+
+        def _function(self, name: str, body: Dict[str, Any]) -> Any:
+            if name == 'fetch-movies':
+                query = body.get('searchQuery') or body.get('movieSearchQuery') or ''
+                title = query.strip()
+                return {'results': [{
+                    'id': _fake_tmdb_id(title),
+                    'title': title,
+                    'release_date': '2000-01-01',
+                }], 'total_pages': 1}
+            if name == 'enrich-spec-draft-sequels':
+                movie_id = body.get('spec_draft_movie_id')
+                store.update('spec_draft_movies', [('id', f'eq.{movie_id}')], {'is_sequel': False})
+                return {'ok': True, 'spec_draft_movie_id': movie_id}
+            raise StandInError(404, f'function {name} not found')
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PATCH(self):
+            self._dispatch('PATCH')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+        def do_HEAD(self):
+            self._send(200)
+
+    return Handler
+
+
+def serve(host: str = '127.0.0.1', port: int = 54399, store: Optional[LocalStore] = None,
+          faults: Optional[FaultInjector] = None) -> ThreadingHTTPServer:
+    """
+    Start the stand-in in a background thread
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        store: Backing store (defaults to an in-memory one)
+        faults: Latency / error injection (defaults to none)
+
+    Returns:
+        The running server; its server_address gives the bound port. Call shutdown() to stop it.
+    """
+    store = store or LocalStore()
+    faults = faults or FaultInjector()
+    server = ThreadingHTTPServer((host, port), make_handler(store, faults))
+    server.daemon_threads = True
+    server.store = store
+    server.faults = faults
+    threading.Thread(target=server.serve_forever, name='local-supabase', daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local PostgREST / Edge Functions stand-in backed by SQLite')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54399)
+    parser.add_argument('--db', default=':memory:', help='SQLite file (default: in-memory)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter on the latency')
+    parser.add_argument('--function-latency-ms', type=float, help='Latency for /functions/v1 calls (default: --latency-ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--seed-draft-picks', type=int, default=0, help='Insert this many synthetic draft_picks')
+    parser.add_argument('--rated-share', type=float, default=0.0, help='Share of seeded picks that already have a rating')
+    parser.add_argument('--random-seed', type=int, help='Seed for latency jitter and error injection')
+
+    args = parser.parse_args()
+
+    store = LocalStore(args.db)
+    if args.seed_draft_picks:
+        store.seed_draft_picks(args.seed_draft_picks, args.rated_share)
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.function_latency_ms, args.random_seed)
+    server = serve(args.host, args.port, store, faults)
+
+    host, port = server.server_address[:2]
+    print(f"🧪 Local Supabase stand-in on http://{host}:{port}")
+    print(f"   SUPABASE_URL=http://{host}:{port} SUPABASE_SERVICE_ROLE_KEY={LOCAL_KEY}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n📊 {faults.stats['requests']} requests, {faults.stats['injected_errors']} injected errors")
+        server.shutdown()
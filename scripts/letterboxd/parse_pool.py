@@ -0,0 +1,202 @@
+"""
+Fetch on I/O threads, parse in worker processes
+
+letterboxdpy builds Movie and List objects with BeautifulSoup, which holds the
+GIL, so a threaded job parses on one core. Here threads in this process only
+download HTML (through the shared session and page cache), and a process pool
+sized to the machine's cores runs letterboxdpy on it. Each worker serves
+letterboxdpy's page loads from the HTML it was handed, and returns FilmRecords
+(which pickle as their slots) and plain dicts. A page the worker wasn't given
+(e.g. a URL layout from another letterboxdpy version) is fetched by the worker
+itself, so results never depend on the prefetch guessing every URL.
+"""
+import sys
+import os
+import re
+import math
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+from typing import Dict, Any, List as TypingList, Optional, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.fetcher import fetch_html
+from scripts.letterboxd.film_record import FilmRecord
+
+LETTERBOXD = 'https://letterboxd.com'
+# Worker processes parsing pages; defaults to every core
+PARSE_WORKERS = int(os.getenv('LETTERBOXD_PARSE_WORKERS', '0')) or os.cpu_count() or 1
+# Threads downloading pages for them
+IO_WORKERS = int(os.getenv('LETTERBOXD_IO_WORKERS', '8'))
+
+_LIST_COUNT_RE = re.compile(r'<meta name="description" content="[^"]*?(\d[\d,]*)\s+films?', re.IGNORECASE)
+
+# Pages handed to the current task (worker processes only)
+_pages: Dict[str, str] = {}
+
+
+def _init_worker() -> None:
+    """Route letterboxdpy page loads to the task's prefetched HTML, falling back to the fetch layer"""
+    from bs4 import BeautifulSoup
+    from letterboxdpy.core.scraper import Scraper
+    from scripts.letterboxd.fetcher import install_fetch_layer
+
+    install_fetch_layer()
+    fetch_page = Scraper.get_page
+
+    def get_page(cls, url: str):
+        html = _pages.get(url)
+        if html is None:
+            return fetch_page(url)
+        return BeautifulSoup(html, getattr(cls, 'builder', 'lxml'))
+
+    Scraper.get_page = classmethod(get_page)
+
+
+def _parse_movie(slug: str, pages: Dict[str, str]) -> Union[FilmRecord, Dict[str, Any]]:
+    from letterboxdpy.movie import Movie
+    from scripts.letterboxd.fetch_movie_data import movie_record
+
+    _pages.clear()
+    _pages.update(pages)
+    try:
+        return movie_record(Movie(slug), slug)
+    except Exception as e:
+        # letterboxdpy exceptions don't all survive pickling, so only the message crosses back
+        return {'slug': slug, 'error': str(e)}
+    finally:
+        _pages.clear()
+
+
+def _parse_list(username: str, list_slug: str, pages: Dict[str, str]) -> Dict[str, Any]:
+    from letterboxdpy.list import List
+    from scripts.letterboxd.fetch_list_data import list_record
+
+    _pages.clear()
+    _pages.update(pages)
+    try:
+        return list_record(List(username, list_slug), username, list_slug)
+    except Exception as e:
+        return {'username': username, 'list_slug': list_slug, 'error': str(e)}
+    finally:
+        _pages.clear()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, not fork: this process has live threads, sockets and SQLite handles
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+
+
+def film_url(slug: str) -> str:
+    return f"{LETTERBOXD}/film/{slug}/"
+
+
+def list_urls(username: str, list_slug: str, first_page_html: str) -> TypingList[str]:
+    """
+    Every page letterboxdpy will load for a list, predicted from its first page
+
+    The film count comes from the page's meta description; pages are
+    /page/N/ of LIST_ITEMS_PER_PAGE films (60 in letterboxdpy 6, else 100).
+    """
+    base = f"{LETTERBOXD}/{username.lower()}/list/{list_slug}/"
+    match = _LIST_COUNT_RE.search(first_page_html)
+    if not match:
+        return [base]
+    try:
+        from letterboxdpy.pages.user_list import UserList
+        per_page = getattr(UserList, 'LIST_ITEMS_PER_PAGE', 100)
+    except ImportError:
+        per_page = 100
+    count = int(match.group(1).replace(',', ''))
+    pages = max(1, math.ceil(count / per_page))
+    return [base] + [f"{base}page/{page}/" for page in range(1, pages + 1)]
+
+
+def parse_films(slugs: TypingList[str], io_workers: int = IO_WORKERS,
+                parse_workers: int = PARSE_WORKERS) -> TypingList[Union[FilmRecord, Dict[str, Any]]]:
+    """
+    Full metadata for many films, fetched on threads and parsed on every core
+
+    Each film is handed to a worker as soon as its page has downloaded.
+
+    Args:
+        slugs: Letterboxd film slugs
+        io_workers: Concurrent page downloads
+        parse_workers: Parser processes
+
+    Returns:
+        fetch_movie_by_slug-style FilmRecords in input order; a failed film is
+        {'slug': ..., 'error': ...}
+    """
+    parsed: Dict[int, Future] = {}
+    errors: Dict[int, str] = {}
+    with _process_pool(parse_workers) as processes, ThreadPoolExecutor(max_workers=max(1, io_workers)) as threads:
+        def hand_over(index: int, slug: str, download: Future) -> None:
+            try:
+                parsed[index] = processes.submit(_parse_movie, slug, {film_url(slug): download.result()})
+            except Exception as e:
+                errors[index] = str(e)
+
+        for index, slug in enumerate(slugs):
+            download = threads.submit(fetch_html, film_url(slug))
+            download.add_done_callback(lambda done, index=index, slug=slug: hand_over(index, slug, done))
+        threads.shutdown(wait=True)
+
+        results = []
+        for index, slug in enumerate(slugs):
+            try:
+                if index in errors:
+                    raise RuntimeError(errors[index])
+                results.append(parsed[index].result())
+            except Exception as e:
+                results.append({'slug': slug, 'error': str(e)})
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"✅ Parsed {len(results) - failed}/{len(results)} films on {parse_workers} processes")
+    return results
+
+
+def parse_lists(lists: TypingList[Tuple[str, str]], io_workers: int = IO_WORKERS,
+                parse_workers: int = PARSE_WORKERS) -> TypingList[Dict[str, Any]]:
+    """
+    Whole lists with their films, fetched on threads and parsed on every core
+
+    A list's first page is downloaded, its remaining pages are predicted from the
+    film count and downloaded concurrently, and one worker parses the set.
+    Several lists parse in parallel.
+
+    Args:
+        lists: (username, list_slug) pairs
+
+    Returns:
+        fetch_list-style dicts in input order; a failed list is
+        {'username': ..., 'list_slug': ..., 'error': ...}
+    """
+    def download(username: str, list_slug: str) -> Dict[str, str]:
+        base = f"{LETTERBOXD}/{username.lower()}/list/{list_slug}/"
+        first = fetch_html(base)
+        rest = [url for url in list_urls(username, list_slug, first) if url != base]
+        with ThreadPoolExecutor(max_workers=max(1, io_workers)) as threads:
+            bodies = list(threads.map(fetch_html, rest))
+        return {base: first, **dict(zip(rest, bodies))}
+
+    results: TypingList[Optional[Dict[str, Any]]] = []
+    with _process_pool(min(parse_workers, max(1, len(lists)))) as processes, \
+            ThreadPoolExecutor(max_workers=max(1, min(len(lists), io_workers))) as threads:
+        downloads = [threads.submit(download, username, list_slug) for username, list_slug in lists]
+        parses = []
+        for (username, list_slug), pages in zip(lists, downloads):
+            try:
+                parses.append(processes.submit(_parse_list, username, list_slug, pages.result()))
+            except Exception as e:
+                parses.append(e)
+        for (username, list_slug), parse in zip(lists, parses):
+            try:
+                if isinstance(parse, Exception):
+                    raise parse
+                results.append(parse.result())
+            except Exception as e:
+                results.append({'username': username, 'list_slug': list_slug, 'error': str(e)})
+    return results
@@ -0,0 +1,231 @@
+"""
+Direct-Postgres bulk writes (COPY into a temp staging table, then one set-based statement)
+"""
+import csv
+import io
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+from scripts.letterboxd.deadlines import request_timeout
+
+
+def _to_csv(rows: Iterable[Tuple]) -> io.StringIO:
+    """Serialize rows for COPY ... (FORMAT csv); None becomes NULL"""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    buf.seek(0)
+    return buf
+
+
+def _pg_int_array(values: Optional[Iterable[int]]) -> Optional[str]:
+    if not values:
+        return None
+    return '{' + ','.join(str(int(v)) for v in values) + '}'
+
+
+def _apply_deadline(cur) -> None:
+    """Cap every statement in the current transaction by the active deadline"""
+    timeout = request_timeout(float('inf'))
+    if timeout != float('inf'):
+        cur.execute("SET LOCAL statement_timeout = %s", (max(1, int(timeout * 1000)),))
+
+
+class BulkWriter:
+    """
+    Bulk writer for draft_picks / spec_draft_movies over a direct Postgres connection
+
+    Each call streams its rows with COPY into a temp table and applies them with
+    a single UPDATE ... FROM or INSERT ... ON CONFLICT inside one transaction.
+    """
+
+    def __init__(self, db_url: str):
+        try:
+            import psycopg2
+        except ImportError:
+            raise RuntimeError("psycopg2 is required for --db-url (pip install psycopg2-binary)")
+
+        self.conn = psycopg2.connect(db_url)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch_picks_missing_ratings(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Select draft_picks rows that still need a Letterboxd rating
+
+        Args:
+            limit: Maximum number of rows
+
+        Returns:
+            List of dicts shaped like the PostgREST rows (id, movie_id, movie_title, movie_year)
+        """
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                """
+                SELECT id::text, movie_id, movie_title, movie_year
+                FROM public.draft_picks
+                WHERE letterboxd_rating IS NULL AND movie_title IS NOT NULL
+                LIMIT %s
+                """,
+                (limit,)
+            )
+            return [
+                {'id': r[0], 'movie_id': r[1], 'movie_title': r[2], 'movie_year': r[3]}
+                for r in cur.fetchall()
+            ]
+
+    def update_letterboxd_ratings(self, ratings: Iterable[Tuple[str, float]]) -> int:
+        """
+        Apply (draft_pick_id, rating) pairs in one transaction
+
+        Args:
+            ratings: Iterable of (draft_picks.id, rating on 0-5 scale)
+
+        Returns:
+            Number of draft_picks rows updated
+        """
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                """
+                CREATE TEMP TABLE letterboxd_rating_staging (
+                  id UUID PRIMARY KEY,
+                  letterboxd_rating NUMERIC(3,2) NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+            cur.copy_expert(
+                'COPY letterboxd_rating_staging (id, letterboxd_rating) FROM STDIN WITH (FORMAT csv)',
+                _to_csv(ratings)
+            )
+            cur.execute(
+                """
+                UPDATE public.draft_picks AS d
+                SET letterboxd_rating = s.letterboxd_rating
+                FROM letterboxd_rating_staging AS s
+                WHERE d.id = s.id
+                """
+            )
+            return cur.rowcount
+
+    def fetch_score_inputs(self) -> List[Tuple]:
+        """
+        Select the calculate_new_movie_score inputs for every scored draft pick
+
+        Returns:
+            Tuples of (id, movie_budget, movie_revenue, rt_critics_score,
+            metacritic_score, imdb_rating, oscar_status, calculated_score)
+        """
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                """
+                SELECT id::text, movie_budget, movie_revenue, rt_critics_score,
+                       metacritic_score, imdb_rating::float8, oscar_status, calculated_score::float8
+                FROM public.draft_picks
+                WHERE calculated_score IS NOT NULL
+                """
+            )
+            return cur.fetchall()
+
+    def update_calculated_scores(self, scores: Iterable[Tuple[str, float]]) -> int:
+        """
+        Apply (draft_pick_id, calculated_score) pairs in one transaction
+
+        Returns:
+            Number of draft_picks rows updated
+        """
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                """
+                CREATE TEMP TABLE calculated_score_staging (
+                  id UUID PRIMARY KEY,
+                  calculated_score NUMERIC NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+            cur.copy_expert(
+                'COPY calculated_score_staging (id, calculated_score) FROM STDIN WITH (FORMAT csv)',
+                _to_csv(scores)
+            )
+            cur.execute(
+                """
+                UPDATE public.draft_picks AS d
+                SET calculated_score = s.calculated_score
+                FROM calculated_score_staging AS s
+                WHERE d.id = s.id
+                """
+            )
+            return cur.rowcount
+
+    def existing_spec_draft_tmdb_ids(self, spec_draft_id: str) -> set:
+        """Return the TMDB ids already in a spec draft"""
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                'SELECT movie_tmdb_id FROM public.spec_draft_movies WHERE spec_draft_id = %s',
+                (spec_draft_id,)
+            )
+            return {r[0] for r in cur.fetchall()}
+
+    def insert_spec_draft_movies(self, movies: Iterable[Dict[str, Any]]) -> List[Tuple[str, int]]:
+        """
+        Insert spec_draft_movies rows, skipping ones already present
+
+        Args:
+            movies: Dicts with spec_draft_id, movie_tmdb_id, movie_title, movie_year,
+                movie_genres and optionally movie_poster_path
+
+        Returns:
+            (id, movie_tmdb_id) for each newly inserted row
+        """
+        rows = (
+            (
+                m['spec_draft_id'],
+                m['movie_tmdb_id'],
+                m['movie_title'],
+                m.get('movie_year'),
+                m.get('movie_poster_path'),
+                _pg_int_array(m.get('movie_genres')),
+            )
+            for m in movies
+        )
+        with self.conn, self.conn.cursor() as cur:
+            _apply_deadline(cur)
+            cur.execute(
+                """
+                CREATE TEMP TABLE spec_draft_movies_staging (
+                  spec_draft_id UUID NOT NULL,
+                  movie_tmdb_id INTEGER NOT NULL,
+                  movie_title TEXT NOT NULL,
+                  movie_year INTEGER,
+                  movie_poster_path TEXT,
+                  movie_genres INTEGER[]
+                ) ON COMMIT DROP
+                """
+            )
+            cur.copy_expert(
+                'COPY spec_draft_movies_staging FROM STDIN WITH (FORMAT csv)',
+                _to_csv(rows)
+            )
+            cur.execute(
+                """
+                INSERT INTO public.spec_draft_movies
+                  (spec_draft_id, movie_tmdb_id, movie_title, movie_year, movie_poster_path, movie_genres)
+                SELECT DISTINCT ON (spec_draft_id, movie_tmdb_id)
+                  spec_draft_id, movie_tmdb_id, movie_title, movie_year, movie_poster_path, movie_genres
+                FROM spec_draft_movies_staging
+                ON CONFLICT (spec_draft_id, movie_tmdb_id) DO NOTHING
+                RETURNING id::text, movie_tmdb_id
+                """
+            )
+            return [(r[0], r[1]) for r in cur.fetchall()]
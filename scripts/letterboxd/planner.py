@@ -0,0 +1,229 @@
+"""
+Execution plans for --dry-run: what a real run would fetch, write and how long it would take
+"""
+import os
+import math
+from typing import Dict, Any, Iterable, Optional
+
+from scripts.letterboxd.fetcher import get_page_cache, CONDITIONAL_FETCH
+from scripts.letterboxd.rate_limit import RATE_LIMIT
+from scripts.letterboxd.film_cache import get_film_cache
+from scripts.letterboxd.film_registry import get_film_registry, is_fresh
+from scripts.letterboxd.title_index import local_tmdb_id
+from scripts.letterboxd.utils import normalize_title
+
+# Used for page kinds this machine has no recorded request times for yet (seconds)
+DEFAULT_LATENCY = {'film': 0.8, 'search': 1.0, 'list': 1.0, 'other': 1.0}
+# Share of guessed slugs that miss and fall through to a search
+GUESS_MISS_RATE = float(os.getenv('LETTERBOXD_PLAN_GUESS_MISS_RATE', '0.5'))
+# Rough Supabase round trips (seconds); there is no recorded history for these
+DB_CALL_SECONDS = 0.15
+BULK_WRITE_SECONDS = 1.0
+FUNCTION_CALL_SECONDS = 2.0
+
+
+class ExecutionPlan:
+    """
+    Expected work for one run: films, how each would be answered, upstream
+    requests by page kind, database calls, and the wall time they add up to
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.distinct_films = 0
+        self.paths: Dict[str, int] = {}
+        self.requests: Dict[str, float] = {}
+        self.db_reads = 0
+        self.db_writes = 0
+        self.bulk_writes = 0
+        self.function_calls = 0
+        self.notes = []
+
+    def count_path(self, path: str, films: int = 1) -> None:
+        self.paths[path] = self.paths.get(path, 0) + films
+
+    def add_requests(self, kind: str, count: float) -> None:
+        self.requests[kind] = self.requests.get(kind, 0.0) + count
+
+    def latencies(self) -> Dict[str, Dict[str, Any]]:
+        """Mean request time per page kind: recorded where available, else the default"""
+        # LETTERBOXD_CONDITIONAL_FETCH=0 turns the page cache off, so there's nothing recorded
+        recorded = get_page_cache().latency_stats() if CONDITIONAL_FETCH else {}
+        latencies = {}
+        for kind in set(DEFAULT_LATENCY) | set(self.requests):
+            stats = recorded.get(kind)
+            if stats and stats['samples'] >= 5:
+                latencies[kind] = {'seconds': stats['mean_seconds'], 'samples': stats['samples']}
+            else:
+                latencies[kind] = {'seconds': DEFAULT_LATENCY.get(kind, DEFAULT_LATENCY['other']), 'samples': 0}
+        return latencies
+
+    def estimate_seconds(self) -> float:
+        """
+        Sequential wall time: requests and database/function calls; requests
+        never go faster than the host-wide rate limit allows
+        """
+        latencies = self.latencies()
+        seconds = sum(count * latencies[kind]['seconds'] for kind, count in self.requests.items())
+        if RATE_LIMIT > 0:
+            seconds = max(seconds, sum(self.requests.values()) / RATE_LIMIT)
+        seconds += (self.db_reads + self.db_writes) * DB_CALL_SECONDS
+        seconds += self.bulk_writes * BULK_WRITE_SECONDS
+        seconds += self.function_calls * FUNCTION_CALL_SECONDS
+        return seconds
+
+    def report(self) -> None:
+        latencies = self.latencies()
+        seconds = self.estimate_seconds()
+        print(f"\n🧮 Execution plan ({self.name}):")
+        print(f"  📽️  {self.rows} rows → {self.distinct_films} distinct films")
+        for path, films in sorted(self.paths.items(), key=lambda item: -item[1]):
+            print(f"     {films:>6}  {path}")
+        total = sum(self.requests.values())
+        print(f"  🌐 ~{total:.0f} Letterboxd requests")
+        for kind, count in sorted(self.requests.items()):
+            latency = latencies[kind]
+            source = f"recorded over {latency['samples']} requests" if latency['samples'] else "default"
+            print(f"     {count:>8.1f}  {kind} pages × {latency['seconds']:.2f}s ({source})")
+        if RATE_LIMIT > 0:
+            print(f"  🚦 Host-wide ceiling: {RATE_LIMIT:g} requests/s shared with other running jobs")
+        print(f"  💾 {self.db_reads} DB reads, {self.db_writes} DB writes, {self.bulk_writes} bulk writes"
+              + (f", {self.function_calls} edge function calls" if self.function_calls else ""))
+        print(f"  ⏱️  Estimated wall time: {seconds / 60:.1f} min ({seconds:.0f}s)")
+        for note in self.notes:
+            print(f"  ℹ️  {note}")
+
+
+def _film_key(tmdb_id: Optional[int], title: Optional[str], year: Optional[int]) -> str:
+    return f"tmdb:{tmdb_id}" if tmdb_id else f"title:{normalize_title(title or '')}|{year or ''}"
+
+
+def plan_rating_fetch(rows: Iterable[Dict[str, Any]], bulk: bool = False, batch_size: int = 500) -> ExecutionPlan:
+    """
+    Plan batch_fetch_ratings for the rows it would process
+
+    Follows the real lookup order per distinct film: registry prefilter, local
+    film cache, registry, known slug probe, then slug guess with a search
+    fallback (GUESS_MISS_RATE of guesses are assumed to miss).
+
+    Args:
+        rows: draft_picks rows (id, movie_id, movie_title, movie_year)
+        bulk: Ratings are written with COPY in batches (--db-url) instead of one update per pick
+        batch_size: Ratings per bulk write
+    """
+    rows = list(rows)
+    plan = ExecutionPlan('batch_fetch_ratings')
+    plan.rows = len(rows)
+
+    films: Dict[str, Dict[str, Any]] = {}
+    picks_per_film: Dict[str, int] = {}
+    for row in rows:
+        tmdb_id = row.get('movie_id') or local_tmdb_id(row.get('movie_title'), row.get('movie_year'))
+        key = _film_key(tmdb_id, row.get('movie_title'), row.get('movie_year'))
+        films.setdefault(key, {'tmdb_id': tmdb_id, 'title': row.get('movie_title'), 'year': row.get('movie_year')})
+        picks_per_film[key] = picks_per_film.get(key, 0) + 1
+    plan.distinct_films = len(films)
+
+    registry = get_film_registry()
+    registered = {}
+    if registry:
+        try:
+            registered = registry.get_many(f['tmdb_id'] for f in films.values() if f['tmdb_id'])
+            plan.db_reads += 1
+        except Exception as e:
+            plan.notes.append(f"Film registry unavailable ({e}); registry hits not counted")
+    else:
+        plan.notes.append("No film registry configured; registry hits not counted")
+
+    cache = get_film_cache()
+    rated_picks = 0
+    scraped = 0
+    for key, film in films.items():
+        record = registered.get(film['tmdb_id']) if film['tmdb_id'] else None
+        cached = cache.get(film['tmdb_id'], film['title'], film['year'])
+        picks = picks_per_film[key]
+        if is_fresh(record):
+            plan.count_path('film registry (no request)')
+            rated_picks += picks
+            continue
+        if cached and cached['fresh']:
+            plan.count_path('local film cache (no request)')
+            rated_picks += picks
+            continue
+        scraped += 1
+        rated_picks += picks
+        if (cached and cached['slug']) or (record and record.get('slug')):
+            plan.count_path('known slug probe')
+            plan.add_requests('film', 1)
+        else:
+            plan.count_path('slug guess, search on miss')
+            plan.add_requests('film', 1 + GUESS_MISS_RATE)
+            plan.add_requests('search', GUESS_MISS_RATE)
+
+    registry_writes = scraped if registry else 0
+    if bulk:
+        plan.bulk_writes = math.ceil(rated_picks / batch_size) if rated_picks else 0
+        plan.db_writes = registry_writes
+    else:
+        plan.db_writes = rated_picks + registry_writes
+    if len(films) < len(rows):
+        plan.notes.append(
+            f"{len(rows) - len(films)} picks share a film with another pick and are answered from its fetch"
+        )
+    return plan
+
+
+def plan_list_sync(films: Iterable[Any], existing_tmdb_ids: Optional[set] = None, bulk: bool = False,
+                   enrich: bool = True) -> ExecutionPlan:
+    """
+    Plan sync_list_to_spec_draft for an already fetched list
+
+    Each new film costs one film page fetch (genres and rating, plus
+    the TMDB id when the list entry has no TMDB link).
+
+    Args:
+        films: letterboxdpy list films
+        existing_tmdb_ids: TMDB ids already in the spec draft (None if unknown)
+        bulk: Rows are inserted with one COPY (--db-url) instead of a check and insert per film
+        enrich: The sequel-enrichment function is called per inserted row
+    """
+    from scripts.letterboxd.utils import extract_tmdb_id_from_url
+
+    films = list(films)
+    plan = ExecutionPlan('sync_to_supabase')
+    plan.rows = len(films)
+    existing = existing_tmdb_ids or set()
+    if existing_tmdb_ids is None:
+        plan.notes.append("Existing spec draft rows unknown; every film counted as new")
+
+    seen = set()
+    new = 0
+    for film in films:
+        slug = getattr(film, 'slug', None)
+        tmdb_id = extract_tmdb_id_from_url(getattr(film, 'tmdb_link', None))
+        key = f"tmdb:{tmdb_id}" if tmdb_id else f"slug:{slug}"
+        if key in seen:
+            continue
+        seen.add(key)
+        if not tmdb_id and not slug:
+            plan.count_path('no TMDB link or slug (skipped)')
+            continue
+        if tmdb_id and tmdb_id in existing:
+            plan.count_path('already in spec draft (no request)')
+            continue
+        plan.count_path('film page fetch' if tmdb_id else 'film page fetch for TMDB id')
+        plan.add_requests('film', 1)
+        new += 1
+    plan.distinct_films = len(seen)
+
+    if bulk:
+        plan.db_reads = 1
+        plan.bulk_writes = 1 if new else 0
+    else:
+        plan.db_reads = new
+        plan.db_writes = new
+    if get_film_registry():
+        plan.db_writes += new  # film registry upserts
+    plan.function_calls = new if enrich else 0
+    return plan
@@ -0,0 +1,148 @@
+"""
+Warm the local film cache for spec drafts that are about to be played
+"""
+import sys
+import os
+import datetime
+from typing import List, Dict, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import scripts.letterboxd.compat
+
+from scripts.letterboxd.utils import get_supabase_client, pop_flag, pop_option
+from scripts.letterboxd.fetch_movie_rating import get_letterboxd_rating
+from scripts.letterboxd.film_cache import get_film_cache
+from scripts.letterboxd.session import report_connection_stats
+from scripts.letterboxd.rate_limit import request_lane, BATCH
+from scripts.letterboxd.profiling import profiled
+
+
+def lower_priority(increment: int = 10) -> None:
+    """Renice this process so a prefetch never competes with live draft traffic"""
+    try:
+        os.nice(increment)
+    except (AttributeError, OSError):
+        pass
+
+
+def upcoming_spec_draft_ids(hours: float, supabase=None) -> List[str]:
+    """
+    Spec drafts behind league drafts scheduled to start within the next N hours
+
+    league_drafts rows of type 'spec-draft' store the spec_drafts id in theme;
+    rows that already have a draft_id have started and are skipped.
+
+    Args:
+        hours: Look-ahead window
+        supabase: Optional existing Supabase client
+
+    Returns:
+        Distinct spec draft ids, earliest draft first
+    """
+    supabase = supabase or get_supabase_client()
+    if not supabase:
+        return []
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    until = now + datetime.timedelta(hours=hours)
+    result = supabase.table('league_drafts')\
+        .select('theme, scheduled_at')\
+        .eq('draft_type', 'spec-draft')\
+        .is_('draft_id', 'null')\
+        .gte('scheduled_at', now.isoformat())\
+        .lte('scheduled_at', until.isoformat())\
+        .order('scheduled_at')\
+        .execute()
+
+    ids: List[str] = []
+    for row in result.data or []:
+        if row.get('theme') and row['theme'] not in ids:
+            ids.append(row['theme'])
+    return ids
+
+
+def spec_draft_candidates(spec_draft_id: str, supabase=None) -> List[Dict[str, Any]]:
+    """Candidate films (tmdb id, title, year) of a spec draft"""
+    supabase = supabase or get_supabase_client()
+    if not supabase:
+        return []
+    result = supabase.table('spec_draft_movies')\
+        .select('movie_tmdb_id, movie_title, movie_year')\
+        .eq('spec_draft_id', spec_draft_id)\
+        .execute()
+    return result.data or []
+
+
+def prefetch_spec_drafts(spec_draft_ids: List[str], supabase=None) -> Dict[str, int]:
+    """
+    Fetch and cache the Letterboxd slug and rating of every candidate film
+
+    Films already fresh in the cache cost nothing; the rest are looked up one
+    at a time in the batch lane of the host-wide rate limit, so live lookups
+    take the next token whenever both are waiting.
+
+    Args:
+        spec_draft_ids: Spec drafts to warm
+        supabase: Optional existing Supabase client
+
+    Returns:
+        Counts of candidates, cache hits, warmed films and misses
+    """
+    supabase = supabase or get_supabase_client()
+    if not supabase:
+        print("❌ Cannot connect to Supabase")
+        return {}
+
+    cache = get_film_cache()
+    stats = {'candidates': 0, 'already_cached': 0, 'warmed': 0, 'not_found': 0}
+    seen = set()
+
+    for spec_draft_id in spec_draft_ids:
+        films = spec_draft_candidates(spec_draft_id, supabase)
+        print(f"🎬 Spec draft {spec_draft_id}: {len(films)} candidates")
+
+        for film in films:
+            key = (film.get('movie_tmdb_id'), film.get('movie_title'), film.get('movie_year'))
+            if key in seen or not film.get('movie_title'):
+                continue
+            seen.add(key)
+            stats['candidates'] += 1
+
+            cached = cache.get(*key)
+            if cached and cached['fresh']:
+                stats['already_cached'] += 1
+                continue
+
+            with request_lane(BATCH):
+                rating = get_letterboxd_rating(film['movie_title'], film.get('movie_year'), film.get('movie_tmdb_id'))
+            if rating is not None:
+                stats['warmed'] += 1
+            else:
+                stats['not_found'] += 1
+
+    print(f"\n📊 Prefetch summary:")
+    print(f"  Candidates: {stats['candidates']}")
+    print(f"  Already cached: {stats['already_cached']}")
+    print(f"  Warmed: {stats['warmed']}")
+    print(f"  Not found: {stats['not_found']}")
+    report_connection_stats()
+    return stats
+
+
+if __name__ == "__main__":
+    profile = pop_flag(sys.argv, '--profile')
+    hours = pop_option(sys.argv, '--upcoming-hours')
+
+    if len(sys.argv) < 2 and hours is None:
+        print("Usage: python prefetch.py <spec_draft_id> [...] [--profile]")
+        print("       python prefetch.py --upcoming-hours N [--profile]")
+        sys.exit(1)
+
+    lower_priority()
+    with profiled('prefetch', profile):
+        ids = sys.argv[1:]
+        if hours is not None:
+            ids += [i for i in upcoming_spec_draft_ids(float(hours)) if i not in ids]
+            print(f"🗓️  {len(ids)} spec drafts starting within {hours}h")
+        prefetch_spec_drafts(ids)
@@ -0,0 +1,124 @@
+"""
+Opt-in profiling for Letterboxd entry points (--profile)
+"""
+import os
+import sys
+import time
+import threading
+import cProfile
+import pstats
+import tracemalloc
+import contextlib
+from collections import Counter
+from typing import Optional
+
+PROFILE_DIR = os.getenv('LETTERBOXD_PROFILE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'profiles-runs'
+)
+SAMPLE_INTERVAL = float(os.getenv('LETTERBOXD_PROFILE_INTERVAL_MS', '5')) / 1000
+
+
+class StackSampler:
+    """
+    Periodically samples every thread's stack into collapsed-stack counts
+
+    The output format ("frame;frame;frame count" per line) is what
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, 'w') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextlib.contextmanager
+def _profile_run(name: str, output_dir: str):
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    base = os.path.join(output_dir, f"{name}-{stamp}")
+
+    tracemalloc.start()
+    sampler = StackSampler()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(base + '.prof')
+        sampler.write_collapsed(base + '.collapsed')
+
+        # stderr, so a profiled run's stdout (e.g. --batch NDJSON) stays machine-readable
+        print(f"\n⏱️  Profile: {name}", file=sys.stderr)
+        print(f"  Wall time: {elapsed:.2f}s", file=sys.stderr)
+        print(f"  Peak traced memory: {peak / (1024 * 1024):.1f} MiB", file=sys.stderr)
+        print(f"  Stack samples: {sum(sampler.counts.values())} (every {sampler.interval * 1000:.0f} ms)", file=sys.stderr)
+        print(f"  cProfile stats: {base}.prof (snakeviz / python -m pstats)", file=sys.stderr)
+        print(f"  Collapsed stacks: {base}.collapsed (flamegraph.pl / speedscope)", file=sys.stderr)
+        print("  Top functions by cumulative time:", file=sys.stderr)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats('cumulative').print_stats(15)
+
+
+def profiled(name: str, enabled: bool, output_dir: Optional[str] = None):
+    """
+    Profile a block when enabled, otherwise do nothing
+
+    When enabled this runs cProfile, a wall-clock stack sampler (so network
+    waits show up next to BeautifulSoup parsing) and tracemalloc, then writes
+    <name>-<timestamp>.prof and .collapsed files. Disabled, it returns a
+    nullcontext and adds no overhead.
+
+    Args:
+        name: Entry point name used in output file names
+        enabled: Whether --profile was passed
+        output_dir: Where to write results (defaults to LETTERBOXD_PROFILE_DIR)
+
+    Returns:
+        A context manager
+    """
+    if not enabled:
+        return contextlib.nullcontext()
+    return _profile_run(name, output_dir or PROFILE_DIR)
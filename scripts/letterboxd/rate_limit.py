@@ -0,0 +1,214 @@
+"""
+Host-wide Letterboxd request budget shared by every process
+
+A token bucket kept in one SQLite file. Every Letterboxd request takes a token
+first, whichever script, thread or worker process makes it, so a cron list sync
+running next to a ratings backfill shares one ceiling instead of each pacing
+itself. SQLite's write lock (BEGIN IMMEDIATE) serializes the read-refill-take
+step across processes; waiting for a token happens outside it.
+
+Within a process, requests wait in one of two lanes. Live lookups run under
+request_lane('interactive') and always get the next token this process takes;
+everything else is the batch lane, which still gets at least BATCH_MIN_SHARE of
+the tokens while both lanes are waiting, so a backfill never stalls entirely.
+"""
+import os
+import time
+import sqlite3
+import threading
+import contextvars
+import contextlib
+from collections import deque
+from typing import Optional, Dict, Any, Deque
+
+from scripts.letterboxd.fetcher import CACHE_DIR
+from scripts.letterboxd.deadlines import current_deadline, DeadlineExceeded
+
+# Requests per second across every process on the host; 0 disables the limit
+RATE_LIMIT = float(os.getenv('LETTERBOXD_RATE_LIMIT', '1'))
+# Tokens that may be saved up while idle and spent at once
+RATE_BURST = float(os.getenv('LETTERBOXD_RATE_BURST', '5'))
+# Bucket file; point every checkout at the same path to share one budget
+RATE_LIMIT_PATH = os.getenv('LETTERBOXD_RATE_LIMIT_FILE') or os.path.join(CACHE_DIR, 'rate_limit.sqlite')
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+LANES = (INTERACTIVE, BATCH)
+# Share of this process's tokens the batch lane keeps while interactive requests are waiting
+BATCH_MIN_SHARE = float(os.getenv('LETTERBOXD_BATCH_MIN_SHARE', '0.2'))
+# Recent grants the share is measured over
+SHARE_WINDOW = 20
+
+_lane: contextvars.ContextVar = contextvars.ContextVar('letterboxd_lane', default=BATCH)
+
+
+@contextlib.contextmanager
+def request_lane(lane: str):
+    """
+    Send the Letterboxd requests made in a block through a lane
+
+    Args:
+        lane: 'interactive' for live lookups someone is waiting on, 'batch' for background work
+    """
+    if lane not in LANES:
+        raise ValueError(f"lane must be one of {', '.join(LANES)}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class HostRateLimiter:
+    """
+    Token bucket in a SQLite file: `rate` tokens per second, at most `burst` saved
+
+    Timestamps are wall-clock (time.time()) because the monotonic clock isn't
+    shared between processes; a clock step backwards just refills nothing.
+    Only the thread at the head of the lane whose turn it is polls the bucket;
+    the others wait on a condition and are woken when the turn may change.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_PATH, rate: float = RATE_LIMIT, burst: float = RATE_BURST):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS bucket ('
+            ' name TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        self._turn = threading.Condition()
+        self._queues: Dict[str, Deque[object]] = {lane: deque() for lane in LANES}
+        self._grants: Deque[str] = deque(maxlen=SHARE_WINDOW)
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=1000) for lane in LANES}
+        self._granted = {lane: 0 for lane in LANES}
+
+    def _take(self) -> float:
+        """
+        Take a token if one is available
+
+        Returns:
+            0 if a token was taken, else seconds until the next one is due
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM bucket WHERE name = 'letterboxd'").fetchone()
+                tokens = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO bucket (name, tokens, updated_at) VALUES ('letterboxd', ?, ?)",
+                    (tokens, now)
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return wait
+
+    def _next_lane(self) -> Optional[str]:
+        """Lane whose head takes the next token: interactive, unless batch is owed its minimum share"""
+        if not self._queues[BATCH]:
+            return INTERACTIVE if self._queues[INTERACTIVE] else None
+        if not self._queues[INTERACTIVE]:
+            return BATCH
+        batch_grants = sum(1 for lane in self._grants if lane == BATCH)
+        return BATCH if batch_grants < BATCH_MIN_SHARE * SHARE_WINDOW else INTERACTIVE
+
+    def acquire(self, lane: Optional[str] = None) -> float:
+        """
+        Block until this process may send one request
+
+        Args:
+            lane: 'interactive' or 'batch'; defaults to the current request_lane
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            DeadlineExceeded: If the current deadline passes before a token is due
+        """
+        if self.rate <= 0:
+            return 0.0
+        lane = lane or _lane.get()
+        deadline = current_deadline()
+        ticket = object()
+        started = time.monotonic()
+        slept = False
+        with self._turn:
+            self._queues[lane].append(ticket)
+            # An interactive arrival takes the turn from a sleeping batch head
+            self._turn.notify_all()
+            try:
+                while True:
+                    if self._next_lane() == lane and self._queues[lane][0] is ticket:
+                        wait = self._take()
+                        if not wait:
+                            break
+                    else:
+                        # Not our turn: wait to be woken, bounded so a lost wakeup can't stall us
+                        wait = 1.0 / self.rate
+                    remaining = deadline.remaining()
+                    if remaining is not None and remaining < wait:
+                        raise DeadlineExceeded("deadline passes before a request token is available")
+                    self._turn.wait(wait)
+                    slept = True
+            finally:
+                self._queues[lane].remove(ticket)
+                self._turn.notify_all()
+            self._grants.append(lane)
+            self._granted[lane] += 1
+            waited = time.monotonic() - started if slept else 0.0
+            self._waits[lane].append(waited)
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Tokens taken per lane in this process, with p50/p99 wait for the recent ones"""
+        with self._turn:
+            return {
+                lane: {
+                    'requests': self._granted[lane],
+                    'p50_wait_seconds': round(_percentile(self._waits[lane], 0.5), 3),
+                    'p99_wait_seconds': round(_percentile(self._waits[lane], 0.99), 3),
+                }
+                for lane in LANES
+            }
+
+
+_limiter: Optional[HostRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Return the process-wide handle on the host bucket, opening it on first use"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = HostRateLimiter()
+        return _limiter
+
+
+def acquire_request_token() -> float:
+    """
+    Wait for the host-wide budget before one Letterboxd request, in the current
+    request_lane (no-op when LETTERBOXD_RATE_LIMIT=0)
+    """
+    if RATE_LIMIT <= 0:
+        return 0.0
+    return get_rate_limiter().acquire()
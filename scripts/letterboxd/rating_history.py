@@ -0,0 +1,342 @@
+"""
+Append-only Letterboxd rating history per film, delta-encoded
+
+Backfills overwrite letterboxd_rating; this keeps the trajectory. Each film's
+history is one blob of varint pairs (minutes since the previous point, change
+in rating×100), so a daily refresh that moves a rating by a few hundredths adds
+about three bytes. A refresh that finds the same rating only bumps the film's
+checked_at, since the series is a step function and the point adds nothing.
+Histories are held in memory once loaded, so range queries ("change over the
+last 30 days") never touch the disk.
+"""
+import sys
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.fetcher import CACHE_DIR
+
+HISTORY_ENABLED = os.getenv('LETTERBOXD_RATING_HISTORY', '1') != '0'
+DAY_MINUTES = 24 * 60
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    value = _zigzag(value)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_points(points: Iterable[Tuple[int, int]], previous: Tuple[int, int] = (0, 0)) -> bytes:
+    """
+    Delta-encode (minute, rating×100) points
+
+    Args:
+        points: Points in time order
+        previous: Last point already encoded before these ((0, 0) for a new series)
+    """
+    out = bytearray()
+    last_minute, last_rating = previous
+    for minute, rating in points:
+        _put_varint(out, minute - last_minute)
+        _put_varint(out, rating - last_rating)
+        last_minute, last_rating = minute, rating
+    return bytes(out)
+
+
+def decode_points(blob: bytes) -> List[Tuple[int, int]]:
+    """Inverse of encode_points for a whole series"""
+    points = []
+    values = []
+    value = shift = 0
+    for byte in blob:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(_unzigzag(value))
+        value = shift = 0
+        if len(values) == 2:
+            minute = (points[-1][0] if points else 0) + values[0]
+            rating = (points[-1][1] if points else 0) + values[1]
+            points.append((minute, rating))
+            values = []
+    return points
+
+
+class _Series:
+    """One film's history: the encoded blob plus its last point, so appends never decode"""
+
+    __slots__ = ('blob', 'last_minute', 'last_rating', 'checked_minute', '_points')
+
+    def __init__(self, blob: bytes, last_minute: int, last_rating: int, checked_minute: int):
+        self.blob = blob
+        self.last_minute = last_minute
+        self.last_rating = last_rating
+        self.checked_minute = checked_minute
+        self._points: Optional[List[Tuple[int, int]]] = None
+
+    def points(self) -> List[Tuple[int, int]]:
+        if self._points is None:
+            self._points = decode_points(self.blob)
+        return self._points
+
+    def rating_at(self, minute: int) -> Optional[int]:
+        """Rating×100 in effect at a minute (the latest point at or before it)"""
+        if minute >= self.last_minute:
+            return self.last_rating
+        rating = None
+        for point_minute, point_rating in self.points():
+            if point_minute > minute:
+                break
+            rating = point_rating
+        return rating
+
+
+class RatingHistory:
+    """
+    SQLite-backed store of delta-encoded rating series, keyed by TMDB id
+
+    Writes go straight to SQLite (read-modify-write in one transaction, so
+    several processes can append to the same file); reads are served from an
+    in-memory copy loaded on first query.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.path.join(CACHE_DIR, 'rating_history.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS history ('
+            ' tmdb_id INTEGER PRIMARY KEY,'
+            ' points BLOB NOT NULL,'
+            ' last_minute INTEGER NOT NULL,'
+            ' last_rating INTEGER NOT NULL,'
+            ' checked_minute INTEGER NOT NULL)'
+        )
+        self._series: Optional[Dict[int, _Series]] = None
+
+    def _load(self) -> Dict[int, _Series]:
+        if self._series is None:
+            rows = self._conn.execute(
+                'SELECT tmdb_id, points, last_minute, last_rating, checked_minute FROM history'
+            ).fetchall()
+            self._series = {row[0]: _Series(bytes(row[1]), row[2], row[3], row[4]) for row in rows}
+        return self._series
+
+    def append(self, tmdb_id: int, rating: float, at: Optional[float] = None) -> bool:
+        """
+        Record one observed rating
+
+        Args:
+            tmdb_id: TMDB id of the film
+            rating: Average rating (0-5)
+            at: Unix time of the observation (now by default); older than the
+                film's last point is ignored, the series only grows forward
+
+        Returns:
+            True if a point was added, False if the rating was unchanged (or stale)
+        """
+        return self.append_many([(tmdb_id, rating, at)]) == 1
+
+    def append_many(self, observations: Iterable[Tuple[int, float, Optional[float]]]) -> int:
+        """
+        Record many (tmdb_id, rating, at) observations in one transaction
+
+        Returns:
+            Number of points added
+        """
+        added = 0
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                updated = {}
+                for tmdb_id, rating, at in observations:
+                    tmdb_id = int(tmdb_id)
+                    minute = int((time.time() if at is None else at) // 60)
+                    value = int(round(float(rating) * 100))
+                    series = updated.get(tmdb_id)
+                    if series is None:
+                        row = self._conn.execute(
+                            'SELECT points, last_minute, last_rating, checked_minute FROM history WHERE tmdb_id = ?',
+                            (tmdb_id,)
+                        ).fetchone()
+                        series = _Series(bytes(row[0]), row[1], row[2], row[3]) if row else None
+                    if series is None:
+                        series = _Series(encode_points([(minute, value)]), minute, value, minute)
+                        added += 1
+                    else:
+                        series.checked_minute = max(series.checked_minute, minute)
+                        if minute >= series.last_minute and value != series.last_rating:
+                            series.blob += encode_points([(minute, value)], (series.last_minute, series.last_rating))
+                            series.last_minute, series.last_rating = minute, value
+                            added += 1
+                    updated[tmdb_id] = series
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO history (tmdb_id, points, last_minute, last_rating, checked_minute)'
+                    ' VALUES (?, ?, ?, ?, ?)',
+                    [(tmdb_id, s.blob, s.last_minute, s.last_rating, s.checked_minute) for tmdb_id, s in updated.items()]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            if self._series is not None:
+                self._series.update(updated)
+        return added
+
+    def series(self, tmdb_id: int, since: Optional[float] = None,
+               until: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        (unix time, rating) points for a film, optionally limited to a time range
+        """
+        with self._lock:
+            series = self._load().get(int(tmdb_id))
+            points = series.points() if series else []
+        low = -1 if since is None else since // 60
+        high = float('inf') if until is None else until // 60
+        return [(minute * 60.0, rating / 100) for minute, rating in points if low <= minute <= high]
+
+    def rating_at(self, tmdb_id: int, at: float) -> Optional[float]:
+        """Rating in effect at a time, or None before the film's first observation"""
+        with self._lock:
+            series = self._load().get(int(tmdb_id))
+            value = series.rating_at(int(at // 60)) if series else None
+        return None if value is None else value / 100
+
+    def changes(self, tmdb_ids: Iterable[int], days: float = 30,
+                now: Optional[float] = None) -> Dict[int, Dict[str, float]]:
+        """
+        Rating change over the last `days` for many films
+
+        The baseline is the rating in effect when the window opened, or the
+        first observation inside it for films first seen since.
+
+        Returns:
+            {tmdb_id: {'from', 'to', 'change', 'days'}} for films with history
+            ('days' is the span actually covered)
+        """
+        now_minute = int((time.time() if now is None else now) // 60)
+        start = now_minute - int(days * DAY_MINUTES)
+        results = {}
+        with self._lock:
+            loaded = self._load()
+            for tmdb_id in tmdb_ids:
+                series = loaded.get(int(tmdb_id))
+                if series is None:
+                    continue
+                current = series.rating_at(now_minute)
+                if current is None:
+                    continue
+                baseline = series.rating_at(start)
+                baseline_minute = start
+                if baseline is None:
+                    baseline_minute, baseline = series.points()[0]
+                results[int(tmdb_id)] = {
+                    'from': baseline / 100,
+                    'to': current / 100,
+                    'change': (current - baseline) / 100,
+                    'days': round((now_minute - baseline_minute) / DAY_MINUTES, 1),
+                }
+        return results
+
+    def change(self, tmdb_id: int, days: float = 30, now: Optional[float] = None) -> Optional[float]:
+        """Rating change over the last `days`, or None without history"""
+        result = self.changes([tmdb_id], days, now).get(int(tmdb_id))
+        return result['change'] if result else None
+
+    def stats(self) -> Dict[str, int]:
+        """Films, stored points and encoded bytes"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(points)), 0) FROM history'
+            ).fetchone()
+            points = sum(len(s.points()) for s in self._load().values())
+        return {'films': row[0], 'points': points, 'bytes': row[1]}
+
+
+_history: Optional[RatingHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_rating_history() -> RatingHistory:
+    """Return the process-wide rating history, creating it on first use"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = RatingHistory()
+        return _history
+
+
+def record_rating(tmdb_id: Optional[int], rating: Optional[float]) -> None:
+    """Append an observed rating (no-op without both, or when LETTERBOXD_RATING_HISTORY=0)"""
+    if not HISTORY_ENABLED or not tmdb_id or rating is None:
+        return
+    try:
+        get_rating_history().append(tmdb_id, rating)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠️  Rating history write failed for TMDB {tmdb_id}: {e}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        # Daily refreshes of many films into a scratch file, to size the store
+        import random
+        import tempfile
+
+        films = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+        days = int(sys.argv[3]) if len(sys.argv) > 3 else 365
+        with tempfile.TemporaryDirectory() as scratch:
+            history = RatingHistory(os.path.join(scratch, 'history.sqlite'))
+            ratings = {tmdb_id: random.randint(250, 420) for tmdb_id in range(1, films + 1)}
+            start = time.time() - days * 86400
+            for day in range(days):
+                at = start + day * 86400
+                for tmdb_id in ratings:
+                    if random.random() < 0.3:
+                        ratings[tmdb_id] += random.choice((-2, -1, 1, 2))
+                history.append_many(
+                    (tmdb_id, rating / 100, at + random.randint(0, 3600)) for tmdb_id, rating in ratings.items()
+                )
+            stats = history.stats()
+            size = os.path.getsize(history.path)
+            started = time.perf_counter()
+            history.changes(ratings, 30)
+            elapsed = (time.perf_counter() - started) * 1000
+        print(f"📈 {films} films × {days} daily refreshes: {stats['points']} changed ratings stored")
+        print(f"  encoded: {stats['bytes'] / 1e6:.2f} MB ({stats['bytes'] / max(stats['points'], 1):.1f} B/point)")
+        print(f"  SQLite file: {size / 1e6:.2f} MB")
+        print(f"  30-day change for every film: {elapsed:.0f} ms")
+        sys.exit(0)
+
+    if len(sys.argv) < 2 or not sys.argv[1].isdigit():
+        print("Usage: python rating_history.py <tmdb_id> [days]")
+        print("       python rating_history.py simulate [films] [days]")
+        sys.exit(1)
+
+    tmdb_id = int(sys.argv[1])
+    days = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    history = get_rating_history()
+    points = history.series(tmdb_id)
+    if not points:
+        print(f"❓ No rating history for TMDB ID {tmdb_id}")
+        sys.exit(1)
+    for at, rating in points[-20:]:
+        print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(at))}  {rating:.2f}")
+    result = history.changes([tmdb_id], days)[tmdb_id]
+    print(f"📈 {result['from']:.2f} → {result['to']:.2f} ({result['change']:+.2f}) over {result['days']:g} days")
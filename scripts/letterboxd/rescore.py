@@ -0,0 +1,235 @@
+"""
+Vectorized bulk recomputation of draft_picks.calculated_score
+
+Mirrors public.calculate_new_movie_score (latest: 20260430120000_box_office_flop_penalty.sql)
+and src/utils/scoreCalculator.ts. Letterboxd is not part of the score since
+20260123000000_remove_letterboxd_rating.sql, so it isn't an input here either.
+"""
+import sys
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.utils import get_supabase_client
+
+BOX_OFFICE_WEIGHT = 0.20
+CRITICAL_WEIGHT = 0.80
+BOX_OFFICE_FLOP_PENALTY = 5
+OSCAR_WINNER_BONUS = 6
+OSCAR_NOMINEE_BONUS = 3
+
+SCORE_COLUMNS = 'id, movie_budget, movie_revenue, rt_critics_score, metacritic_score, imdb_rating, oscar_status, calculated_score'
+PAGE_SIZE = 1000
+
+
+def _column(values: List[Any]) -> np.ndarray:
+    """float64 column with NaN for NULL"""
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def load_score_columns(rows: List[Tuple]) -> Dict[str, np.ndarray]:
+    """
+    Turn score-input rows into column arrays
+
+    Args:
+        rows: Tuples in BulkWriter.fetch_score_inputs order
+
+    Returns:
+        Dict of column arrays keyed by input name
+    """
+    if not rows:
+        empty = np.array([], dtype=np.float64)
+        return {
+            'id': np.array([], dtype=object), 'budget': empty, 'revenue': empty, 'rt': empty,
+            'metacritic': empty, 'imdb': empty, 'oscar_status': np.array([], dtype=object), 'stored': empty
+        }
+
+    ids, budget, revenue, rt, metacritic, imdb, oscar_status, stored = zip(*rows)
+    return {
+        'id': np.array(ids, dtype=object),
+        'budget': _column(budget),
+        'revenue': _column(revenue),
+        'rt': _column(rt),
+        'metacritic': _column(metacritic),
+        'imdb': _column(imdb),
+        'oscar_status': np.array([s or 'none' for s in oscar_status], dtype=object),
+        'stored': _column(stored),
+    }
+
+
+def _round_half_away(values: np.ndarray, decimals: int = 2) -> np.ndarray:
+    """Postgres ROUND(numeric, n) semantics (np.round rounds half to even)"""
+    factor = 10 ** decimals
+    # The epsilon absorbs float error so x.xx5 rounds up like NUMERIC does
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5 + 1e-9) / factor
+
+
+def compute_scores(cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Vectorized calculate_new_movie_score
+
+    Args:
+        cols: Output of load_score_columns
+
+    Returns:
+        Array of final scores rounded to 2 decimals
+    """
+    budget = cols['budget']
+    revenue = cols['revenue']
+
+    # Box office: linear 0-60 up to 100% ROI, then logarithmic 60-100; flops score 0 and are penalized
+    with np.errstate(invalid='ignore', divide='ignore'):
+        has_box_office = ~np.isnan(budget) & ~np.isnan(revenue) & (budget > 0)
+        profit = np.where(has_box_office, revenue - budget, 0.0)
+        flop = has_box_office & (profit <= 0)
+        profitable = has_box_office & (profit > 0)
+        roi = np.where(profitable, profit / np.where(has_box_office, budget, 1.0) * 100, 0.0)
+    box_office = np.where(
+        profitable,
+        np.where(roi <= 100, 60 * (roi / 100), 60 + 40 * (1 - np.exp(-(roi - 100) / 200))),
+        0.0
+    )
+
+    rt = np.nan_to_num(cols['rt'])
+    metacritic = np.nan_to_num(cols['metacritic'])
+    imdb = np.nan_to_num(cols['imdb']) / 10 * 100
+
+    # Layer 1: critics internal consensus
+    both_critics = (rt > 0) & (metacritic > 0)
+    rt_only = (rt > 0) & ~both_critics
+    mc_only = (metacritic > 0) & ~(rt > 0)
+    critics_raw = np.select([both_critics, rt_only, mc_only], [(rt + metacritic) / 2, rt, metacritic], 0.0)
+    critics_modifier = np.maximum(0, 1 - np.abs(rt - metacritic) / 200)
+    critics = np.select([both_critics, rt_only, mc_only], [critics_raw * critics_modifier, rt, metacritic], 0.0)
+
+    # Layer 2: audience (IMDB only)
+    audience = np.where(imdb > 0, imdb, 0.0)
+
+    # Layer 3: cross-category consensus on the raw averages
+    consensus = (critics_raw > 0) & (audience > 0)
+    consensus_modifier = np.maximum(0, 1 - np.abs(critics_raw - audience) / 200)
+    critical = np.select(
+        [consensus, critics > 0, audience > 0],
+        [(critics * 0.5 + audience * 0.5) * consensus_modifier, critics, audience],
+        0.0
+    )
+
+    average = np.select(
+        [(box_office > 0) & (critical > 0), box_office > 0, critical > 0],
+        [box_office * BOX_OFFICE_WEIGHT + critical * CRITICAL_WEIGHT, box_office, critical],
+        0.0
+    )
+
+    status = cols['oscar_status']
+    oscar_bonus = np.where(status == 'winner', OSCAR_WINNER_BONUS, np.where(status == 'nominee', OSCAR_NOMINEE_BONUS, 0))
+
+    final = average + oscar_bonus - np.where(flop, BOX_OFFICE_FLOP_PENALTY, 0)
+    return _round_half_away(final)
+
+
+def find_drift(cols: Dict[str, np.ndarray], scores: np.ndarray, tolerance: float = 0.005) -> np.ndarray:
+    """Indices whose stored calculated_score differs from the recomputed score"""
+    stored = cols['stored']
+    return np.flatnonzero(np.isnan(stored) | (np.abs(stored - scores) > tolerance))
+
+
+def _load_rows_via_postgrest(supabase) -> List[Tuple]:
+    rows: List[Tuple] = []
+    start = 0
+    while True:
+        result = supabase.table('draft_picks')\
+            .select(SCORE_COLUMNS)\
+            .not_.is_('calculated_score', 'null')\
+            .order('id')\
+            .range(start, start + PAGE_SIZE - 1)\
+            .execute()
+        page = result.data or []
+        rows.extend(
+            (r['id'], r.get('movie_budget'), r.get('movie_revenue'), r.get('rt_critics_score'),
+             r.get('metacritic_score'), r.get('imdb_rating'), r.get('oscar_status'), r.get('calculated_score'))
+            for r in page
+        )
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def print_drift_report(cols: Dict[str, np.ndarray], scores: np.ndarray, drifted: np.ndarray, show: int = 10) -> None:
+    total = len(scores)
+    print(f"\n📊 Rescored {total} picks: {len(drifted)} differ from stored calculated_score")
+    if not len(drifted):
+        return
+
+    delta = scores[drifted] - np.nan_to_num(cols['stored'][drifted])
+    print(f"  Δ min {delta.min():+.2f}  median {np.median(delta):+.2f}  max {delta.max():+.2f}")
+    order = drifted[np.argsort(-np.abs(delta))][:show]
+    for i in order:
+        print(f"  - {cols['id'][i]}: stored {cols['stored'][i]:.2f} → {scores[i]:.2f}")
+    if len(drifted) > show:
+        print(f"  ... and {len(drifted) - show} more")
+
+
+def rescore_draft_picks(dry_run: bool = False, db_url: Optional[str] = None) -> int:
+    """
+    Recompute calculated_score for every scored pick and write back only the changes
+
+    Args:
+        dry_run: If True, only report drift
+        db_url: Optional direct Postgres URL for a single bulk read and COPY-based write
+
+    Returns:
+        Number of rows whose score changed
+    """
+    bulk = None
+    supabase = None
+    if db_url:
+        from scripts.letterboxd.pg_bulk import BulkWriter
+        bulk = BulkWriter(db_url)
+    else:
+        supabase = get_supabase_client()
+        if not supabase:
+            print("❌ Cannot connect to Supabase")
+            return 0
+
+    try:
+        print("📥 Loading score inputs...")
+        rows = bulk.fetch_score_inputs() if bulk else _load_rows_via_postgrest(supabase)
+        cols = load_score_columns(rows)
+        scores = compute_scores(cols)
+        drifted = find_drift(cols, scores)
+        print_drift_report(cols, scores, drifted)
+
+        if dry_run or not len(drifted):
+            return len(drifted)
+
+        changes = [(str(cols['id'][i]), float(scores[i])) for i in drifted]
+        if bulk:
+            written = bulk.update_calculated_scores(changes)
+        else:
+            written = 0
+            for pick_id, score in changes:
+                result = supabase.table('draft_picks')\
+                    .update({'calculated_score': score})\
+                    .eq('id', pick_id)\
+                    .execute()
+                if result.data:
+                    written += 1
+        print(f"💾 Wrote {written}/{len(changes)} changed scores")
+        return len(drifted)
+    finally:
+        if bulk:
+            bulk.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recompute draft_picks.calculated_score in bulk')
+    parser.add_argument('--dry-run', action='store_true', help='Only report picks whose stored score drifted')
+    parser.add_argument('--db-url', help='Direct Postgres URL; read and write in bulk instead of via PostgREST')
+
+    args = parser.parse_args()
+
+    rescore_draft_picks(dry_run=args.dry_run, db_url=args.db_url)
@@ -0,0 +1,151 @@
+"""
+Shared keep-alive HTTP session for Letterboxd requests
+"""
+import os
+import threading
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scripts.letterboxd.deadlines import request_timeout
+
+CONNECT_TIMEOUT = float(os.getenv('LETTERBOXD_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('LETTERBOXD_READ_TIMEOUT', '20'))
+POOL_SIZE = int(os.getenv('LETTERBOXD_POOL_SIZE', '16'))
+USE_HTTP2 = os.getenv('LETTERBOXD_HTTP2', '0') == '1'
+
+_session = None
+_session_lock = threading.Lock()
+_request_count = 0
+_count_lock = threading.Lock()
+
+
+def _build_requests_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=1,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _build_http2_client():
+    """Build an httpx HTTP/2 client, or None if httpx[http2] isn't installed"""
+    try:
+        import httpx
+        import h2  # noqa: F401 - httpx needs it for http2=True
+    except ImportError:
+        print("⚠️  LETTERBOXD_HTTP2=1 but httpx[http2] is not installed, using HTTP/1.1")
+        return None
+
+    return httpx.Client(
+        http2=True,
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+        follow_redirects=True,
+    )
+
+
+def get_session():
+    """
+    Return the process-wide HTTP session, creating it on first use
+
+    Returns:
+        An httpx.Client when LETTERBOXD_HTTP2=1 and httpx[http2] is available,
+        otherwise a pooled requests.Session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            client = _build_http2_client() if USE_HTTP2 else None
+            _session = client if client is not None else _build_requests_session()
+        return _session
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+    """
+    GET a URL over the shared session
+
+    Args:
+        url: URL to fetch
+        headers: Optional request headers
+        timeout: Optional read timeout override in seconds
+
+    Both timeouts are capped by the current deadline (see deadlines.py).
+
+    Returns:
+        Response object exposing status_code, headers, text and content
+
+    Raises:
+        DeadlineExceeded: If the current deadline has already passed
+    """
+    global _request_count
+    session = get_session()
+    read_timeout = request_timeout(timeout if timeout is not None else READ_TIMEOUT)
+    connect_timeout = min(CONNECT_TIMEOUT, read_timeout)
+
+    with _count_lock:
+        _request_count += 1
+
+    if isinstance(session, requests.Session):
+        return session.get(url, headers=headers, timeout=(connect_timeout, read_timeout))
+    return session.get(url, headers=headers, timeout=read_timeout)
+
+
+def connection_stats() -> Dict[str, Any]:
+    """
+    Report how well the shared session is reusing connections
+
+    Returns:
+        Dict with requests sent, connections opened and connections reused
+    """
+    stats = {
+        'transport': 'http1.1',
+        'requests': _request_count,
+        'connections_opened': None,
+        'reused': None,
+    }
+
+    session = _session
+    if session is None:
+        return stats
+
+    if not isinstance(session, requests.Session):
+        stats['transport'] = 'http2'
+        return stats
+
+    opened = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += getattr(pool, 'num_connections', 0)
+
+    stats['connections_opened'] = opened
+    stats['reused'] = max(_request_count - opened, 0)
+    return stats
+
+
+def report_connection_stats() -> None:
+    """Print connection reuse for the shared session"""
+    stats = connection_stats()
+    if not stats['requests']:
+        return
+    if stats['connections_opened'] is None:
+        print(f"  🔌 HTTP: {stats['requests']} requests over {stats['transport']}")
+        return
+    print(
+        f"  🔌 HTTP: {stats['requests']} requests, "
+        f"{stats['connections_opened']} connections opened, {stats['reused']} reused"
+    )
@@ -9,16 +9,31 @@ import scripts.letterboxd.compat
 
 from letterboxdpy.list import List
 from letterboxdpy.user import User
+from letterboxdpy.movie import Movie
 import json
 import sys
 import os
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from typing import List as TypingList, Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from scripts.letterboxd.utils import get_supabase_client, extract_tmdb_id_from_url, match_letterboxd_to_tmdb
+from scripts.letterboxd.utils import get_supabase_client, extract_tmdb_id_from_url, map_letterboxd_genres, pop_option, pop_flag
+from scripts.letterboxd.planner import plan_list_sync
+from scripts.letterboxd.film_registry import FilmRegistry, set_film_registry, record_film, rating_count_of
+from scripts.letterboxd.profiling import profiled
+from scripts.letterboxd.fetcher import install_fetch_layer
+from scripts.letterboxd.session import report_connection_stats
+from scripts.letterboxd.deadlines import Deadline, deadline_scope, detached_scope, request_timeout, WRITE_TIMEOUT
+from scripts.letterboxd.list_algebra import build_pool, ExpressionError, POOL_WORKERS
+
+# Share one keep-alive session across every List/User/Movie page load
+install_fetch_layer()
+
+# The enrich-spec-draft-sequels function calls TMDB; allow it this long (capped by any deadline)
+ENRICH_TIMEOUT = 90
 
 
 def _invoke_enrich_sequel_for_spec_draft_movie(supabase_url: str, service_key: str, spec_draft_movie_id: str) -> None:
@@ -37,11 +52,85 @@ def _invoke_enrich_sequel_for_spec_draft_movie(supabase_url: str, service_key: s
         },
         method="POST",
     )
-    with urllib.request.urlopen(req, timeout=90) as resp:
+    with urllib.request.urlopen(req, timeout=request_timeout(ENRICH_TIMEOUT)) as resp:
         resp.read()
 
 
-def sync_list_to_spec_draft(username: str, list_slug: str, spec_draft_id: str, dry_run: bool = False):
+def _enrich_sequel(supabase_url: Optional[str], service_key: Optional[str], movie_row_id: Optional[str], film_title: str) -> None:
+    """Best-effort sequel enrichment for a newly inserted spec_draft_movies row"""
+    if not (movie_row_id and supabase_url and service_key):
+        return
+    try:
+        _invoke_enrich_sequel_for_spec_draft_movie(
+            supabase_url, str(service_key), str(movie_row_id)
+        )
+    except urllib.error.HTTPError as he:
+        print(
+            f"⚠️  enrich-spec-draft-sequels HTTP {he.code} for {film_title} (id={movie_row_id})"
+        )
+    except Exception as ex:
+        print(
+            f"⚠️  enrich-spec-draft-sequels failed for {film_title}: {ex}"
+        )
+
+
+def _fetch_film_details(film_slug: str) -> Dict[str, Any]:
+    """
+    Read everything the sync needs from one film page fetch
+
+    Returns:
+        Dict with tmdb_id, genre_ids, rating and rating_count (values may be None),
+        or an empty dict if the page couldn't be loaded
+    """
+    try:
+        movie = Movie(film_slug)
+    except Exception as e:
+        print(f"⚠️  Could not fetch film page for {film_slug}: {e}")
+        return {}
+
+    rating = getattr(movie, 'rating', None)
+    try:
+        rating = float(rating) if rating is not None else None
+    except (TypeError, ValueError):
+        rating = None
+
+    return {
+        'tmdb_id': extract_tmdb_id_from_url(getattr(movie, 'tmdb_link', None)),
+        'genre_ids': map_letterboxd_genres(getattr(movie, 'genres', None)),
+        'rating': rating if rating is not None and 0 <= rating <= 5 else None,
+        'rating_count': rating_count_of(movie),
+    }
+
+
+def _spec_draft_row(spec_draft_id: str, tmdb_id: int, film, film_title: str, film_year: Optional[int],
+                    film_slug: Optional[str], details: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a complete spec_draft_movies row, fetching the film page if it wasn't already
+
+    movie_poster_path is left NULL: the app reads it as a TMDB path, while
+    Letterboxd only has its own CDN URLs, and the TMDB poster backfill fills
+    NULL paths in. The Letterboxd rating from the same fetch goes into the local film cache and
+    the film registry, so a later rating lookup for this film doesn't hit
+    Letterboxd again and existing picks of it get the rating too.
+    """
+    if details is None:
+        details = _fetch_film_details(film_slug) if film_slug else {}
+
+    if details.get('rating') is not None:
+        record_film(tmdb_id, film_title, film_year, film_slug, details['rating'], details.get('rating_count'))
+
+    return {
+        'spec_draft_id': spec_draft_id,
+        'movie_tmdb_id': tmdb_id,
+        'movie_title': film_title,
+        'movie_year': film_year,
+        'movie_genres': map_letterboxd_genres(getattr(film, 'genres', None)) or details.get('genre_ids'),
+        'movie_poster_path': None,
+    }
+
+
+def sync_list_to_spec_draft(username: str, list_slug: str, spec_draft_id: str, dry_run: bool = False, db_url: Optional[str] = None,
+                            time_budget: Optional[float] = None):
     """
     Sync a Letterboxd list to a spec draft in Supabase
     
@@ -49,12 +138,25 @@ def sync_list_to_spec_draft(username: str, list_slug: str, spec_draft_id: str, d
         username: Letterboxd username
         list_slug: Letterboxd list slug
         spec_draft_id: UUID of the spec draft in Supabase
-        dry_run: If True, only print what would be synced without making changes
+        dry_run: If True, make no changes; print an execution plan (film page
+            fetches, DB writes, function calls, estimated wall time) instead
+        db_url: Optional direct Postgres URL; new rows are then inserted in one
+            COPY + INSERT ... ON CONFLICT instead of a check and insert per film
+        time_budget: Seconds the whole sync may take; once spent, no new film is
+            started, buffered rows are still inserted and the leftover films are reported
     """
-    supabase = get_supabase_client()
-    if not supabase:
-        print("❌ Cannot connect to Supabase")
-        return
+    budget = Deadline(time_budget)
+    bulk = None
+    supabase = None
+    if db_url:
+        from scripts.letterboxd.pg_bulk import BulkWriter
+        bulk = BulkWriter(db_url)
+        set_film_registry(FilmRegistry(pg_conn=bulk.conn))
+    else:
+        supabase = get_supabase_client()
+        if not supabase:
+            print("❌ Cannot connect to Supabase")
+            return
 
     supabase_url = os.getenv("SUPABASE_URL") or os.getenv("VITE_SUPABASE_URL")
     service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -62,127 +164,277 @@ def sync_list_to_spec_draft(username: str, list_slug: str, spec_draft_id: str, d
     try:
         # Fetch list from Letterboxd
         print(f"📥 Fetching list from Letterboxd: {username}/{list_slug}")
-        list_instance = List(username, list_slug)
-        list_title = str(list_instance)
-        print(f"✅ Fetched list: {list_title}")
-        
-        # Get films from list
-        films = []
-        if hasattr(list_instance, 'films'):
-            list_films = list_instance.films
-            if isinstance(list_films, list):
-                films = list_films
-            elif hasattr(list_films, '__iter__'):
-                films = list(list_films)
+        with deadline_scope(budget.remaining()):
+            list_instance = List(username, list_slug)
+            list_title = str(list_instance)
+            print(f"✅ Fetched list: {list_title}")
+            
+            # Get films from list
+            films = []
+            if hasattr(list_instance, 'films'):
+                list_films = list_instance.films
+                if isinstance(list_films, list):
+                    films = list_films
+                elif hasattr(list_films, '__iter__'):
+                    films = list(list_films)
         
         print(f"📊 Found {len(films)} films in list")
         
         if dry_run:
             print("\n🔍 DRY RUN - Would sync the following movies:")
+            for film in films[:10]:
+                print(f"  - {film} ({getattr(film, 'year', None)})")
+            if len(films) > 10:
+                print(f"  ... and {len(films) - 10} more")
+            # Planning needs no film page fetches; only the existing rows are read
+            if bulk:
+                existing = bulk.existing_spec_draft_tmdb_ids(spec_draft_id)
+            else:
+                result = supabase.table('spec_draft_movies')\
+                    .select('movie_tmdb_id')\
+                    .eq('spec_draft_id', spec_draft_id)\
+                    .execute()
+                existing = {row['movie_tmdb_id'] for row in result.data or []}
+            plan = plan_list_sync(films, existing, bulk=bool(bulk), enrich=bool(supabase_url and service_key))
+            plan.report()
+            if time_budget and plan.estimate_seconds() > time_budget:
+                print(f"  ⚠️  Exceeds --time-budget {time_budget:g}s; the run would stop early (re-run to continue)")
+            print("\n💡 Run without --dry-run to actually sync the data")
+            return
         
         synced_count = 0
         skipped_count = 0
         error_count = 0
         
-        for film in films:
-            try:
-                # Get film data
-                film_slug = getattr(film, 'slug', None)
-                film_title = str(film) if hasattr(film, '__str__') else "Unknown"
-                film_year = getattr(film, 'year', None)
-                tmdb_link = getattr(film, 'tmdb_link', None)
+        existing_tmdb_ids = set()
+        pending_rows: TypingList[Dict[str, Any]] = []
+        if bulk:
+            existing_tmdb_ids = bulk.existing_spec_draft_tmdb_ids(spec_draft_id)
+        
+        left_over = 0
+        for index, film in enumerate(films):
+            if budget.expired():
+                left_over = len(films) - index
+                break
+            with deadline_scope(budget.remaining()):
+                try:
+                    # Get film data
+                    film_slug = getattr(film, 'slug', None)
+                    film_title = str(film) if hasattr(film, '__str__') else "Unknown"
+                    film_year = getattr(film, 'year', None)
+                    tmdb_link = getattr(film, 'tmdb_link', None)
                 
-                # Extract TMDB ID
-                tmdb_id = None
-                if tmdb_link:
-                    tmdb_id = extract_tmdb_id_from_url(tmdb_link)
-                elif film_slug:
-                    # Try to get TMDB ID from movie slug
-                    tmdb_id = match_letterboxd_to_tmdb(film_slug)
+                    # Extract TMDB ID; without a link, the film page fetch that
+                    # finds it also supplies genres and rating
+                    tmdb_id = None
+                    details = None
+                    if tmdb_link:
+                        tmdb_id = extract_tmdb_id_from_url(tmdb_link)
+                    elif film_slug:
+                        details = _fetch_film_details(film_slug)
+                        tmdb_id = details.get('tmdb_id')
                 
-                if not tmdb_id:
-                    print(f"⚠️  Skipping {film_title} ({film_year}): No TMDB ID found")
-                    skipped_count += 1
-                    continue
+                    if not tmdb_id:
+                        print(f"⚠️  Skipping {film_title} ({film_year}): No TMDB ID found")
+                        skipped_count += 1
+                        continue
                 
-                # Get genres if available
-                genres = getattr(film, 'genres', None)
-                genre_ids = None
-                if genres:
-                    # Convert genre names to TMDB genre IDs if needed
-                    # This is a simplified version - you may need to map Letterboxd genres to TMDB
-                    pass
+                    if bulk:
+                        if tmdb_id in existing_tmdb_ids:
+                            print(f"⏭️  Skipping {film_title}: Already in spec draft")
+                            skipped_count += 1
+                            continue
+                        existing_tmdb_ids.add(tmdb_id)
+                        pending_rows.append(
+                            _spec_draft_row(spec_draft_id, tmdb_id, film, film_title, film_year, film_slug, details)
+                        )
+                        continue
                 
-                if dry_run:
-                    print(f"  - {film_title} ({film_year}) - TMDB ID: {tmdb_id}")
-                    synced_count += 1
-                    continue
+                    # Check if movie already exists in spec_draft_movies
+                    existing = supabase.table('spec_draft_movies')\
+                        .select('id')\
+                        .eq('spec_draft_id', spec_draft_id)\
+                        .eq('movie_tmdb_id', tmdb_id)\
+                        .execute()
                 
-                # Check if movie already exists in spec_draft_movies
-                existing = supabase.table('spec_draft_movies')\
-                    .select('id')\
-                    .eq('spec_draft_id', spec_draft_id)\
-                    .eq('movie_tmdb_id', tmdb_id)\
-                    .execute()
-                
-                if existing.data and len(existing.data) > 0:
-                    print(f"⏭️  Skipping {film_title}: Already in spec draft")
-                    skipped_count += 1
-                    continue
+                    if existing.data and len(existing.data) > 0:
+                        print(f"⏭️  Skipping {film_title}: Already in spec draft")
+                        skipped_count += 1
+                        continue
                 
-                # Insert movie into spec_draft_movies
-                movie_data = {
-                    'spec_draft_id': spec_draft_id,
-                    'movie_tmdb_id': tmdb_id,
-                    'movie_title': film_title,
-                    'movie_year': film_year,
-                    'movie_genres': genre_ids
-                }
+                    # Insert a complete row (genres included) so no second pass is needed
+                    movie_data = _spec_draft_row(spec_draft_id, tmdb_id, film, film_title, film_year, film_slug, details)
                 
-                # Try to get poster path from TMDB (would need additional API call)
-                # For now, we'll leave it null and it can be populated later
+                    result = supabase.table('spec_draft_movies')\
+                        .insert(movie_data)\
+                        .execute()
                 
-                result = supabase.table('spec_draft_movies')\
-                    .insert(movie_data)\
-                    .execute()
-                
-                if result.data:
-                    print(f"✅ Added {film_title} ({film_year}) to spec draft")
-                    synced_count += 1
-                    row = result.data[0] if isinstance(result.data, list) else result.data
-                    movie_row_id = row.get("id") if isinstance(row, dict) else None
-                    if movie_row_id and supabase_url and service_key and not dry_run:
-                        try:
-                            _invoke_enrich_sequel_for_spec_draft_movie(
-                                supabase_url, str(service_key), str(movie_row_id)
-                            )
-                        except urllib.error.HTTPError as he:
-                            print(
-                                f"⚠️  enrich-spec-draft-sequels HTTP {he.code} for {film_title} (id={movie_row_id})"
-                            )
-                        except Exception as ex:
-                            print(
-                                f"⚠️  enrich-spec-draft-sequels failed for {film_title}: {ex}"
-                            )
-                else:
-                    print(f"⚠️  Failed to add {film_title}")
-                    error_count += 1
+                    if result.data:
+                        print(f"✅ Added {film_title} ({film_year}) to spec draft")
+                        synced_count += 1
+                        row = result.data[0] if isinstance(result.data, list) else result.data
+                        movie_row_id = row.get("id") if isinstance(row, dict) else None
+                        _enrich_sequel(supabase_url, service_key, movie_row_id, film_title)
+                    else:
+                        print(f"⚠️  Failed to add {film_title}")
+                        error_count += 1
                     
-            except Exception as e:
-                print(f"❌ Error processing film: {e}")
-                error_count += 1
+                except Exception as e:
+                    print(f"❌ Error processing film: {e}")
+                    error_count += 1
+        
+        unenriched = 0
+        if pending_rows:
+            titles = {row['movie_tmdb_id']: row['movie_title'] for row in pending_rows}
+            # Buffered rows are inserted even when the budget is spent
+            with detached_scope(WRITE_TIMEOUT):
+                inserted = bulk.insert_spec_draft_movies(pending_rows)
+            print(f"💾 Bulk-inserted {len(inserted)}/{len(pending_rows)} movies into spec draft")
+            synced_count += len(inserted)
+            skipped_count += len(pending_rows) - len(inserted)
+            for movie_row_id, tmdb_id in inserted:
+                if budget.expired():
+                    unenriched += 1
+                    continue
+                with deadline_scope(budget.remaining()):
+                    _enrich_sequel(supabase_url, service_key, movie_row_id, titles.get(tmdb_id, str(tmdb_id)))
         
         print(f"\n📊 Summary:")
         print(f"  ✅ Synced: {synced_count}")
         print(f"  ⏭️  Skipped: {skipped_count}")
         print(f"  ❌ Errors: {error_count}")
-        
-        if dry_run:
-            print("\n💡 Run without --dry-run to actually sync the data")
+        if left_over:
+            print(f"  ⏱️  Time budget spent: {left_over} films not processed (re-run to continue; existing rows are skipped)")
+        if unenriched:
+            print(f"  ⏱️  Time budget spent: {unenriched} inserted rows not sequel-enriched")
+        report_connection_stats()
         
     except Exception as e:
         print(f"❌ Error syncing list: {e}")
         raise
+    finally:
+        if bulk:
+            bulk.close()
+
+def sync_pool_to_spec_draft(expression: str, spec_draft_id: str, years: Optional[str] = None,
+                            oscar: Optional[str] = None, dry_run: bool = False, db_url: Optional[str] = None):
+    """
+    Sync the films of a list expression (union, intersection, difference of
+    lists and watchlists) to a spec draft in one bulk insert
+    
+    Every source is fetched once and every film resolved and fetched once,
+    however many sources it is on (see list_algebra.py).
+    
+    Args:
+        expression: e.g. "(user1/nye-movies | user2/new-years-eve) - watchlist:alice"
+        spec_draft_id: UUID of the spec draft in Supabase
+        years: Year range filter (e.g. "1990-1999", "2000-")
+        oscar: Oscar status filter (winner, nominee, any, none)
+        dry_run: If True, make no changes and load no film pages; print the pool and an execution plan
+        db_url: Optional direct Postgres URL; rows are then inserted with COPY
+            instead of one PostgREST insert
+    """
+    bulk = None
+    supabase = None
+    if db_url:
+        from scripts.letterboxd.pg_bulk import BulkWriter
+        bulk = BulkWriter(db_url)
+        set_film_registry(FilmRegistry(pg_conn=bulk.conn))
+    else:
+        supabase = get_supabase_client()
+        if not supabase:
+            print("❌ Cannot connect to Supabase")
+            return
+
+    supabase_url = os.getenv("SUPABASE_URL") or os.getenv("VITE_SUPABASE_URL")
+    service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    
+    try:
+        pool = build_pool(expression, years, oscar, fetch_details=None if dry_run else _fetch_film_details)
+        films = pool['films']
+        details = pool['details']
+        print(f"📊 {len(films)} films in pool from {len(pool['sources'])} sources")
+        
+        if bulk:
+            existing = bulk.existing_spec_draft_tmdb_ids(spec_draft_id)
+        else:
+            result = supabase.table('spec_draft_movies')\
+                .select('movie_tmdb_id')\
+                .eq('spec_draft_id', spec_draft_id)\
+                .execute()
+            existing = {row['movie_tmdb_id'] for row in result.data or []}
+        
+        if dry_run:
+            print("\n🔍 DRY RUN - Would sync the following movies:")
+            for film in films[:10]:
+                print(f"  - {film.title} ({film.year})")
+            if len(films) > 10:
+                print(f"  ... and {len(films) - 10} more")
+            plan = plan_list_sync(films, existing, bulk=bool(bulk), enrich=bool(supabase_url and service_key))
+            plan.report()
+            print("\n💡 Run without --dry-run to actually sync the data")
+            return
+        
+        # Title-index matches are checked against their page even when the id is already in the draft
+        index_matched = pool['index_matched']
+        candidates = [film for film in films
+                      if film.tmdb_id and (film.tmdb_id not in existing or film.slug in index_matched)]
+        unresolved = pool['unresolved']
+        
+        # Genres, rating and TMDB id for candidates whose page wasn't loaded to resolve them
+        missing = [film.slug for film in candidates if film.slug and film.slug not in details]
+        if missing:
+            print(f"📥 Loading {len(missing)} film pages ({POOL_WORKERS} at a time)...")
+            with ThreadPoolExecutor(max_workers=max(1, POOL_WORKERS)) as threads:
+                details.update(zip(missing, threads.map(_fetch_film_details, missing)))
+        
+        # Key each row by its film page's TMDB id; drop it when the page disagrees
+        # with the id it was resolved to, or when an index match can't be checked
+        rows = []
+        mismatched = 0
+        for film in candidates:
+            film_details = details.get(film.slug) or {}
+            page_tmdb_id = film_details.get('tmdb_id')
+            if page_tmdb_id and page_tmdb_id != film.tmdb_id:
+                print(f"⚠️  {film.title} ({film.year}): film page is TMDB {page_tmdb_id}, "
+                      f"not {film.tmdb_id}; dropped")
+                mismatched += 1
+                continue
+            if not page_tmdb_id and film.slug in index_matched:
+                print(f"⚠️  {film.title} ({film.year}): title-index match not confirmed by its film page; dropped")
+                mismatched += 1
+                continue
+            if film.tmdb_id in existing:
+                continue
+            rows.append(_spec_draft_row(spec_draft_id, film.tmdb_id, film, str(film.title), film.release_year,
+                                        film.slug, film_details))
+        
+        inserted = []
+        if rows and bulk:
+            inserted = bulk.insert_spec_draft_movies(rows)
+        elif rows:
+            result = supabase.table('spec_draft_movies').insert(rows).execute()
+            inserted = [(row.get('id'), row.get('movie_tmdb_id')) for row in result.data or []]
+        print(f"💾 Bulk-inserted {len(inserted)}/{len(rows)} movies into spec draft")
+        
+        titles = {row['movie_tmdb_id']: row['movie_title'] for row in rows}
+        for movie_row_id, tmdb_id in inserted:
+            _enrich_sequel(supabase_url, service_key, movie_row_id, titles.get(tmdb_id, str(tmdb_id)))
+        
+        print(f"\n📊 Summary:")
+        print(f"  ✅ Synced: {len(inserted)}")
+        print(f"  ⏭️  Skipped: {len(films) - unresolved - mismatched - len(inserted)} already in spec draft")
+        if mismatched:
+            print(f"  ⚠️  Dropped (TMDB id not confirmed by film page): {mismatched}")
+        if unresolved:
+            print(f"  ⚠️  No TMDB ID found: {unresolved}")
+        report_connection_stats()
+        
+    except ExpressionError as e:
+        print(f"❌ {e}")
+    finally:
+        if bulk:
+            bulk.close()
 
 def sync_user_watchlist_to_spec_draft(username: str, spec_draft_id: str, max_films: Optional[int] = None, dry_run: bool = False):
     """
@@ -222,11 +474,22 @@ def sync_user_watchlist_to_spec_draft(username: str, spec_draft_id: str, max_fil
         raise
 
 if __name__ == "__main__":
+    db_url = pop_option(sys.argv, '--db-url')
+    profile = pop_flag(sys.argv, '--profile')
+    time_budget = pop_option(sys.argv, '--time-budget')
+    years = pop_option(sys.argv, '--years')
+    oscar = pop_option(sys.argv, '--oscar')
+    
     if len(sys.argv) < 4:
         print("Usage: python sync_to_supabase.py <list|watchlist> <username> <list_slug_or_spec_draft_id> [spec_draft_id] [--dry-run]")
+        print("       python sync_to_supabase.py pool \"<list expression>\" <spec_draft_id> [--years 1990-1999] [--oscar winner|nominee|any|none] [--dry-run]")
         print("\nExamples:")
         print("  python sync_to_supabase.py list hepburnluv classic-movies-for-beginners <spec_draft_uuid>")
         print("  python sync_to_supabase.py list hepburnluv classic-movies-for-beginners <spec_draft_uuid> --dry-run")
+        print("  python sync_to_supabase.py list hepburnluv classic-movies-for-beginners <spec_draft_uuid> --db-url postgresql://...")
+        print("  python sync_to_supabase.py pool \"(user1/nye-movies | user2/new-years-eve) - watchlist:alice\" <spec_draft_uuid> --years 1980-")
+        print("\nAdd --time-budget <seconds> to stop starting new films after that long")
+        print("Add --profile to write cProfile / collapsed-stack / peak-memory output")
         sys.exit(1)
     
     mode = sys.argv[1]
@@ -241,11 +504,19 @@ if __name__ == "__main__":
                 print("❌ Error: List mode requires spec_draft_id")
                 sys.exit(1)
             list_slug = list_slug_or_spec_draft_id
-            sync_list_to_spec_draft(username, list_slug, spec_draft_id, dry_run)
+            with profiled('sync_to_supabase', profile):
+                sync_list_to_spec_draft(
+                    username, list_slug, spec_draft_id, dry_run, db_url=db_url,
+                    time_budget=float(time_budget) if time_budget else None
+                )
+        elif mode == "pool":
+            with profiled('sync_to_supabase', profile):
+                sync_pool_to_spec_draft(sys.argv[2], spec_draft_id, years, oscar, dry_run, db_url=db_url)
         elif mode == "watchlist":
-            sync_user_watchlist_to_spec_draft(username, spec_draft_id, dry_run=dry_run)
+            with profiled('sync_to_supabase', profile):
+                sync_user_watchlist_to_spec_draft(username, spec_draft_id, dry_run=dry_run)
         else:
-            print(f"❌ Invalid mode: {mode}. Use 'list' or 'watchlist'")
+            print(f"❌ Invalid mode: {mode}. Use 'list', 'pool' or 'watchlist'")
             sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
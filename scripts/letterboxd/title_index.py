@@ -0,0 +1,221 @@
+"""
+Offline trigram index of known (title, year, TMDB id) triples
+
+Resolves titles to TMDB ids from data we already hold (the Academy Awards
+allow-list, the film cache and the TMDB resolver store) before any network
+search. Only exact answers are returned offline: the normalized title and the
+release year must both match one film. Anything else (no year, a near-miss
+title, several films sharing the title and year) falls through to the callers'
+usual search, because the closest indexed film is often a sequel or remake of
+the one asked for when the true film isn't indexed. The trigram search is kept
+for inspecting candidates.
+"""
+import sys
+import os
+import json
+import math
+import threading
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Iterable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.utils import normalize_title
+
+INDEX_ENABLED = os.getenv('LETTERBOXD_TITLE_INDEX', '1') != '0'
+ACADEMY_AWARDS_PATH = os.getenv(
+    'ACADEMY_AWARDS_JSON',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'academy-awards.json')
+)
+YEAR_OFF_BY_ONE_PENALTY = 0.05
+YEAR_MISMATCH_PENALTY = 0.3
+YEAR_UNKNOWN_PENALTY = 0.02
+
+
+class Candidate(NamedTuple):
+    tmdb_id: int
+    title: str
+    year: Optional[int]
+    score: float
+
+
+def trigrams(normalized: str) -> set:
+    """Character trigrams of a normalized title, padded so short titles and word starts count"""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """
+    In-memory trigram index; entries live in parallel arrays and each trigram
+    maps to an array of entry numbers, so ~5k titles take well under a megabyte
+    """
+
+    def __init__(self):
+        self._titles: List[str] = []
+        self._years = array('H')     # 0 = unknown
+        self._tmdb_ids = array('I')
+        self._sizes = array('H')     # trigram count per entry
+        self._postings: Dict[str, array] = {}
+        self._exact: Dict[Tuple[str, int], set] = {}
+        self._seen: set = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, title: str, year: Optional[int], tmdb_id: int) -> None:
+        """Index one film (title is normalized here; duplicates are ignored)"""
+        normalized = normalize_title(title or '')
+        if not normalized or not tmdb_id:
+            return
+        key = (normalized, year or 0, int(tmdb_id))
+        grams = trigrams(normalized)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen.add(key)
+            entry = len(self._titles)
+            self._titles.append(normalized)
+            self._years.append(year or 0)
+            self._tmdb_ids.append(int(tmdb_id))
+            self._sizes.append(len(grams))
+            if year:
+                self._exact.setdefault((normalized, year), set()).add(int(tmdb_id))
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array('I')
+                posting.append(entry)
+
+    def add_many(self, films: Iterable[Tuple[str, Optional[int], int]]) -> None:
+        for title, year, tmdb_id in films:
+            self.add(title, year, tmdb_id)
+
+    def search(self, title: str, year: Optional[int] = None, limit: int = 5,
+               min_score: float = 0.3) -> List[Candidate]:
+        """
+        Score indexed films against a title
+
+        The score is the Dice coefficient of the two titles' trigram sets, lowered
+        when the years differ (or one is unknown). Each TMDB id appears once.
+        Films below min_score are never looked at: a film reaching it must share
+        one of the query's rarest trigrams, so common ones ("the") are skipped
+        when gathering candidates.
+
+        Returns:
+            Up to limit candidates scoring at least min_score, best first
+        """
+        normalized = normalize_title(title or '')
+        if not normalized:
+            return []
+        grams = trigrams(normalized)
+        min_overlap = max(1, math.ceil(min_score * len(grams) / (2 - min_score)))
+        with self._lock:
+            by_rarity = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+            entries = set()
+            for gram in by_rarity[:len(grams) - min_overlap + 1]:
+                entries.update(self._postings.get(gram, ()))
+
+            best: Dict[int, Candidate] = {}
+            for entry in entries:
+                shared = len(grams & trigrams(self._titles[entry]))
+                score = 2 * shared / (len(grams) + self._sizes[entry])
+                entry_year = self._years[entry] or None
+                if year and entry_year:
+                    gap = abs(entry_year - year)
+                    if gap == 1:
+                        score -= YEAR_OFF_BY_ONE_PENALTY
+                    elif gap > 1:
+                        score -= YEAR_MISMATCH_PENALTY
+                else:
+                    score -= YEAR_UNKNOWN_PENALTY
+                if score < min_score:
+                    continue
+                tmdb_id = self._tmdb_ids[entry]
+                if tmdb_id not in best or score > best[tmdb_id].score:
+                    best[tmdb_id] = Candidate(tmdb_id, self._titles[entry], entry_year, round(score, 4))
+
+        return sorted(best.values(), key=lambda c: c.score, reverse=True)[:limit]
+
+    def resolve(self, title: str, year: Optional[int] = None) -> Optional[int]:
+        """
+        TMDB id of the one indexed film with exactly this normalized title and
+        year, or None (always None without a year)
+        """
+        normalized = normalize_title(title or '')
+        if not normalized or not year:
+            return None
+        with self._lock:
+            ids = self._exact.get((normalized, int(year)))
+            return next(iter(ids)) if ids and len(ids) == 1 else None
+
+
+def academy_award_titles(path: str = ACADEMY_AWARDS_PATH) -> List[Tuple[str, Optional[int], int]]:
+    """(title, year, tmdb_id) for every film in data/academy-awards.json"""
+    try:
+        with open(path, 'r') as f:
+            movies = json.load(f).get('movies', [])
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not read {path}: {e}")
+        return []
+    return [(m.get('title'), m.get('year'), m.get('tmdb_id')) for m in movies if m.get('tmdb_id')]
+
+
+def build_title_index() -> TitleIndex:
+    """Index the Academy Awards list plus every film already resolved or cached locally"""
+    from scripts.letterboxd.film_cache import get_film_cache
+    from scripts.letterboxd.tmdb_resolver import get_resolver_store
+
+    index = TitleIndex()
+    index.add_many(academy_award_titles())
+    index.add_many(get_resolver_store().known_titles())
+    index.add_many(get_film_cache().known_titles())
+    return index
+
+
+_index: Optional[TitleIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """Return the process-wide index, building it on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = build_title_index()
+        return _index
+
+
+def local_tmdb_id(title: Optional[str], year: Optional[int] = None) -> Optional[int]:
+    """Offline TMDB id for an exact title/year match, or None (also when LETTERBOXD_TITLE_INDEX=0)"""
+    if not INDEX_ENABLED or not title:
+        return None
+    return get_title_index().resolve(title, year)
+
+
+def remember_title(title: Optional[str], year: Optional[int], tmdb_id: Optional[int]) -> None:
+    """Add a newly resolved film to the index if this process has built one"""
+    if _index is not None and title and tmdb_id:
+        _index.add(title, year, tmdb_id)
+
+
+if __name__ == "__main__":
+    import time
+
+    if len(sys.argv) < 2:
+        print("Usage: python title_index.py <title> [year]")
+        sys.exit(1)
+    query = sys.argv[1]
+    query_year = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None
+
+    started = time.perf_counter()
+    title_index = get_title_index()
+    print(f"📚 Indexed {len(title_index)} titles in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    results = title_index.search(query, query_year)
+    elapsed = (time.perf_counter() - started) * 1e6
+    for candidate in results:
+        print(f"  {candidate.score:.3f}  {candidate.title} ({candidate.year}) - TMDB ID: {candidate.tmdb_id}")
+    resolved = title_index.resolve(query, query_year)
+    print(f"{'✅ Exact match: ' + str(resolved) if resolved else '❓ No exact title/year match'} ({elapsed:.0f} µs)")
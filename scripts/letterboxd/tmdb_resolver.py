@@ -0,0 +1,204 @@
+"""
+Batched, cached title → TMDB id resolver in front of the fetch-movies TMDB search
+"""
+import sys
+import os
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Dict, Optional, Tuple, List, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scripts.letterboxd.fetcher import CACHE_DIR
+from scripts.letterboxd.utils import (
+    get_supabase_client, tmdb_search_results, pick_tmdb_result, normalize_title, TMDBSearchError
+)
+from scripts.letterboxd.title_index import local_tmdb_id, remember_title
+
+# Misses are cached too, but retried after this long in case TMDB gains the film
+NEGATIVE_TTL_SECONDS = int(os.getenv('TMDB_RESOLVER_NEGATIVE_TTL', str(7 * 24 * 3600)))
+MAX_WORKERS = int(os.getenv('TMDB_RESOLVER_WORKERS', '8'))
+
+TitleYear = Tuple[str, Optional[int]]
+
+
+def resolver_key(title: str, year: Optional[int]) -> str:
+    return f"{normalize_title(title)}|{year or ''}"
+
+
+class ResolverStore:
+    """
+    SQLite map of normalized (title, year) keys to TMDB ids (NULL = known miss)
+
+    exact marks answers whose TMDB title and release year both matched the
+    query; only those feed the offline title index, since a search's fallback
+    result can be a different film.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.path.join(CACHE_DIR, 'tmdb_resolver.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS resolved ('
+            ' key TEXT PRIMARY KEY,'
+            ' tmdb_id INTEGER,'
+            ' resolved_at REAL NOT NULL,'
+            ' exact INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(resolved)')}
+        if 'exact' not in columns:
+            # Stores from before the column: nothing in them is known to be exact
+            self._conn.execute('ALTER TABLE resolved ADD COLUMN exact INTEGER NOT NULL DEFAULT 0')
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[int]]:
+        """Return stored results for keys that are cached and not expired misses"""
+        found: Dict[str, Optional[int]] = {}
+        cutoff = time.time() - NEGATIVE_TTL_SECONDS
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, tmdb_id, resolved_at FROM resolved WHERE key IN ({placeholders})',
+                    chunk
+                ).fetchall()
+                for key, tmdb_id, resolved_at in rows:
+                    if tmdb_id is not None or resolved_at >= cutoff:
+                        found[key] = tmdb_id
+        return found
+
+    def put_many(self, results: Dict[str, Optional[int]], exact: Iterable[str] = ()) -> None:
+        """Store results; keys in exact matched the TMDB title and year exactly"""
+        now = time.time()
+        exact = set(exact)
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO resolved (key, tmdb_id, resolved_at, exact) VALUES (?, ?, ?, ?)',
+                [(key, tmdb_id, now, int(key in exact)) for key, tmdb_id in results.items()]
+            )
+            self._conn.commit()
+
+    def known_titles(self) -> List[Tuple[str, Optional[int], int]]:
+        """(normalized title, year, tmdb_id) for every exact title/year answer"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, tmdb_id FROM resolved WHERE tmdb_id IS NOT NULL AND exact = 1'
+            ).fetchall()
+        titles = []
+        for key, tmdb_id in rows:
+            title, _, year = key.rpartition('|')
+            titles.append((title, int(year) if year.isdigit() else None, tmdb_id))
+        return titles
+
+
+_store: Optional[ResolverStore] = None
+_store_lock = threading.Lock()
+
+
+def get_resolver_store() -> ResolverStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResolverStore()
+        return _store
+
+
+def resolve_tmdb_ids(pairs: Iterable[TitleYear], max_workers: int = MAX_WORKERS,
+                     supabase=None) -> Dict[TitleYear, Optional[int]]:
+    """
+    Resolve many (title, year) pairs to TMDB ids
+
+    Pairs are de-duplicated after normalization, answered from the persistent
+    store where possible, and the rest are searched concurrently (at most
+    max_workers in flight). Each distinct film costs at most one request.
+
+    Args:
+        pairs: Iterable of (title, year) tuples; year may be None
+        max_workers: Maximum concurrent fetch-movies calls
+        supabase: Optional existing Supabase client
+
+    Returns:
+        Dict mapping each input pair to its TMDB id (None if not found)
+    """
+    pairs = list(pairs)
+    key_to_query: Dict[str, TitleYear] = {}
+    for title, year in pairs:
+        if title:
+            key_to_query.setdefault(resolver_key(title, year), (title, year))
+
+    store = get_resolver_store()
+    resolved = store.get_many(list(key_to_query))
+    missing = [key for key in key_to_query if key not in resolved]
+
+    # Exact offline matches never reach the network
+    local = {}
+    for key in missing:
+        tmdb_id = local_tmdb_id(*key_to_query[key])
+        if tmdb_id:
+            local[key] = tmdb_id
+    if local:
+        resolved.update(local)
+        missing = [key for key in missing if key not in local]
+
+    if missing:
+        supabase = supabase or get_supabase_client()
+        if supabase:
+            print(f"🔎 Resolving {len(missing)} titles via TMDB ({len(resolved) - len(local)} cached, {len(local)} matched offline)...")
+
+            def search(key: str) -> Tuple[str, Union[Tuple[Optional[int], bool], TMDBSearchError]]:
+                title, year = key_to_query[key]
+                try:
+                    return key, pick_tmdb_result(tmdb_search_results(title, year, supabase), title, year)
+                except TMDBSearchError as e:
+                    print(f"⚠️  Error searching TMDB via Supabase: {e}")
+                    return key, e
+
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                searched = dict(pool.map(search, missing))
+            # Only answers are cached; failed searches are retried on the next run
+            answered = {key: answer for key, answer in searched.items() if not isinstance(answer, TMDBSearchError)}
+            if len(answered) < len(searched):
+                print(f"⚠️  {len(searched) - len(answered)} TMDB searches failed; not cached, will retry next run")
+            fresh = {key: tmdb_id for key, (tmdb_id, _) in answered.items()}
+            exact = [key for key, (tmdb_id, is_exact) in answered.items() if tmdb_id and is_exact]
+            store.put_many(fresh, exact)
+            resolved.update(fresh)
+            # A fallback result may be another film, so only exact answers go into the index
+            for key in exact:
+                remember_title(*key_to_query[key], fresh[key])
+
+    return {
+        (title, year): resolved.get(resolver_key(title, year)) if title else None
+        for title, year in pairs
+    }
+
+
+def resolve_tmdb_id(title: str, year: Optional[int] = None) -> Optional[int]:
+    """Single-title convenience wrapper around resolve_tmdb_ids"""
+    return resolve_tmdb_ids([(title, year)])[(title, year)]
+
+
+if __name__ == "__main__":
+    import json
+
+    if len(sys.argv) < 2:
+        print("Usage: python tmdb_resolver.py <titles.tsv>  (one 'title<TAB>year' per line; '-' for stdin)")
+        sys.exit(1)
+
+    source = sys.stdin if sys.argv[1] == '-' else open(sys.argv[1], 'r')
+    pairs: List[TitleYear] = []
+    for line in source:
+        parts = line.rstrip('\n').split('\t')
+        if not parts[0].strip():
+            continue
+        year = int(parts[1]) if len(parts) > 1 and parts[1].strip().isdigit() else None
+        pairs.append((parts[0].strip(), year))
+
+    results = resolve_tmdb_ids(pairs)
+    for (title, year), tmdb_id in results.items():
+        print(json.dumps({'title': title, 'year': year, 'tmdb_id': tmdb_id}))
@@ -3,13 +3,18 @@ Utility functions for Letterboxd integration
 """
 import os
 import re
-from typing import Optional
+import json
+import unicodedata
+from typing import Optional, List, Any, Dict, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
 # Load environment variables
 load_dotenv()
 
+# Optional cap (seconds) on every PostgREST / Edge Function call the client makes
+SUPABASE_CLIENT_TIMEOUT = os.getenv('SUPABASE_CLIENT_TIMEOUT')
+
 def get_supabase_client() -> Optional[Client]:
     """
     Create Supabase client from environment variables
@@ -25,6 +30,12 @@ def get_supabase_client() -> Optional[Client]:
         print("   Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (or SUPABASE_ANON_KEY)")
         return None
     
+    if SUPABASE_CLIENT_TIMEOUT:
+        from supabase.lib.client_options import ClientOptions
+        timeout = float(SUPABASE_CLIENT_TIMEOUT)
+        options = ClientOptions(postgrest_client_timeout=timeout, function_client_timeout=timeout)
+        return create_client(supabase_url, supabase_key, options=options)
+    
     return create_client(supabase_url, supabase_key)
 
 def extract_tmdb_id_from_url(tmdb_url: str) -> Optional[int]:
@@ -47,16 +58,91 @@ def extract_tmdb_id_from_url(tmdb_url: str) -> Optional[int]:
     
     return None
 
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for matching: accents stripped, lowercase,
+    "&" → "and", punctuation dropped, whitespace collapsed
+    
+    Args:
+        title: Movie title
+    
+    Returns:
+        Normalized title (e.g. "Amélie & Co." → "amelie and co")
+    """
+    text = unicodedata.normalize('NFKD', title)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace('&', ' and ')
+    text = re.sub(r"[^\w\s]", ' ', text)
+    return ' '.join(text.split())
+
+# Letterboxd takes its genres from TMDB, so names (and slugs, with '-' as ' ') map one to one
+LETTERBOXD_GENRE_TO_TMDB = {
+    'action': 28,
+    'adventure': 12,
+    'animation': 16,
+    'comedy': 35,
+    'crime': 80,
+    'documentary': 99,
+    'drama': 18,
+    'family': 10751,
+    'fantasy': 14,
+    'history': 36,
+    'horror': 27,
+    'music': 10402,
+    'mystery': 9648,
+    'romance': 10749,
+    'science fiction': 878,
+    'sci fi': 878,
+    'tv movie': 10770,
+    'thriller': 53,
+    'war': 10752,
+    'western': 37,
+}
+
+def map_letterboxd_genres(genres: Any) -> Optional[List[int]]:
+    """
+    Map Letterboxd genres to TMDB genre IDs
+    
+    Args:
+        genres: Genre names, or the dicts letterboxdpy returns (name/slug/type;
+            entries whose type isn't "genre", e.g. themes, are ignored)
+    
+    Returns:
+        TMDB genre IDs in Letterboxd's order, or None if none matched
+    """
+    ids: List[int] = []
+    for genre in genres or []:
+        if isinstance(genre, dict):
+            if genre.get('type', 'genre') != 'genre':
+                continue
+            genre = genre.get('name') or genre.get('slug') or ''
+        key = ' '.join(str(genre).lower().replace('-', ' ').split())
+        tmdb_id = LETTERBOXD_GENRE_TO_TMDB.get(key)
+        if tmdb_id and tmdb_id not in ids:
+            ids.append(tmdb_id)
+    return ids or None
+
 def match_letterboxd_to_tmdb(letterboxd_slug: str) -> Optional[int]:
     """
     Get TMDB ID from a Letterboxd movie slug
     
+    The offline title index is consulted first when the slug ends in
+    "-<year>"; the film page is fetched when it has no exact title/year match
+    (always, for slugs without a year).
+    
     Args:
         letterboxd_slug: Letterboxd movie slug (e.g., "v-for-vendetta")
     
     Returns:
         TMDB ID or None if not found
     """
+    from scripts.letterboxd.title_index import local_tmdb_id
+    year_match = re.match(r'^(.*)-((?:18|19|20)\d\d)$', letterboxd_slug or '')
+    slug_title, slug_year = (year_match.group(1), int(year_match.group(2))) if year_match else (letterboxd_slug, None)
+    local = local_tmdb_id((slug_title or '').replace('-', ' '), slug_year)
+    if local:
+        return local
+    
     try:
         from letterboxdpy.movie import Movie
         movie = Movie(letterboxd_slug)
@@ -69,23 +155,33 @@ def match_letterboxd_to_tmdb(letterboxd_slug: str) -> Optional[int]:
         print(f"⚠️  Error matching Letterboxd movie {letterboxd_slug} to TMDB: {e}")
         return None
 
-def search_tmdb_via_supabase(title: str, year: Optional[int] = None) -> Optional[int]:
+class TMDBSearchError(Exception):
+    """Raised when a TMDB search fails, as opposed to finding nothing"""
+
+
+def tmdb_search_results(title: str, year: Optional[int] = None,
+                        supabase: Optional[Client] = None) -> List[Dict[str, Any]]:
     """
-    Search for a movie in TMDB via Supabase function
+    Raw TMDB search results from the fetch-movies edge function
     
     Args:
         title: Movie title
         year: Optional release year
+        supabase: Optional existing client (one is created per call otherwise)
     
     Returns:
-        TMDB ID or None if not found
+        TMDB result dicts (id, title, release_date, ...), empty if nothing was found
+    
+    Raises:
+        TMDBSearchError: If there is no client or the search fails
     """
-    supabase = get_supabase_client()
+    supabase = supabase or get_supabase_client()
     if not supabase:
-        return None
+        raise TMDBSearchError("no Supabase client")
     
     try:
-        # Use the existing fetch-movies function
+        # Use the existing fetch-movies function. Its 'search' category reads
+        # searchQuery; movieSearchQuery is kept for older deployments.
         search_query = f"{title}"
         if year:
             search_query += f" {year}"
@@ -93,18 +189,110 @@ def search_tmdb_via_supabase(title: str, year: Optional[int] = None) -> Optional
         response = supabase.functions.invoke('fetch-movies', {
             'body': {
                 'category': 'search',
+                'searchQuery': title,
                 'movieSearchQuery': search_query,
                 'page': 1
-            }
+            },
+            'responseType': 'json'
         })
         
-        if response and response.get('results') and len(response['results']) > 0:
-            # Return the first result's TMDB ID
-            return response['results'][0].get('id')
-        
-        return None
+        if isinstance(response, (bytes, str)):
+            response = json.loads(response)
     except Exception as e:
+        raise TMDBSearchError(str(e)) from e
+    if isinstance(response, dict) and response.get('error'):
+        raise TMDBSearchError(f"fetch-movies: {response['error']}")
+    
+    results = response.get('results') if isinstance(response, dict) else None
+    return [result for result in results or [] if isinstance(result, dict)]
+
+def pick_tmdb_result(results: List[Dict[str, Any]], title: str,
+                     year: Optional[int] = None) -> Tuple[Optional[int], bool]:
+    """
+    Choose the TMDB result for a title/year query
+    
+    Prefers a result whose normalized title and release year both match, then
+    one released in the requested year, then the first result.
+    
+    Returns:
+        (TMDB ID or None, whether it matched both title and year exactly)
+    """
+    if not results:
+        return None, False
+    wanted = normalize_title(title or '')
+    in_year = [r for r in results if year and str(r.get('release_date') or '')[:4] == str(year)]
+    for result in in_year:
+        titles = {normalize_title(str(result.get(field) or '')) for field in ('title', 'original_title')}
+        if wanted and wanted in titles:
+            return result.get('id'), True
+    return (in_year or results)[0].get('id'), False
+
+def search_tmdb_via_supabase(title: str, year: Optional[int] = None, supabase: Optional[Client] = None,
+                             use_index: bool = True, raise_errors: bool = False) -> Optional[int]:
+    """
+    Search for a movie in TMDB via Supabase function
+    
+    Args:
+        title: Movie title
+        year: Optional release year
+        supabase: Optional existing client (one is created per call otherwise)
+        use_index: Answer exact title/year matches from the offline title index without searching
+        raise_errors: Raise TMDBSearchError when the search fails instead of returning None,
+            so callers that cache misses can tell the two apart
+    
+    Returns:
+        TMDB ID or None if not found (the best result, which may not match the title exactly)
+    
+    Raises:
+        TMDBSearchError: If raise_errors is set and the client or the search fails
+    """
+    if use_index:
+        from scripts.letterboxd.title_index import local_tmdb_id
+        local = local_tmdb_id(title, year)
+        if local:
+            return local
+    
+    try:
+        return pick_tmdb_result(tmdb_search_results(title, year, supabase), title, year)[0]
+    except TMDBSearchError as e:
         print(f"⚠️  Error searching TMDB via Supabase: {e}")
+        if raise_errors:
+            raise
         return None
 
+def pop_flag(argv: list, flag: str) -> bool:
+    """
+    Remove a boolean flag (e.g. "--dry-run") from an argv list
+
+    Args:
+        argv: Argument list to modify in place
+        flag: Flag name
+
+    Returns:
+        True if the flag was present
+    """
+    if flag in argv:
+        argv[:] = [arg for arg in argv if arg != flag]
+        return True
+    return False
 
+def pop_option(argv: list, name: str) -> Optional[str]:
+    """
+    Remove an option with a value ("--name value" or "--name=value") from an argv list
+
+    Args:
+        argv: Argument list to modify in place
+        name: Option name (e.g. "--db-url")
+
+    Returns:
+        The option value or None if absent
+    """
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            return value
+        if arg.startswith(name + '='):
+            del argv[i]
+            return arg.split('=', 1)[1]
+    return None
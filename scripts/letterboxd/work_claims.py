@@ -0,0 +1,86 @@
+"""
+Lease-based work claiming so several batch_fetch_ratings workers can split the backlog
+"""
+import os
+import socket
+from typing import List, Dict, Any, Iterable, Optional
+
+
+def default_worker_id() -> str:
+    """Worker id unique per process: <hostname>-<pid>"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkClaimer:
+    """
+    Claims pending draft_picks rows via claim_letterboxd_rating_work
+
+    Claims go through the Supabase RPC by default, or straight to Postgres when a
+    psycopg2 connection is given (the --db-url mode).
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, lease_seconds: int = 600,
+                 supabase=None, pg_conn=None):
+        if supabase is None and pg_conn is None:
+            raise ValueError("WorkClaimer needs a Supabase client or a Postgres connection")
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.supabase = supabase
+        self.pg_conn = pg_conn
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Lease up to `limit` pending rows to this worker
+
+        Args:
+            limit: Maximum number of rows to claim
+
+        Returns:
+            Rows shaped like draft_picks (id, movie_id, movie_title, movie_year)
+        """
+        if self.pg_conn is not None:
+            with self.pg_conn, self.pg_conn.cursor() as cur:
+                cur.execute(
+                    'SELECT id::text, movie_id, movie_title, movie_year '
+                    'FROM public.claim_letterboxd_rating_work(%s, %s, %s)',
+                    (self.worker_id, limit, self.lease_seconds)
+                )
+                return [
+                    {'id': r[0], 'movie_id': r[1], 'movie_title': r[2], 'movie_year': r[3]}
+                    for r in cur.fetchall()
+                ]
+
+        result = self.supabase.rpc('claim_letterboxd_rating_work', {
+            'p_worker_id': self.worker_id,
+            'p_limit': limit,
+            'p_lease_seconds': self.lease_seconds
+        }).execute()
+        return result.data or []
+
+    def complete(self, draft_pick_ids: Iterable[str]) -> int:
+        """
+        Release claims for rows this worker finished
+
+        Args:
+            draft_pick_ids: draft_picks ids that now have a rating
+
+        Returns:
+            Number of claims removed
+        """
+        ids = [str(i) for i in draft_pick_ids]
+        if not ids:
+            return 0
+
+        if self.pg_conn is not None:
+            with self.pg_conn, self.pg_conn.cursor() as cur:
+                cur.execute(
+                    'SELECT public.complete_letterboxd_rating_claims(%s, %s::uuid[])',
+                    (self.worker_id, ids)
+                )
+                return cur.fetchone()[0] or 0
+
+        result = self.supabase.rpc('complete_letterboxd_rating_claims', {
+            'p_worker_id': self.worker_id,
+            'p_draft_pick_ids': ids
+        }).execute()
+        return result.data or 0
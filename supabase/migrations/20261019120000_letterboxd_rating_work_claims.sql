@@ -0,0 +1,89 @@
+-- Lease-based work claiming for the Letterboxd rating backfill (scripts/letterboxd/batch_fetch_ratings.py).
+-- Any number of workers can call claim_letterboxd_rating_work concurrently: FOR UPDATE SKIP LOCKED
+-- hands each pending draft_picks row to exactly one worker, and a crashed worker's rows become
+-- claimable again once its lease expires.
+
+CREATE TABLE IF NOT EXISTS public.letterboxd_rating_claims (
+  draft_pick_id UUID PRIMARY KEY REFERENCES public.draft_picks(id) ON DELETE CASCADE,
+  worker_id TEXT NOT NULL,
+  leased_until TIMESTAMPTZ NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 1,
+  claimed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS letterboxd_rating_claims_leased_until_idx
+  ON public.letterboxd_rating_claims USING btree (leased_until);
+
+-- Service role only: no policies, so anon/authenticated clients can't read or write claims.
+ALTER TABLE public.letterboxd_rating_claims ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.claim_letterboxd_rating_work(
+  p_worker_id text,
+  p_limit integer DEFAULT 25,
+  p_lease_seconds integer DEFAULT 600
+)
+RETURNS TABLE(
+  id uuid,
+  movie_id integer,
+  movie_title text,
+  movie_year integer
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  WITH candidates AS (
+    SELECT dp.id
+    FROM public.draft_picks dp
+    LEFT JOIN public.letterboxd_rating_claims c ON c.draft_pick_id = dp.id
+    WHERE dp.letterboxd_rating IS NULL
+      AND dp.movie_title IS NOT NULL
+      AND (c.draft_pick_id IS NULL OR c.leased_until < now())
+    ORDER BY dp.created_at
+    LIMIT p_limit
+    FOR UPDATE OF dp SKIP LOCKED
+  ),
+  claimed AS (
+    INSERT INTO public.letterboxd_rating_claims AS lc (draft_pick_id, worker_id, leased_until)
+    SELECT candidates.id, p_worker_id, now() + make_interval(secs => p_lease_seconds)
+    FROM candidates
+    ON CONFLICT (draft_pick_id) DO UPDATE
+      SET worker_id = EXCLUDED.worker_id,
+          leased_until = EXCLUDED.leased_until,
+          attempts = lc.attempts + 1,
+          claimed_at = now()
+      WHERE lc.leased_until < now()
+    RETURNING lc.draft_pick_id
+  )
+  SELECT dp.id, dp.movie_id, dp.movie_title, dp.movie_year
+  FROM claimed
+  JOIN public.draft_picks dp ON dp.id = claimed.draft_pick_id;
+END;
+$$;
+
+-- Drop finished claims. Rows whose rating wasn't found are left claimed so the
+-- lease acts as a retry delay instead of every worker hammering the same miss.
+CREATE OR REPLACE FUNCTION public.complete_letterboxd_rating_claims(
+  p_worker_id text,
+  p_draft_pick_ids uuid[]
+)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  removed integer;
+BEGIN
+  DELETE FROM public.letterboxd_rating_claims
+  WHERE worker_id = p_worker_id
+    AND draft_pick_id = ANY(p_draft_pick_ids);
+  GET DIAGNOSTICS removed = ROW_COUNT;
+  RETURN removed;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.claim_letterboxd_rating_work(text, integer, integer) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.complete_letterboxd_rating_claims(text, uuid[]) FROM PUBLIC, anon, authenticated;
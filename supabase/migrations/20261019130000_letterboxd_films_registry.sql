@@ -0,0 +1,119 @@
+-- Canonical per-film Letterboxd data keyed by TMDB id (scripts/letterboxd/film_registry.py).
+-- A film is fetched from Letterboxd once for the whole platform: draft_picks.letterboxd_rating
+-- becomes a mirror kept in sync from this table, and spec draft rows read it through a view.
+
+CREATE TABLE IF NOT EXISTS public.letterboxd_films (
+  tmdb_id INTEGER PRIMARY KEY,
+  slug TEXT,
+  rating DECIMAL(3,2),
+  rating_count INTEGER,
+  fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS letterboxd_films_fetched_at_idx
+  ON public.letterboxd_films USING btree (fetched_at);
+
+CREATE INDEX IF NOT EXISTS letterboxd_films_slug_idx
+  ON public.letterboxd_films USING btree (slug);
+
+COMMENT ON TABLE public.letterboxd_films IS 'Letterboxd slug, average rating (0-5) and rating count per TMDB film';
+
+-- Readable by everyone; only the service role (scripts, functions) writes
+ALTER TABLE public.letterboxd_films ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Letterboxd films are readable by everyone"
+ON public.letterboxd_films
+FOR SELECT
+USING (true);
+
+CREATE POLICY "Only functions can modify letterboxd films"
+ON public.letterboxd_films
+FOR ALL
+USING (false);
+
+CREATE OR REPLACE FUNCTION public.update_letterboxd_films_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER update_letterboxd_films_updated_at
+BEFORE UPDATE ON public.letterboxd_films
+FOR EACH ROW
+EXECUTE FUNCTION public.update_letterboxd_films_updated_at();
+
+-- A new or refreshed rating reaches every pick of the film
+CREATE OR REPLACE FUNCTION public.propagate_letterboxd_film_rating()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.rating IS NOT NULL THEN
+    UPDATE public.draft_picks
+    SET letterboxd_rating = NEW.rating
+    WHERE movie_id = NEW.tmdb_id
+      AND letterboxd_rating IS DISTINCT FROM NEW.rating;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER propagate_letterboxd_film_rating
+AFTER INSERT OR UPDATE OF rating ON public.letterboxd_films
+FOR EACH ROW
+EXECUTE FUNCTION public.propagate_letterboxd_film_rating();
+
+-- Picks of a known film start with its rating instead of NULL
+CREATE OR REPLACE FUNCTION public.fill_pick_letterboxd_rating()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.letterboxd_rating IS NULL AND NEW.movie_id IS NOT NULL THEN
+    SELECT lf.rating INTO NEW.letterboxd_rating
+    FROM public.letterboxd_films lf
+    WHERE lf.tmdb_id = NEW.movie_id;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER fill_pick_letterboxd_rating
+BEFORE INSERT ON public.draft_picks
+FOR EACH ROW
+EXECUTE FUNCTION public.fill_pick_letterboxd_rating();
+
+-- Seed from the per-pick copies: the most recently written rating per film.
+-- The propagate trigger then fills sibling picks that were still NULL.
+INSERT INTO public.letterboxd_films (tmdb_id, rating, fetched_at)
+SELECT DISTINCT ON (movie_id) movie_id, letterboxd_rating, created_at
+FROM public.draft_picks
+WHERE movie_id IS NOT NULL
+  AND letterboxd_rating IS NOT NULL
+ORDER BY movie_id, created_at DESC
+ON CONFLICT (tmdb_id) DO NOTHING;
+
+-- Spec draft candidates with their Letterboxd data
+CREATE OR REPLACE VIEW public.spec_draft_movies_letterboxd
+WITH (security_invoker = true) AS
+SELECT
+  sdm.id AS spec_draft_movie_id,
+  sdm.spec_draft_id,
+  sdm.movie_tmdb_id,
+  lf.slug AS letterboxd_slug,
+  lf.rating AS letterboxd_rating,
+  lf.rating_count AS letterboxd_rating_count,
+  lf.fetched_at AS letterboxd_fetched_at
+FROM public.spec_draft_movies sdm
+LEFT JOIN public.letterboxd_films lf ON lf.tmdb_id = sdm.movie_tmdb_id;